@@ -0,0 +1,220 @@
+"""
+Stand-in for the WW3 executables, used by the benchmarks.
+
+Run as ``python fake_ww3.py <program>`` (the benchmarks install small
+``ww3_*`` wrappers doing this on the PATH). Each program checks its namelist,
+prints a log, sleeps for a fixed time and writes outputs with the format and
+the volume of the real program:
+
+- ww3_grid writes mod_def.ww3;
+- ww3_prnc writes the forcing file (e.g. wind.ww3);
+- ww3_shel writes out_grd.ww3 (HS and WND) and out_pnt.ww3 between
+  DOMAIN%START and DOMAIN%STOP;
+- ww3_ounf converts out_grd.ww3 into netCDF files, one per FIELD%TIMESPLIT;
+- ww3_ounp converts out_pnt.ww3 into a netCDF file of spectra;
+- ww3_bounc reads the spectra of spec.list and writes nest.ww3.
+
+numpy, pandas, xarray and pyww3 are imported by the programs that use them,
+so that the fake ww3_grid and ww3_prnc start as fast as the real ones.
+
+The sizes and timings are set with environment variables:
+
+- FAKE_WW3_NX, FAKE_WW3_NY: grid size (all points are sea points);
+- FAKE_WW3_NK, FAKE_WW3_NTH: spectral grid;
+- FAKE_WW3_NPOINTS: number of output points;
+- FAKE_WW3_DELAY: seconds each program sleeps;
+- FAKE_WW3_LOG_LINES: number of log lines printed.
+"""
+import os
+import re
+import sys
+import time
+import datetime
+
+DATE_FORMAT = "%Y%m%d %H%M%S"
+
+# files written by ww3_prnc
+FORCING_FILES = {"WINDS": "wind", "CURRENTS": "current", "WATER_LEVELS": "level",
+                 "ICE_CONC": "ice"}
+
+# out_grd.ww3 output flags
+NOGRP, NGRPP = 10, 17
+
+
+def setting(name, default):
+    """An integer or float setting from the environment."""
+    return type(default)(os.environ.get(f"FAKE_WW3_{name}", default))
+
+
+def read_namelist(fname):
+    """The KEY = value pairs of a namelist file, comments removed."""
+    if not os.path.isfile(fname):
+        print(f" *** WAVEWATCH III ERROR : namelist {fname} not found")
+        sys.exit(1)
+    values = {}
+    with open(fname, "r") as f:
+        for line in f:
+            line = line.split("!")[0]
+            match = re.match(r"\s*([A-Z0-9%_]+)\s*=\s*(.*?)\s*$", line)
+            if match:
+                values[match.group(1)] = match.group(2).strip("'\" ")
+    return values
+
+
+def log(program, nlines):
+    """Print a log like the WW3 programs do."""
+    print(f"  *** WAVEWATCH III Program {program.upper()} ***")
+    for i in range(nlines):
+        print(f"  {i + 1:8d} | {datetime.datetime(2000, 1, 1) + datetime.timedelta(hours=i)}"
+              " | fake model step done")
+    print("  End of program")
+
+
+def output_times(nml, key):
+    """Output times between DOMAIN%START and DOMAIN%STOP."""
+    import pandas as pd
+
+    start = datetime.datetime.strptime(nml["DOMAIN%START"], DATE_FORMAT)
+    stop = datetime.datetime.strptime(nml["DOMAIN%STOP"], DATE_FORMAT)
+    stride = int(float(nml.get(f"DATE%{key}%STRIDE", 0))) or 3600
+    return pd.date_range(start, stop, freq=f"{stride}s")
+
+
+def write_out_grd(fname, times, nx, ny):
+    """out_grd.ww3 with the HS and WND fields of all sea points."""
+    import numpy as np
+    from pyww3.binary import write_record
+
+    nsea = nx * ny
+    flags = np.zeros((NOGRP, NGRPP), dtype="i4")
+    flags[0, 2] = 1  # WND
+    flags[1, 0] = 1  # HS
+    rng = np.random.default_rng(0)
+    with open(fname, "wb") as f:
+        write_record(f, b"WAVEWATCH III GRID OUTPUT FILE", b"2018-03-01",
+                     b"FAKE".ljust(30),
+                     np.array([NOGRP, NGRPP, nsea, nx, ny], dtype="i4"),
+                     np.array([-999.9], dtype="f4"), np.array([0], dtype="i4"))
+        for t in times:
+            write_record(f, np.array([int(t.strftime("%Y%m%d")),
+                                      int(t.strftime("%H%M%S"))], dtype="i4"),
+                         flags.ravel(order="F"))
+            for _ in range(3):  # uwnd, vwnd, hs
+                write_record(f, rng.random(nsea, dtype="f4"))
+
+
+def write_out_pnt(fname, times, npoints, nk, nth):
+    """out_pnt.ww3 with the spectra of ``npoints`` points."""
+    import numpy as np
+    from pyww3.binary import write_record
+
+    rng = np.random.default_rng(0)
+    with open(fname, "wb") as f:
+        write_record(f, b"WAVEWATCH III POINT OUTPUT FILE", b"2018-03-01",
+                     np.array([nk, nth, npoints], dtype="i4"))
+        locs = np.stack([np.linspace(0., 359., npoints),
+                         np.linspace(-60., 60., npoints)], axis=1).astype("f4")
+        write_record(f, locs, *[f"P{i + 1:05d}".encode().ljust(40)
+                                for i in range(npoints)])
+        for t in times:
+            write_record(f, np.array([int(t.strftime("%Y%m%d")),
+                                      int(t.strftime("%H%M%S"))], dtype="i4"))
+            for _ in range(npoints):
+                write_record(f, np.array([1, 2, 3], dtype="i4"),
+                             np.arange(9, dtype="f4"), b"FAKE".ljust(13),
+                             rng.random((nk, nth), dtype="f4"))
+
+
+def ww3_grid():
+    nml = read_namelist("ww3_grid.nml")
+    nx, ny = setting("NX", 180), setting("NY", 90)
+    nk, nth = setting("NK", 32), setting("NTH", 24)
+    # the mod_def holds a few fields of the grid and the spectral tables
+    size = nx * ny * 4 * 6 + nk * nth * 4 * 20
+    with open("mod_def.ww3", "wb") as f:
+        f.write(nml.get("GRID%NAME", "FAKE").encode().ljust(30))
+        f.write(os.urandom(size))
+
+
+def ww3_prnc():
+    nml = read_namelist("ww3_prnc.nml")
+    fields = [k.split("%")[-1] for k, v in nml.items()
+              if k.startswith("FORCING%FIELD%") and v.upper() == "T"]
+    name = FORCING_FILES.get(fields[0] if fields else "", "forcing") + ".ww3"
+    ntimes = 24
+    with open(name, "wb") as f:
+        f.write(os.urandom(setting("NX", 180) * setting("NY", 90) * 8 * ntimes))
+
+
+def ww3_shel():
+    nml = read_namelist("ww3_shel.nml")
+    nx, ny = setting("NX", 180), setting("NY", 90)
+    write_out_grd("out_grd.ww3", output_times(nml, "FIELD"), nx, ny)
+    write_out_pnt("out_pnt.ww3", output_times(nml, "POINT"), setting("NPOINTS", 50),
+                  setting("NK", 32), setting("NTH", 24))
+
+
+def ww3_ounf():
+    import numpy as np
+    import pandas as pd
+    import xarray as xr
+    from pyww3.binary import open_out_grd
+
+    nml = read_namelist("ww3_ounf.nml")
+    prefix = nml.get("FILE%PREFIX", "ww3.")
+    split = int(nml.get("FIELD%TIMESPLIT", 6))
+    ds = open_out_grd("out_grd.ww3", fields=["HS", "WND"])
+    nx, ny = ds.attrs.get("nx", setting("NX", 180)), ds.attrs.get("ny", setting("NY", 90))
+
+    grid = xr.Dataset(coords={"time": ds["time"].values,
+                              "latitude": np.linspace(-89., 89., ny),
+                              "longitude": np.linspace(0., 358., nx)})
+    for var in ["hs", "uwnd", "vwnd"]:
+        values = ds[var].values.reshape(-1, ny, nx)
+        grid[var] = (("time", "latitude", "longitude"), values.astype("f4"))
+    stamps = pd.DatetimeIndex(grid["time"].values).strftime("%Y%m%d%H")
+    encoding = {v: {"zlib": True, "complevel": 1} for v in grid.data_vars}
+    for stamp in sorted(set(s[:split] for s in stamps)):
+        part = grid.isel(time=np.array([s[:split] == stamp for s in stamps]))
+        part.to_netcdf(f"{prefix}{stamp}.nc", encoding=encoding)
+
+
+def ww3_ounp():
+    import pandas as pd
+    from pyww3.binary import open_out_pnt
+
+    nml = read_namelist("ww3_ounp.nml")
+    prefix = nml.get("FILE%PREFIX", "ww3.")
+    ds = open_out_pnt("out_pnt.ww3", freq1=0.04118, xfr=1.1).load()
+    stamp = pd.Timestamp(ds["time"].values[0]).strftime("%Y%m")
+    ds.to_netcdf(f"{prefix}{stamp}_spec.nc")
+
+
+def ww3_bounc():
+    import xarray as xr
+
+    read_namelist("ww3_bounc.nml")
+    with open("spec.list", "r") as f:
+        files = [line.strip() for line in f if line.strip()]
+    with open("nest.ww3", "wb") as out:
+        for fname in files:
+            with xr.open_dataset(fname) as ds:
+                out.write(ds["efth"].values.astype("f4").tobytes())
+
+
+PROGRAMS = {"ww3_grid": ww3_grid, "ww3_prnc": ww3_prnc, "ww3_shel": ww3_shel,
+            "ww3_ounf": ww3_ounf, "ww3_ounp": ww3_ounp, "ww3_bounc": ww3_bounc}
+
+
+def main(program):
+    if program not in PROGRAMS:
+        print(f"Unknown program {program}")
+        return 1
+    time.sleep(setting("DELAY", 0.))
+    PROGRAMS[program]()
+    log(program, setting("LOG_LINES", 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1]))
@@ -0,0 +1,370 @@
+"""
+Benchmarks of the costs of pyww3 itself, with stand-in WW3 executables.
+
+The WW3 programs are replaced by ``fake_ww3.py`` (see its docstring), so the
+timings measure what pyww3 adds around the model: namelist rendering, input
+validation, staging, subprocess and log capture, the run history and the
+readers of the model outputs. Run::
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json
+
+to record the timings of a version and compare another one against them.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+
+import numpy as np
+import xarray as xr
+
+import pyww3
+from pyww3.grid import WW3GRid
+from pyww3.prnc import WW3Prnc
+from pyww3.shel import WW3Shel
+from pyww3.ounf import WW3Ounf
+from pyww3.ounp import WW3Ounp
+from pyww3.bounc import WW3Bounc
+from pyww3.binary import open_out_grd, open_out_pnt
+from pyww3.pipeline import run_pipeline
+from pyww3.staging import stage_files
+from pyww3.spectra import write_spec_nc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROGRAMS = ["ww3_grid", "ww3_prnc", "ww3_shel", "ww3_ounf", "ww3_ounp", "ww3_bounc"]
+
+START = datetime.datetime(2021, 1, 1)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function gets a fresh work directory, does its setup and
+    returns the function to time.
+    """
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def install_programs(bindir):
+    """Write the ww3_* and mpirun wrappers of fake_ww3.py in ``bindir``."""
+    os.makedirs(bindir, exist_ok=True)
+    for program in PROGRAMS:
+        fname = os.path.join(bindir, program)
+        with open(fname, "w") as f:
+            f.write(f"#!/bin/sh\nexec \"{sys.executable}\" \"{HERE}/fake_ww3.py\" "
+                    f"{program} \"$@\"\n")
+        os.chmod(fname, 0o755)
+
+    # runs the last argument, ignoring the launcher options
+    fname = os.path.join(bindir, "mpirun")
+    with open(fname, "w") as f:
+        f.write("#!/bin/sh\nfor last; do true; done\nexec \"$last\"\n")
+    os.chmod(fname, 0o755)
+
+
+def make_grid(path):
+    with open(os.path.join(path, "grid.nml"), "w") as f:
+        f.write("")
+    return WW3GRid(runpath=path, grid_name="FAKE", grid_nml=os.path.join(path, "grid.nml"),
+                   grid_type="RECT", grid_coord="SPHE", grid_clos="SMPL",
+                   rect_nx=int(os.environ["FAKE_WW3_NX"]),
+                   rect_ny=int(os.environ["FAKE_WW3_NY"]), rect_sx=1., rect_sy=1.)
+
+
+def make_shel(path, days):
+    return WW3Shel(runpath=path, mod_def=os.path.join(path, "mod_def.ww3"),
+                   domain_start=START, domain_stop=START + datetime.timedelta(days=days),
+                   date_field_stride=3600)
+
+
+def write_spectra(path, nfiles):
+    """``nfiles`` _spec.nc files of one boundary point each in ``path``."""
+    os.makedirs(path)
+    freq, dirs = 0.04118 * 1.1 ** np.arange(32), np.arange(0., 360., 15.)
+    efth = np.ones((4, 32, 24))
+    for i in range(nfiles):
+        write_spec_nc(os.path.join(path, f"B{i:04d}_spec.nc"), START + np.arange(4) *
+                      datetime.timedelta(hours=1), 0., 0., f"B{i:04d}", freq, dirs, efth)
+
+
+def model_outputs(path, days):
+    """Run the fake ww3_grid and ww3_shel in ``path``."""
+    grid = make_grid(path)
+    grid.to_file()
+    grid.run()
+    shel = make_shel(path, days)
+    shel.to_file()
+    shel.run()
+    return shel
+
+
+@benchmark("namelist_shel")
+def bench_namelist(path, days):
+    with open(os.path.join(path, "mod_def.ww3"), "wb") as f:
+        f.write(b"fake")
+    return lambda: make_shel(path, days)
+
+
+@benchmark("namelist_grid_to_file")
+def bench_grid_to_file(path, days):
+    grid = make_grid(path)
+    return grid.to_file
+
+
+@benchmark("run_grid")
+def bench_run_grid(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+    return grid.run
+
+
+@benchmark("run_grid_history")
+def bench_run_history(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+
+    def run():
+        os.environ["PYWW3_HISTORY"] = os.path.join(path, "history.sqlite")
+        try:
+            grid.run()
+        finally:
+            os.environ["PYWW3_HISTORY"] = "off"
+    return run
+
+
+@benchmark("run_shel_mpi")
+def bench_run_shel(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+    grid.run()
+    shel = make_shel(path, days)
+    shel.to_file()
+    return lambda: shel.run(mpi=True, nproc=2)
+
+
+@benchmark("run_shel_long_log")
+def bench_long_log(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+    grid.run()
+    shel = make_shel(path, days)
+    shel.to_file()
+
+    def run():
+        os.environ["FAKE_WW3_LOG_LINES"] = "200000"
+        try:
+            shel.run()
+        finally:
+            os.environ["FAKE_WW3_LOG_LINES"] = "100"
+    return run
+
+
+@benchmark("run_prnc")
+def bench_run_prnc(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+    grid.run()
+    nx, ny = int(os.environ["FAKE_WW3_NX"]), int(os.environ["FAKE_WW3_NY"])
+    times = START + np.arange(24 * days) * datetime.timedelta(hours=1)
+    shape = (times.size, ny, nx)
+    xr.Dataset({"u10": (("time", "latitude", "longitude"), np.ones(shape, dtype="f4")),
+                "v10": (("time", "latitude", "longitude"), np.ones(shape, dtype="f4"))},
+               coords={"time": times, "latitude": np.linspace(-89., 89., ny),
+                       "longitude": np.linspace(0., 358., nx)}
+               ).to_netcdf(os.path.join(path, "wind.nc"))
+
+    def run():
+        prnc = WW3Prnc(runpath=path, mod_def=os.path.join(path, "mod_def.ww3"),
+                       forcing_field="WINDS", forcing_grid_latlon=True,
+                       file_filename=os.path.join(path, "wind.nc"),
+                       file_longitude="longitude", file_latitude="latitude",
+                       file_var_1="u10", file_var_2="v10")
+        prnc.to_file()
+        prnc.run()
+    return run
+
+
+@benchmark("run_bounc")
+def bench_run_bounc(path, days):
+    grid = make_grid(path)
+    grid.to_file()
+    grid.run()
+    src = os.path.join(os.path.dirname(path), "bounc_spectra")  # outside the run path
+    write_spectra(src, 50)
+
+    def run():
+        # stages the spectra into the run path and writes spec.list
+        bounc = WW3Bounc(runpath=path, mod_def=os.path.join(path, "mod_def.ww3"),
+                         bound_file=src)
+        bounc.to_file()
+        bounc.run()
+    return run
+
+
+@benchmark("stage_spectra")
+def bench_staging(path, days):
+    src = os.path.join(path, "spectra")
+    write_spectra(src, 200)
+    dst = os.path.join(path, "run")
+
+    def stage():
+        shutil.rmtree(dst, ignore_errors=True)
+        stage_files(src, dst)  # all files
+        stage_files(src, dst)  # nothing changed
+    return stage
+
+
+@benchmark("read_out_grd")
+def bench_read_grd(path, days):
+    model_outputs(path, days)
+    fname = os.path.join(path, "out_grd.ww3")
+    return lambda: open_out_grd(fname, fields=["HS"])["hs"].values
+
+
+@benchmark("read_out_pnt")
+def bench_read_pnt(path, days):
+    model_outputs(path, days)
+    fname = os.path.join(path, "out_pnt.ww3")
+    return lambda: open_out_pnt(fname, freq1=0.04118, xfr=1.1)["efth"].values
+
+
+@benchmark("ounf_outputs")
+def bench_ounf(path, days):
+    model_outputs(path, days)
+    ounf = WW3Ounf(runpath=path, mod_def=os.path.join(path, "mod_def.ww3"),
+                   ww3_grd=os.path.join(path, "out_grd.ww3"), field_list=["HS", "WND"])
+    ounf.to_file()
+
+    def run():
+        ounf.run()
+        ounf.open_outputs(fields=["HS"])["hs"].values
+    return run
+
+
+@benchmark("ounp_outputs")
+def bench_ounp(path, days):
+    model_outputs(path, days)
+    ounp = WW3Ounp(runpath=path, mod_def=os.path.join(path, "mod_def.ww3"),
+                   ww3_pnt=os.path.join(path, "out_pnt.ww3"))
+    ounp.to_file()
+    return ounp.run
+
+
+@benchmark("pipeline")
+def bench_pipeline(path, days):
+    with open(os.path.join(path, "grid.nml"), "w") as f:
+        f.write("")
+    nml = os.path.join(path, "grid.nml")
+    config = {"runpath": path,
+              "stages": [{"name": "grid", "program": "ww3_grid",
+                          "args": {"grid_name": "FAKE", "grid_nml": nml,
+                                   "grid_type": "RECT", "grid_coord": "SPHE",
+                                   "grid_clos": "SMPL"}},
+                         {"name": "shel", "program": "ww3_shel",
+                          "args": {"mod_def": os.path.join(path, "mod_def.ww3"),
+                                   "domain_start": START.isoformat(),
+                                   "domain_stop": (START + datetime.timedelta(days=days))
+                                   .isoformat(),
+                                   "date_field_stride": 3600}},
+                         {"name": "ounf", "program": "ww3_ounf",
+                          "args": {"mod_def": os.path.join(path, "mod_def.ww3"),
+                                   "ww3_grd": os.path.join(path, "out_grd.ww3")}}]}
+    fname = os.path.join(path, "pipeline.json")
+    with open(fname, "w") as f:
+        json.dump(config, f)
+
+    def run():
+        if not run_pipeline(fname):
+            raise RuntimeError("The benchmark pipeline failed.")
+    return run
+
+
+def time_benchmark(func, repeat):
+    """Wall-clock times (s) of ``repeat`` calls of ``func``."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run_benchmarks(names=None, repeat=5, days=2, workdir=None):
+    """Run the benchmarks and return their median and minimum times (s)."""
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        install_programs(os.path.join(tmp, "bin"))
+        os.environ["PATH"] = os.path.join(tmp, "bin") + os.pathsep + os.environ["PATH"]
+        os.environ["PYWW3_HISTORY"] = "off"
+
+        for name in names or BENCHMARKS:
+            path = os.path.join(tmp, name)
+            os.makedirs(path)
+            func = BENCHMARKS[name](path, days)
+            times = time_benchmark(func, repeat)
+            results[name] = {"median": float(np.median(times)), "min": float(np.min(times))}
+            print(f"{name:<24} {1000 * results[name]['median']:10.1f} ms "
+                  f"(min {1000 * results[name]['min']:.1f} ms)", flush=True)
+    return results
+
+
+def compare(results, baseline):
+    """Print the ratio of the median times to a baseline."""
+    print(f"\nCompared to pyww3 {baseline['version']}:")
+    for name, result in results.items():
+        if name in baseline["results"]:
+            ratio = result["median"] / baseline["results"][name]["median"]
+            print(f"{name:<24} {ratio:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--days", type=int, default=2, help="simulated days")
+    parser.add_argument("--nx", type=int, default=180)
+    parser.add_argument("--ny", type=int, default=90)
+    parser.add_argument("--npoints", type=int, default=50)
+    parser.add_argument("--quick", action="store_true",
+                        help="one repetition on a small grid, to check the harness")
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    args = parser.parse_args(argv)
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    if args.quick:
+        args.repeat, args.days, args.nx, args.ny, args.npoints = 1, 1, 36, 18, 5
+
+    os.environ.update({"FAKE_WW3_NX": str(args.nx), "FAKE_WW3_NY": str(args.ny),
+                       "FAKE_WW3_NPOINTS": str(args.npoints),
+                       "FAKE_WW3_LOG_LINES": "100"})
+    results = run_benchmarks(args.names, args.repeat, args.days)
+
+    record = {"version": pyww3.__version__, "python": platform.python_version(),
+              "date": datetime.datetime.now().isoformat(), "repeat": args.repeat,
+              "size": {"nx": args.nx, "ny": args.ny, "days": args.days,
+                       "npoints": args.npoints},
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
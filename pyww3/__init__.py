@@ -11,6 +11,7 @@ from pyww3.ounf import WW3Ounf
 from pyww3.ounp import WW3Ounp
 from pyww3.prnc import WW3Prnc
 from pyww3.shel import WW3Shel
+from pyww3.multi import WW3Multi
 from pyww3.ww3 import WW3Base
 from pyww3.namelists import *
 from pyww3.utils import *
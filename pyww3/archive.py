@@ -0,0 +1,155 @@
+"""
+Time index for the netCDF files written by ww3_ounf and ww3_ounp.
+
+Scanning a long archive with ``xr.open_mfdataset`` opens every file. The
+index stores the time range, variables and chunking of each file in a small
+JSON file so that only the files overlapping a requested period are opened.
+Files whose size and modification time did not change are not re-read when
+the index is updated.
+"""
+import os
+import json
+import datetime
+
+from glob import glob
+from natsort import natsorted
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+DATE_FORMAT = "%Y%m%d %H%M%S"
+
+
+def _file_entry(fname, time="time"):
+    """Inspect one netCDF file without reading its data."""
+    with netCDF4.Dataset(fname) as nc:
+        tvar = nc.variables[time]
+        values = tvar[:]
+        if values.size:
+            dates = netCDF4.num2date([values.min(), values.max()], tvar.units,
+                                     getattr(tvar, "calendar", "standard"),
+                                     only_use_cftime_datetimes=False,
+                                     only_use_python_datetimes=True)
+            start, stop = (d.strftime(DATE_FORMAT) for d in dates)
+        else:
+            start = stop = None
+
+        variables = {}
+        for name, var in nc.variables.items():
+            if name in nc.dimensions:
+                continue
+            chunking = var.chunking()
+            variables[name] = {
+                "dims": list(var.dimensions),
+                "chunks": None if chunking == "contiguous" else list(chunking)}
+
+    stat = os.stat(fname)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns,
+            "start": start, "stop": stop, "ntimes": int(values.size),
+            "variables": variables}
+
+
+def build_index(path, prefix="ww3.", index_file=None, time="time"):
+    """Create or update the index of the files ``path/prefix*.nc``.
+
+    Returns the index as a dictionary mapping file names (relative to
+    ``path``) to their entries, and writes it to ``index_file``
+    (``path/prefix + "index.json"`` by default).
+    """
+    if index_file is None:
+        index_file = os.path.join(path, prefix + "index.json")
+
+    index = {}
+    if os.path.isfile(index_file):
+        with open(index_file, "r") as f:
+            index = json.load(f)
+
+    fnames = natsorted(glob(os.path.join(path, prefix + "*.nc")))
+    new = {}
+    for fname in fnames:
+        key = os.path.relpath(fname, path)
+        stat = os.stat(fname)
+        old = index.get(key)
+        if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime_ns:
+            new[key] = old
+        else:
+            new[key] = _file_entry(fname, time)
+
+    with open(index_file, "w") as f:
+        json.dump(new, f, indent=1)
+
+    return new
+
+
+def resolve_fields(fields, variables):
+    """Map output tags such as HS or WND to netCDF variable names."""
+    names = []
+    lower = {v.lower(): v for v in variables}
+    for fld in fields:
+        if fld in variables:
+            names.append(fld)
+        elif fld.lower() in lower:
+            names.append(lower[fld.lower()])
+        elif f"u{fld.lower()}" in lower and f"v{fld.lower()}" in lower:
+            names.extend([lower[f"u{fld.lower()}"], lower[f"v{fld.lower()}"]])
+        else:
+            error = f"Field \'{fld}\' is not in the files. Options are {sorted(variables)}."
+            raise ValueError(error)
+    return names
+
+
+def select_files(index, start=None, stop=None):
+    """Files of the index overlapping the [start, stop] period."""
+    start = None if start is None else pd.Timestamp(start).to_pydatetime()
+    stop = None if stop is None else pd.Timestamp(stop).to_pydatetime()
+
+    selected = []
+    for key, entry in index.items():
+        if entry["start"] is None:
+            continue
+        fstart = datetime.datetime.strptime(entry["start"], DATE_FORMAT)
+        fstop = datetime.datetime.strptime(entry["stop"], DATE_FORMAT)
+        if (stop is None or fstart <= stop) and (start is None or fstop >= start):
+            selected.append((fstart, key))
+    return [key for _, key in sorted(selected)]
+
+
+def open_index(path, index, start=None, stop=None, fields=None, time="time"):
+    """Lazily open the part of an archive covering a period.
+
+    Only the files overlapping [start, stop] are opened. If dask is
+    installed, the variables are chunked like the netCDF files, otherwise
+    they are loaded file by file after the time and field selection.
+    """
+    keys = select_files(index, start, stop)
+    if not keys:
+        error = f"No file in \'{path}\' covers {start} to {stop}."
+        raise ValueError(error)
+
+    variables = index[keys[0]]["variables"]
+    names = None if fields is None else resolve_fields(fields, variables)
+
+    try:
+        import dask  # noqa: F401
+        chunks = {}
+        for name in names or variables:
+            if variables[name]["chunks"]:
+                chunks.update(dict(zip(variables[name]["dims"],
+                                       variables[name]["chunks"])))
+    except ImportError:
+        chunks = None
+
+    parts = []
+    for key in keys:
+        ds = xr.open_dataset(os.path.join(path, key), chunks=chunks)
+        if names is not None:
+            ds = ds[names]
+        ds = ds.sel({time: slice(start, stop)})
+        parts.append(ds if chunks is not None else ds.load())
+
+    out = xr.concat(parts, dim=time, data_vars="minimal", coords="minimal",
+                    compat="override", join="override")
+    _, unique = np.unique(out[time].values, return_index=True)
+    return out.isel({time: np.sort(unique)})
@@ -0,0 +1,401 @@
+"""
+Readers for the raw binary outputs of ww3_shel (out_grd.ww3 and out_pnt.ww3).
+
+The files are Fortran unformatted sequential files: every record is framed
+by two integers holding its length in bytes. The files are memory-mapped and
+only the record offsets are indexed. Data are read from disk when the
+returned xarray objects are actually indexed or loaded.
+"""
+import os
+import mmap
+import struct
+import datetime
+
+import numpy as np
+import xarray as xr
+
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from .geometry import grid_coordinates, sea_points
+
+# output tags of each output group, in the order of the FLOGRD flags. See the
+# table in the OUTPUT_TYPE_NML section of ww3_shel.nml.
+FIELD_GROUPS = [["DPT", "CUR", "WND", "AST", "WLV", "ICE", "IBG", "D50",
+                 "IC1", "IC5"],
+                ["HS", "LM", "T02", "T0M1", "T01", "FP", "DIR", "SPR", "DP",
+                 "HIG", "MXE", "MXES", "MXH", "MXHC", "SDMH", "SDMHC", "WBT"],
+                ["EF", "TH1M", "STH1M", "TH2M", "STH2M", "WN"],
+                ["PHS", "PTP", "PLP", "PDIR", "PSPR", "PWS", "PDP", "PQP",
+                 "PPE", "PGW", "PSW", "PTM10", "PT01", "PT02", "PEP", "TWS",
+                 "PNR"],
+                ["UST", "CHA", "CGE", "FAW", "TAW", "TWA", "WCC", "WCF",
+                 "WCH", "WCM", "FWS"],
+                ["SXY", "TWO", "BHD", "FOC", "TUS", "USS", "P2S", "USF",
+                 "P2L", "TWI", "FIC", "USP"],
+                ["ABR", "UBR", "BED", "FBB", "TBB"],
+                ["MSS", "MSC", "WL02", "AXT", "AYT", "AXY"],
+                ["DTD", "FC", "CFX", "CFD", "CFK"],
+                ["U1", "U2"]]
+
+# fields written as more than one record (vector or tensor components)
+FIELD_RECORDS = {"CUR": 2, "WND": 2, "UST": 2, "TAW": 2, "TWA": 2, "SXY": 3,
+                 "TWO": 2, "TUS": 2, "USS": 2, "P2S": 2, "TWI": 2, "ABR": 2,
+                 "UBR": 2, "BED": 3, "TBB": 2, "MSS": 2, "MSC": 2, "WL02": 2}
+
+
+class FortranFile():
+    """Memory-mapped Fortran unformatted sequential file."""
+
+    def __init__(self, filename):
+        if not os.path.isfile(filename):
+            error = f"No such file or directory \'{filename}\'."
+            raise ValueError(error)
+
+        self.filename = filename
+        self._file = open(filename, "rb")
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # guess the byte order from the first record marker
+        self.endian = None
+        for endian in ["<", ">"]:
+            n = struct.unpack_from(f"{endian}i", self.mm, 0)[0]
+            if 0 <= n <= self.mm.size() - 8 and \
+                    struct.unpack_from(f"{endian}i", self.mm, 4 + n)[0] == n:
+                self.endian = endian
+                break
+        if self.endian is None:
+            error = f"\'{filename}\' is not a Fortran unformatted file."
+            raise ValueError(error)
+
+        self.offsets, self.lengths = self._index()
+
+    def _index(self):
+        """Offsets (of the payload) and lengths of all records."""
+        offsets, lengths = [], []
+        pos, size = 0, self.mm.size()
+        fmt = f"{self.endian}i"
+        while pos + 8 <= size:
+            n = struct.unpack_from(fmt, self.mm, pos)[0]
+            if n < 0 or pos + 8 + n > size:
+                break  # truncated record, the model is probably still writing
+            offsets.append(pos + 4)
+            lengths.append(n)
+            pos += n + 8
+        return np.array(offsets, dtype="int64"), np.array(lengths, dtype="int64")
+
+    def record(self, i, dtype="i4"):
+        """Return record ``i`` as a numpy array (a view on the file)."""
+        dtype = np.dtype(dtype).newbyteorder(self.endian)
+        return np.frombuffer(self.mm, dtype=dtype,
+                             count=self.lengths[i] // dtype.itemsize,
+                             offset=self.offsets[i])
+
+    def bytes(self, i):
+        """Return record ``i`` as bytes."""
+        return self.mm[self.offsets[i]:self.offsets[i] + self.lengths[i]]
+
+    def close(self):
+        """Close the memory map."""
+        self.mm.close()
+        self._file.close()
+
+
+def write_record(f, *arrays, endian="<"):
+    """Write numpy arrays (or bytes) as one Fortran unformatted record."""
+    payload = b"".join(a if isinstance(a, bytes) else
+                       np.ascontiguousarray(a).astype(
+                           np.asarray(a).dtype.newbyteorder(endian)).tobytes()
+                       for a in arrays)
+    marker = struct.pack(f"{endian}i", len(payload))
+    f.write(marker + payload + marker)
+
+
+def decode_time(date, time):
+    """Convert WW3's (yyyymmdd, hhmmss) integers to datetime."""
+    return datetime.datetime.strptime(f"{int(date):08d}{int(time):06d}",
+                                      "%Y%m%d%H%M%S")
+
+
+class RecordArray(BackendArray):
+    """Lazy array made of one record per time step (or per time and station).
+
+    ``records`` holds the record numbers, with shape (time,) or
+    (time, station). Each record holds an array of shape ``shape``, starting
+    ``offset`` bytes after the beginning of the record.
+    """
+
+    def __init__(self, ffile, records, shape, dtype, undef=None, offset=0):
+        self.ffile = ffile
+        self.records = np.asarray(records)
+        self.record_shape = tuple(shape)
+        self.shape = self.records.shape + self.record_shape
+        self.dtype = np.dtype(dtype)
+        self.undef = undef
+        self.offset = offset
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.BASIC,
+            self._raw_indexing_method)
+
+    def _raw_indexing_method(self, key):
+        dtype = self.dtype.newbyteorder(self.ffile.endian)
+        count = int(np.prod(self.record_shape))
+        lead = self.records.ndim
+        records = self.records[key[:lead]]
+        inner = key[lead:]
+
+        out = np.empty(records.shape + np.empty(self.record_shape)[inner].shape,
+                       dtype=self.dtype)
+        for idx in np.ndindex(records.shape):
+            offset = self.ffile.offsets[records[idx]] + self.offset
+            values = np.frombuffer(self.ffile.mm, dtype=dtype, count=count,
+                                   offset=offset).reshape(self.record_shape)
+            out[idx] = values[inner]
+
+        if self.undef is not None:
+            out[out == self.undef] = np.nan
+        return out
+
+
+def _lazy(array):
+    """Wrap a RecordArray so that xarray does not load it."""
+    return indexing.LazilyIndexedArray(array)
+
+
+def read_out_grd_header(ffile):
+    """Parse the header record of out_grd.ww3."""
+    head = ffile.bytes(0)
+    ints = np.frombuffer(head[-28:], dtype=np.dtype("i4").newbyteorder(ffile.endian))
+    nogrp, ngrpp, nsea, nx, ny = (int(x) for x in ints[:5])
+    undef = float(np.frombuffer(head[-8:-4],
+                                dtype=np.dtype("f4").newbyteorder(ffile.endian))[0])
+    noswll = int(ints[6])
+    strings = head[:-28].decode("ascii", errors="replace")
+    return {"idstr": strings[:30].strip(), "version": strings[30:40].strip(),
+            "gname": strings[40:].strip(), "nogrp": nogrp, "ngrpp": ngrpp,
+            "nsea": nsea, "nx": nx, "ny": ny, "undef": undef,
+            "noswll": noswll}
+
+
+def open_out_grd(filename, fields=None, times=None, field_records=None):
+    """Open out_grd.ww3 as a lazily loaded xarray.Dataset.
+
+    Args:
+        filename: path to out_grd.ww3.
+        fields: output tags to expose (e.g. ["HS", "WND"]). Defaults to all.
+        times: restrict to a (start, stop) pair of datetimes.
+        field_records: updates :data:`FIELD_RECORDS` if the number of records
+            per field differs in your WW3 version.
+
+    The data are on the sea points (``seapoint`` dimension), in the order
+    used by the model. Use :func:`grid_fields` to map them on the model grid.
+    Vector fields are split in ``u``/``v`` prefixed variables (and an index
+    suffix for three components), partitioned fields have a ``partition``
+    dimension.
+    """
+    ffile = FortranFile(filename)
+    head = read_out_grd_header(ffile)
+    nsea, undef = head["nsea"], head["undef"]
+    nflags = head["nogrp"] * head["ngrpp"]
+
+    nrecords = dict(FIELD_RECORDS)
+    if field_records:
+        nrecords.update(field_records)
+
+    # walk the records once, one time step at a time
+    steps = []
+    i = 1
+    while i < ffile.lengths.size:
+        if ffile.lengths[i] != 8 + 4 * nflags:
+            raise ValueError(f"Unexpected record {i} in \'{filename}\'.")
+        rec = ffile.record(i)
+        flags = rec[2:].reshape(head["ngrpp"], head["nogrp"]).T != 0
+        # the model writes the fields group by group
+        names = [FIELD_GROUPS[g][p]
+                 for g in range(min(head["nogrp"], len(FIELD_GROUPS)))
+                 for p in range(min(head["ngrpp"], len(FIELD_GROUPS[g])))
+                 if flags[g, p]]
+
+        step = {"time": decode_time(rec[0], rec[1]), "fields": {}}
+        i += 1
+        first = i
+        for name in names:
+            nrec = nrecords.get(name, 1)
+            step["fields"][name] = list(range(i, i + nrec))
+            i += nrec
+        if i > ffile.lengths.size or (ffile.lengths[first:i] % (4 * nsea)).any():
+            raise ValueError(f"Could not read the time step {step['time']} "
+                             f"in \'{filename}\'. Check FIELD_RECORDS.")
+        steps.append(step)
+
+    if times is not None:
+        steps = [s for s in steps if times[0] <= s["time"] <= times[1]]
+
+    ds = xr.Dataset(coords={"time": [s["time"] for s in steps]})
+    ds.attrs.update({k: v for k, v in head.items()})
+    if not steps:
+        return ds
+
+    available = [name for name in steps[0]["fields"]
+                 if all(name in s["fields"] for s in steps)]
+    for name in available if fields is None else fields:
+        if name not in available:
+            error = f"Field \'{name}\' is not in \'{filename}\'. Options are {available}."
+            raise ValueError(error)
+
+        nrec = nrecords.get(name, 1)
+        for c in range(nrec):
+            records = [s["fields"][name][c] for s in steps]
+            nlayer = int(ffile.lengths[records[0]] // (4 * nsea))
+            if nlayer == 1:
+                shape, dims = (nsea,), ("time", "seapoint")
+            else:
+                # 2D arrays are written sea points first (Fortran order)
+                shape = (nlayer, nsea)
+                dims = ("time", "partition" if name.startswith("P") else "layer",
+                        "seapoint")
+
+            var = name.lower()
+            if nrec == 2:
+                var = ["u", "v"][c] + var
+            elif nrec > 2:
+                var = f"{var}{c + 1}"
+
+            array = RecordArray(ffile, records, shape, "float32", undef)
+            ds[var] = xr.Variable(dims, _lazy(array), {"ww3_tag": name})
+
+    return ds
+
+
+def read_out_pnt_header(ffile):
+    """Parse the header and the station records of out_pnt.ww3."""
+    head = ffile.bytes(0)
+    nk, nth, nopts = (int(x) for x in np.frombuffer(
+        head[-12:], dtype=np.dtype("i4").newbyteorder(ffile.endian)))
+    strings = head[:-12].decode("ascii", errors="replace")
+
+    # station locations, then fixed-length station names
+    locs = ffile.bytes(1)
+    ptloc = np.frombuffer(locs[:8 * nopts],
+                          dtype=np.dtype("f4").newbyteorder(ffile.endian))
+    ptloc = ptloc.reshape(nopts, 2).astype("float64")
+    nchar = (len(locs) - 8 * nopts) // max(nopts, 1)
+    names = [locs[8 * nopts + i * nchar:8 * nopts + (i + 1) * nchar]
+             .decode("ascii", errors="replace").strip() for i in range(nopts)]
+
+    return {"idstr": strings[:31].strip(), "version": strings[31:].strip(),
+            "nk": nk, "nth": nth, "nopts": nopts,
+            "longitude": ptloc[:, 0], "latitude": ptloc[:, 1],
+            "station_name": names}
+
+
+def open_out_pnt(filename, stations=None, times=None, freq1=None, xfr=None,
+                 thoff=0.):
+    """Open out_pnt.ww3 as a lazily loaded xarray.Dataset.
+
+    Args:
+        filename: path to out_pnt.ww3.
+        stations: station names (or indexes) to expose. Defaults to all.
+        times: restrict to a (start, stop) pair of datetimes.
+        freq1, xfr: first frequency and frequency increment of the model
+            (``WW3GRid.spectrum_freq1`` and ``spectrum_xfr``), used to build
+            the frequency coordinate.
+        thoff: relative offset of the first direction (``spectrum_thoff``).
+
+    ``efth`` has dimensions (time, station, frequency, direction) and holds
+    the spectra as stored in out_pnt.ww3, i.e. without the conversions
+    applied by ww3_ounp. Directions follow the model convention (cartesian,
+    direction the waves travel to, in degrees).
+    """
+    ffile = FortranFile(filename)
+    head = read_out_pnt_header(ffile)
+    nk, nth, nopts = head["nk"], head["nth"], head["nopts"]
+
+    # a time record, then one record per station
+    nrec = ffile.lengths.size - 2
+    ntimes = nrec // (nopts + 1)
+    first = 2 + np.arange(ntimes) * (nopts + 1)
+    if ntimes and (ffile.lengths[first] != 8).any():
+        raise ValueError(f"Unexpected record layout in \'{filename}\'.")
+    records = first[:, None] + 1 + np.arange(nopts)[None, :]
+
+    tvalues = [decode_time(*ffile.record(i)[:2]) for i in first]
+    tsel = np.arange(ntimes)
+    if times is not None:
+        tsel = np.array([i for i, t in enumerate(tvalues)
+                         if times[0] <= t <= times[1]], dtype="int64")
+
+    ssel = np.arange(nopts)
+    if stations is not None:
+        ssel = np.array([head["station_name"].index(st) if isinstance(st, str)
+                         else int(st) for st in stations], dtype="int64")
+
+    # the spectrum is at the end of each station record
+    nspec = nk * nth
+    offset = int(ffile.lengths[records[0, 0]]) - 4 * nspec if ntimes else 0
+    array = RecordArray(ffile, records[tsel][:, ssel], (nk, nth), "float32",
+                        offset=offset)
+
+    coords = {"time": [tvalues[i] for i in tsel],
+              "station": ssel + 1,
+              "station_name": ("station", [head["station_name"][i] for i in ssel]),
+              "longitude": ("station", head["longitude"][ssel]),
+              "latitude": ("station", head["latitude"][ssel]),
+              "direction": (np.arange(nth) + thoff) * 360. / nth}
+    if freq1 is not None and xfr is not None:
+        coords["frequency"] = freq1 * xfr ** np.arange(nk)
+
+    ds = xr.Dataset(coords=coords)
+    ds.attrs.update({k: head[k] for k in ["idstr", "version", "nk", "nth", "nopts"]})
+    ds["efth"] = xr.Variable(("time", "station", "frequency", "direction"),
+                             _lazy(array))
+    return ds
+
+
+def to_grid(da, mapsf, nx, ny):
+    """Scatter a (..., seapoint) array on the (..., ny, nx) grid.
+
+    ``mapsf`` gives the (iy, ix) zero-based position of each sea point, see
+    :func:`pyww3.geometry.sea_points`.
+    """
+    mapsf = np.asarray(mapsf)
+    values = np.asarray(da)
+    out = np.full(values.shape[:-1] + (ny, nx), np.nan, dtype=values.dtype)
+    out[..., mapsf[:, 0], mapsf[:, 1]] = values
+    return out
+
+
+def grid_fields(ds, grid):
+    """Map the fields of :func:`open_out_grd` on the (ny, nx) model grid.
+
+    Args:
+        ds: a dataset returned by :func:`open_out_grd`.
+        grid: the :class:`pyww3.grid.WW3GRid` of the run, with the mask or
+            depth file that defined its sea points.
+
+    Returns a dataset with (time, ..., y, x) variables and the longitude and
+    latitude of the grid. Land points are NaN. The fields are loaded.
+    """
+    mapsf = sea_points(grid)
+    nsea = ds.attrs.get("nsea")
+    if nsea is not None and mapsf.shape[0] != nsea:
+        error = (f"The grid has {mapsf.shape[0]} sea points but the output file has "
+                 f"{nsea}. Give the grid with the mask or depth file of the run.")
+        raise ValueError(error)
+
+    x, y = grid_coordinates(grid)
+    ny, nx = (y.size, x.size) if grid.grid_type == "RECT" else x.shape
+    out = xr.Dataset(coords={"time": ds["time"].values})
+    if grid.grid_type == "RECT":
+        out.coords["longitude"] = ("x", x)
+        out.coords["latitude"] = ("y", y)
+    else:
+        out.coords["longitude"] = (("y", "x"), x)
+        out.coords["latitude"] = (("y", "x"), y)
+    for name, da in ds.data_vars.items():
+        dims = da.dims[:-1] + ("y", "x")
+        out[name] = xr.Variable(dims, to_grid(da.values, mapsf, nx, ny), da.attrs)
+    out.attrs.update(ds.attrs)
+    return out
@@ -1,15 +1,14 @@
 from logging import warning
 import os
 
-from glob import glob
-from natsort import natsorted
+from typing import Optional
 
 from dataclasses import dataclass
-import shutil
 from textwrap import dedent as dtxt
 
 from .ww3 import WW3Base
 from .utils import (verify_runpath, verify_mod_def, verify_ww3_file)
+from .staging import stage_files, write_list
 
 
 @dataclass
@@ -31,6 +30,9 @@ class WW3Bounc(WW3Base):
     bound_interp: int = 2
     bound_verbose: int = 1
 
+    # threads used to stage the spectra files
+    max_workers: Optional[int] = None
+
     def __post_init__(self):
         """Validate the class initialization"""
 
@@ -51,19 +53,14 @@ class WW3Bounc(WW3Base):
                 warning(error)
                 os.makedirs(dst, exist_ok=True)
 
-            # copy files overs and create a list
-            filelist = []
-            fnames = natsorted(glob(os.path.join(self.bound_file, "*")))
-            for f in fnames:
-                fdst = os.path.join(dst, os.path.basename(f))
-                if not fdst:
-                    shutil.copy(f, fdst)
-                filelist.append(os.path.basename(f))
+            # link or copy new and changed files, and create a list
+            filelist, nstaged = stage_files(self.bound_file, dst,
+                                            max_workers=self.max_workers)
+            self.__setattr__("nstaged", nstaged)
 
             # write the file list
-            with open(os.path.join(self.runpath, "spec.list"), "w") as f:
-                for fname in filelist:
-                    f.write(os.path.join(lastp, fname) + "\n")
+            write_list(os.path.join(self.runpath, "spec.list"),
+                       [os.path.join(lastp, fname) for fname in filelist])
 
             self.__setattr__("bound_file", "spec.list")
 
@@ -0,0 +1,122 @@
+"""
+Output point lists along the open boundary of a child grid.
+
+The open boundary of a RECT or CURV grid is made of the cells flagged with 2
+in its mask. The open boundary of a UNST mesh is made of the nodes on edges
+that belong to a single triangle, restricted to the nodes of ``UGOBCFILE``
+if the grid has one, or else to nodes deeper than ``min_depth`` (to leave the
+coastline out). The points can be thinned to a target spacing and written as
+the ``TYPE%POINT%FILE`` of the parent :class:`pyww3.shel.WW3Shel`.
+"""
+import os
+
+import numpy as np
+
+from .geometry import grid_coordinates, read_gmsh, read_mask
+
+EARTH_RADIUS = 6371.  # km
+
+# mask value of the active boundary cells
+BOUNDARY = 2
+
+
+def mask_boundary_points(grid):
+    """Coordinates of the active boundary cells of a RECT or CURV grid."""
+    if grid.grid_type not in ["RECT", "CURV"]:
+        raise ValueError("mask_boundary_points() only works with RECT and CURV grids.")
+    if not grid.mask_filename:
+        error = "The grid has no mask file, so there is no active boundary."
+        raise ValueError(error)
+
+    mask = read_mask(grid)
+    x, y = grid_coordinates(grid)
+    if grid.grid_type == "RECT":
+        x, y = np.meshgrid(x, y)
+
+    active = mask == BOUNDARY
+    return x[active], y[active]
+
+
+def mesh_boundary_nodes(triangles):
+    """Nodes on the edges that belong to only one triangle."""
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]],
+                            triangles[:, [2, 0]]])
+    edges = np.sort(edges, axis=1)
+    unique, counts = np.unique(edges, axis=0, return_counts=True)
+    return np.unique(unique[counts == 1])
+
+
+def unst_boundary_points(grid, min_depth=None):
+    """Coordinates of the open boundary nodes of a UNST grid."""
+    if grid.grid_type != "UNST":
+        raise ValueError("unst_boundary_points() only works with UNST grids.")
+
+    ids, x, y, z, triangles = read_gmsh(os.path.join(grid.runpath, grid.unst_filename))
+    nodes = mesh_boundary_nodes(triangles)
+
+    ugobc = grid.unst_ugobcfile.strip("\'\" ")
+    if ugobc:
+        listed = np.loadtxt(os.path.join(grid.runpath, ugobc), dtype="int64", ndmin=1)
+        nodes = nodes[np.isin(ids[nodes], listed)]
+    elif min_depth is not None:
+        nodes = nodes[z[nodes] > min_depth]
+    return x[nodes], y[nodes]
+
+
+def boundary_points(grid, min_depth=None):
+    """Coordinates of the open boundary of any WW3GRid."""
+    if grid.grid_type == "UNST":
+        return unst_boundary_points(grid, min_depth)
+    return mask_boundary_points(grid)
+
+
+def thin_points(lon, lat, spacing):
+    """Keep about one point per ``spacing`` km.
+
+    The points are binned on a lon/lat grid of cells ``spacing`` km wide and
+    the point closest to the centre of each cell is kept. The order of the
+    input points is preserved.
+    """
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    if lon.size == 0:
+        return lon, lat
+
+    dlat = np.rad2deg(spacing / EARTH_RADIUS)
+    row = np.floor(lat / dlat)
+    dlon = dlat / np.maximum(np.cos(np.deg2rad((row + 0.5) * dlat)), 1e-6)
+    col = np.floor(lon / dlon)
+
+    # distance to the cell centre, in cell units
+    dist = np.hypot(lon / dlon - col - 0.5, lat / dlat - row - 0.5)
+    order = np.lexsort((dist, col, row))
+    cells = np.stack([row[order], col[order]], axis=1)
+    first = np.r_[True, (cells[1:] != cells[:-1]).any(axis=1)]
+    keep = np.sort(order[first])
+    return lon[keep], lat[keep]
+
+
+def write_point_list(filename, lon, lat, names=None, prefix="B"):
+    """Write a ww3_shel point list (``lon lat name`` lines)."""
+    if names is None:
+        width = max(3, len(str(len(lon))))
+        names = [f"{prefix}{i + 1:0{width}d}" for i in range(len(lon))]
+    lines = "".join(f"{x:.5f} {y:.5f} {name}\n" for x, y, name in zip(lon, lat, names))
+    with open(filename, "w") as f:
+        f.write(lines)
+    return filename
+
+
+def boundary_point_file(grid, filename, spacing=None, min_depth=None, prefix="B"):
+    """Write the parent point list covering the open boundary of ``grid``.
+
+    ``spacing`` (km) thins the points. The file can be given to the parent
+    ``WW3Shel(type_point_file=...)``.
+    """
+    lon, lat = boundary_points(grid, min_depth)
+    if lon.size == 0:
+        error = "The grid has no open boundary points."
+        raise ValueError(error)
+    if spacing:
+        lon, lat = thin_points(lon, lat, spacing)
+    return write_point_list(filename, lon, lat, prefix=prefix)
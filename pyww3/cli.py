@@ -2,18 +2,53 @@
 import argparse
 import sys
 
+from .pipeline import run_pipeline, pipeline_status
+
+
+def run(args):
+    """Run a pipeline file."""
+    ok = run_pipeline(args.pipeline, max_workers=args.jobs, nproc=args.nproc,
+                      resume=args.resume)
+    status(args)
+    return 0 if ok else 1
 
-def main():
-    """Console script for pyww3."""
-    parser = argparse.ArgumentParser()
-    parser.add_argument('_', nargs='*')
-    args = parser.parse_args()
 
-    print("Arguments: " + str(args._))
-    print("Replace this message by putting your code into "
-          "pyww3.cli.main")
+def status(args):
+    """Print the status of each stage of a pipeline file."""
+    stages = pipeline_status(args.pipeline)
+    width = max(len(s["name"]) for s in stages)
+    for s in stages:
+        wall = f"{s['wall']:.1f} s" if "wall" in s else ""
+        line = f"{s['name']:<{width}}  {s['program']:<9}  {s['status']:<7}  {wall}"
+        if s.get("error"):
+            line += f"  {s['error']}"
+        print(line.rstrip())
     return 0
 
 
+def main(argv=None):
+    """Console script for pyww3."""
+    parser = argparse.ArgumentParser(prog="pyww3",
+                                     description="Run pipelines of WW3 programs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prun = commands.add_parser("run", help="run a pipeline file (YAML or JSON)")
+    prun.add_argument("pipeline")
+    prun.add_argument("-j", "--jobs", type=int, default=1,
+                      help="number of stages running at the same time")
+    prun.add_argument("-n", "--nproc", type=int, default=2,
+                      help="MPI processes of the MPI stages without nproc")
+    prun.add_argument("-r", "--resume", action="store_true",
+                      help="skip the stages completed by a previous run")
+    prun.set_defaults(func=run)
+
+    pstatus = commands.add_parser("status", help="show the progress of a pipeline")
+    pstatus.add_argument("pipeline")
+    pstatus.set_defaults(func=status)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
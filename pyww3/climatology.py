@@ -0,0 +1,266 @@
+"""
+Streaming statistics (climatologies) of the ww3_ounf outputs.
+
+The files are read a few time steps at a time and folded into per-cell
+accumulators: count, mean and variance (Welford/Chan updates), maximum,
+exceedance counts and, optionally, a histogram used for approximate
+percentiles. Memory use depends on the grid size and the number of histogram
+bins only, never on the number of time steps: 32 bytes per cell and
+variable, plus 8 bytes per threshold and 4 bytes per histogram bin.
+
+Accumulators can be saved, loaded and merged, so a climatology can be
+extended month by month or computed in parallel and combined.
+"""
+import os
+import json
+
+from glob import glob
+from natsort import natsorted
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# histogram range of the usual ww3_ounf variables
+DEFAULT_RANGES = {"hs": (0., 20.), "fp": (0., 1.), "t02": (0., 25.),
+                  "t0m1": (0., 30.), "t01": (0., 25.), "dir": (0., 360.),
+                  "dp": (0., 360.), "spr": (0., 90.), "uwnd": (-50., 50.),
+                  "vwnd": (-50., 50.), "ucur": (-5., 5.), "vcur": (-5., 5.),
+                  "ice": (0., 1.), "wlv": (-10., 10.), "lm": (0., 1000.)}
+
+
+def _stamp(value):
+    """Time of a time step as recorded in the sources."""
+    return pd.Timestamp(value).isoformat()
+
+
+class Climatology():
+    """Per-cell streaming statistics of some variables.
+
+    Args:
+        variables: variable names.
+        shape: shape of one time step (e.g. (ny, nx)).
+        thresholds: dict of variable -> list of thresholds to count
+            exceedances of.
+        ranges: dict of variable -> (min, max) of the histograms. Defaults to
+            :data:`DEFAULT_RANGES`. Values outside are put in the edge bins.
+        nbins: number of histogram bins, 0 (the default) for no histograms.
+            The histograms are needed for percentiles. They take ``nbins``
+            grid-sized uint32 arrays per variable (e.g. 50 bins of a
+            1440x720 grid are 207 MB per variable) and set the percentile
+            resolution.
+
+    ``sources`` maps each file read to its last time step read.
+    """
+
+    def __init__(self, variables, shape, thresholds=None, ranges=None, nbins=0):
+        self.variables = list(variables)
+        self.shape = tuple(shape)
+        self.thresholds = {v: list((thresholds or {}).get(v, [])) for v in self.variables}
+        self.ranges = {}
+        for var in self.variables if nbins > 0 else []:
+            rng = (ranges or {}).get(var, DEFAULT_RANGES.get(var))
+            if rng is None:
+                error = f"No histogram range for \'{var}\'. Please give one in ranges."
+                raise ValueError(error)
+            self.ranges[var] = tuple(float(x) for x in rng)
+        self.nbins = nbins
+        self.sources = {}
+
+        self.count = {v: np.zeros(self.shape, dtype="int64") for v in self.variables}
+        self.mean = {v: np.zeros(self.shape) for v in self.variables}
+        self.m2 = {v: np.zeros(self.shape) for v in self.variables}
+        self.max = {v: np.full(self.shape, -np.inf) for v in self.variables}
+        self.exceed = {v: np.zeros((len(self.thresholds[v]),) + self.shape, dtype="int64")
+                       for v in self.variables}
+        self.hist = {v: np.zeros((nbins,) + self.shape, dtype="uint32")
+                     for v in self.variables}
+
+    def update(self, var, block):
+        """Add a (ntimes, *shape) block of values of ``var``."""
+        block = np.asarray(block, dtype="float64")
+        valid = np.isfinite(block)
+        nb = valid.sum(axis=0)
+        if not nb.any():
+            return
+
+        # block statistics, then Chan's combination with the running ones
+        values = np.where(valid, block, 0.)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mb = np.where(nb > 0, values.sum(axis=0) / nb, 0.)
+        m2b = np.where(valid, (block - mb) ** 2, 0.).sum(axis=0)
+
+        na = self.count[var]
+        n = na + nb
+        delta = mb - self.mean[var]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(n > 0, nb / n, 0.)
+        self.mean[var] += delta * ratio
+        self.m2[var] += m2b + delta ** 2 * na * ratio
+        self.count[var] = n
+
+        self.max[var] = np.fmax(self.max[var], np.where(valid, block, -np.inf).max(axis=0))
+        for i, threshold in enumerate(self.thresholds[var]):
+            with np.errstate(invalid="ignore"):
+                self.exceed[var][i] += (block > threshold).sum(axis=0)
+
+        if self.nbins == 0:
+            return
+        vmin, vmax = self.ranges[var]
+        with np.errstate(invalid="ignore"):
+            bins = np.floor((block - vmin) / (vmax - vmin) * self.nbins)
+        bins = np.clip(np.nan_to_num(bins), 0, self.nbins - 1).astype("int64")
+        ncells = int(np.prod(self.shape))
+        cells = np.arange(ncells).reshape(self.shape)
+        flat = (bins * ncells + cells[None])[valid]
+        counts = np.bincount(flat, minlength=self.nbins * ncells)
+        self.hist[var] += counts.reshape(self.hist[var].shape).astype("uint32")
+
+    def merge(self, other):
+        """Combine with another accumulator of the same variables and grid."""
+        if other.variables != self.variables or other.shape != self.shape or \
+                other.nbins != self.nbins or other.ranges != self.ranges or \
+                other.thresholds != self.thresholds:
+            error = "Cannot merge climatologies with different settings."
+            raise ValueError(error)
+
+        for var in self.variables:
+            na, nb = self.count[var], other.count[var]
+            n = na + nb
+            delta = other.mean[var] - self.mean[var]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ratio = np.where(n > 0, nb / n, 0.)
+            self.mean[var] += delta * ratio
+            self.m2[var] += other.m2[var] + delta ** 2 * na * ratio
+            self.count[var] = n
+            self.max[var] = np.fmax(self.max[var], other.max[var])
+            self.exceed[var] += other.exceed[var]
+            self.hist[var] += other.hist[var]
+        for fname, last in other.sources.items():
+            self.sources.setdefault(fname, last)
+        return self
+
+    def variance(self, var):
+        """Sample variance of ``var``."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count[var] > 1,
+                            self.m2[var] / (self.count[var] - 1), np.nan)
+
+    def percentile(self, var, q):
+        """Approximate percentile ``q`` (0-100) of ``var`` from the histogram.
+
+        Values are linearly interpolated inside the bins, so the error is at
+        most a bin width. Needs histograms (``nbins`` > 0).
+        """
+        if self.nbins == 0:
+            error = "Percentiles need histograms. Please give nbins > 0."
+            raise ValueError(error)
+        vmin, vmax = self.ranges[var]
+        width = (vmax - vmin) / self.nbins
+        cum = np.cumsum(self.hist[var], axis=0, dtype="int64")
+        target = q / 100. * self.count[var]
+        ibin = np.minimum((cum < target[None]).sum(axis=0), self.nbins - 1)
+        below = np.where(ibin > 0, np.take_along_axis(cum, np.maximum(ibin - 1, 0)[None], 0)[0], 0)
+        inbin = np.take_along_axis(self.hist[var], ibin[None], 0)[0].astype("float64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.clip(np.where(inbin > 0, (target - below) / inbin, 0.), 0., 1.)
+        value = vmin + (ibin + frac) * width
+        return np.where(self.count[var] > 0, value, np.nan)
+
+    def to_dataset(self, dims, coords=None, percentiles=None):
+        """Return the statistics as a xarray.Dataset with dimensions ``dims``.
+
+        ``percentiles`` default to (50, 90, 99) with histograms, none without.
+        """
+        if percentiles is None:
+            percentiles = (50, 90, 99) if self.nbins > 0 else ()
+        ds = xr.Dataset(coords=coords)
+        for var in self.variables:
+            count = self.count[var]
+            ds[f"{var}_count"] = (dims, count)
+            ds[f"{var}_mean"] = (dims, np.where(count > 0, self.mean[var], np.nan))
+            ds[f"{var}_std"] = (dims, np.sqrt(self.variance(var)))
+            ds[f"{var}_max"] = (dims, np.where(count > 0, self.max[var], np.nan))
+            for q in percentiles:
+                ds[f"{var}_p{q:g}"] = (dims, self.percentile(var, q))
+            for i, threshold in enumerate(self.thresholds[var]):
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    ds[f"{var}_exceed_{threshold:g}"] = (dims, self.exceed[var][i] / count)
+        ds.attrs["sources"] = json.dumps(self.sources)
+        return ds
+
+    def save(self, filename):
+        """Save the accumulator to a .npz file."""
+        arrays = {}
+        for var in self.variables:
+            for name in ["count", "mean", "m2", "max", "exceed", "hist"]:
+                arrays[f"{var}/{name}"] = getattr(self, name)[var]
+        meta = {"variables": self.variables, "shape": self.shape,
+                "thresholds": self.thresholds, "ranges": self.ranges,
+                "nbins": self.nbins, "sources": self.sources}
+        with open(filename, "wb") as f:
+            np.savez_compressed(f, meta=json.dumps(meta), **arrays)
+
+    @classmethod
+    def load(cls, filename):
+        """Load an accumulator saved with :meth:`save`."""
+        with np.load(filename) as data:
+            meta = json.loads(str(data["meta"]))
+            clim = cls(meta["variables"], meta["shape"], meta["thresholds"],
+                       meta["ranges"], meta["nbins"])
+            clim.sources = meta["sources"]
+            if isinstance(clim.sources, list):
+                # older states did not record the last time of the files
+                clim.sources = {fname: None for fname in clim.sources}
+            for var in clim.variables:
+                for name in ["count", "mean", "m2", "max", "exceed", "hist"]:
+                    getattr(clim, name)[var] = data[f"{var}/{name}"]
+        return clim
+
+
+def accumulate(files, variables, climatology=None, time="time", chunk=24,
+               **kwargs):
+    """Fold netCDF files into a :class:`Climatology`.
+
+    Only the time steps after the last one read from each file (recorded in
+    ``climatology.sources``) are added, so calling this again with the whole
+    archive adds the new files and the new time steps of the files that grew
+    (e.g. the current TIMESPLIT file of a running hindcast). The other
+    keyword arguments are passed to :class:`Climatology`.
+    """
+    for fname in natsorted(files):
+        key = os.path.abspath(fname)
+        with xr.open_dataset(fname) as ds:
+            times = ds[time].values
+            if times.size == 0:
+                continue
+            start = 0
+            if climatology is not None and key in climatology.sources:
+                last = climatology.sources[key]
+                if last is None or last == _stamp(times[-1]):
+                    continue
+                start = int(np.searchsorted(times, np.datetime64(last), side="right"))
+            if climatology is None:
+                shape = ds[variables[0]].isel({time: 0}).shape
+                climatology = Climatology(variables, shape, **kwargs)
+            for t in range(start, times.size, chunk):
+                for var in variables:
+                    climatology.update(var, ds[var].isel({time: slice(t, t + chunk)}).values)
+        climatology.sources[key] = _stamp(times[-1])
+    return climatology
+
+
+def outputs_climatology(runpath, prefix, variables, state=None, **kwargs):
+    """Climatology of the files ``runpath/prefix*.nc``.
+
+    If ``state`` is a file name, the accumulator is loaded from it (if it
+    exists), updated with the new files and saved back.
+    """
+    files = glob(os.path.join(runpath, prefix + "*.nc"))
+    climatology = None
+    if state is not None and os.path.isfile(state):
+        climatology = Climatology.load(state)
+    climatology = accumulate(files, variables, climatology, **kwargs)
+    if state is not None and climatology is not None:
+        climatology.save(state)
+    return climatology
@@ -0,0 +1,234 @@
+"""
+Parametric (Holland, 1980) tropical cyclone wind fields.
+
+A storm track is any table-like object (a dict of arrays or a
+pandas.DataFrame) with the columns:
+
+    time: datetime-like
+    lon, lat: storm centre, in degrees
+    pc: central pressure, in hPa
+    rmax: radius of maximum winds, in km
+    vmax: maximum sustained 10 m wind speed, in m/s (optional)
+
+The wind field is computed on a regular lon/lat grid with numpy broadcasting
+and written one time step at a time to a netCDF file that can be given to
+``WW3Prnc(forcing_field="WINDS", file_var_1="u10", file_var_2="v10", ...)``.
+"""
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import netCDF4
+
+RHO_AIR = 1.15  # kg/m3
+EARTH_RADIUS = 6371.  # km
+OMEGA = 7.292e-5  # rad/s
+SURFACE_FACTOR = 0.8  # ratio of the 10 m to the gradient-level wind speed
+
+TIME_UNITS = "hours since 1990-01-01 00:00:00"
+
+
+def holland_b(vmax, dp, rho=RHO_AIR):
+    """Holland's shape parameter B from the maximum wind and pressure drop (Pa)."""
+    b = rho * np.e * np.asarray(vmax) ** 2 / np.maximum(dp, 1.)
+    return np.clip(b, 1., 2.5)
+
+
+def holland_profile(r, rmax, dp, b, f, rho=RHO_AIR):
+    """Gradient wind speed (m/s) at a distance ``r`` (km) from the centre.
+
+    ``dp`` is the pressure drop in Pa and ``f`` the Coriolis parameter.
+    """
+    r = np.maximum(r, 1e-3)
+    x = (rmax / r) ** b
+    rf = r * 1000. * np.abs(f) / 2.
+    return np.sqrt(b / rho * x * dp * np.exp(-x) + rf ** 2) - rf
+
+
+def wind_field(lon, lat, lon_c, lat_c, pc, rmax, vmax=None, vt_u=0., vt_v=0.,
+               pn=1010., inflow=20., surface_factor=SURFACE_FACTOR):
+    """Compute u10 and v10 (m/s) on a regular grid for one storm position.
+
+    The Holland profile gives the gradient-level wind, which is reduced to
+    10 m by ``surface_factor`` and turned towards the centre by ``inflow``.
+
+    Args:
+        lon, lat: 1D grid coordinates.
+        lon_c, lat_c: storm centre.
+        pc, pn: central and environmental pressure, in hPa.
+        rmax: radius of maximum winds, in km.
+        vmax: maximum 10 m wind speed, used to set Holland's B. B defaults
+            to 1.5.
+        vt_u, vt_v: storm translation velocity (m/s).
+        inflow: inflow angle, in degrees.
+        surface_factor: ratio of the 10 m to the gradient-level wind speed.
+            Use 1 to get the gradient-level winds.
+    """
+    lon = np.asarray(lon, dtype="float64")[None, :]
+    lat = np.asarray(lat, dtype="float64")[:, None]
+
+    # local cartesian distances (km) from the centre
+    dlon = (lon - lon_c + 180.) % 360. - 180.
+    dx = np.deg2rad(dlon) * EARTH_RADIUS * np.cos(np.deg2rad(lat_c))
+    dy = np.deg2rad(lat - lat_c) * EARTH_RADIUS
+    r = np.maximum(np.hypot(dx, dy), 1e-3)
+
+    dp = max(pn - pc, 0.) * 100.
+    b = 1.5 if vmax is None or np.isnan(vmax) else holland_b(vmax / surface_factor, dp)
+    f = 2 * OMEGA * np.sin(np.deg2rad(lat_c))
+    speed = surface_factor * holland_profile(r, rmax, dp, b, f)
+
+    # cyclonic rotation: anticlockwise in the north, clockwise in the south
+    sign = 1. if lat_c >= 0 else -1.
+    beta = np.deg2rad(inflow)
+    tx, ty = -sign * dy / r, sign * dx / r
+    rx, ry = dx / r, dy / r
+    u = speed * (np.cos(beta) * tx - np.sin(beta) * rx)
+    v = speed * (np.cos(beta) * ty - np.sin(beta) * ry)
+
+    # add the translation, weighted by the relative intensity
+    weight = speed / max(speed.max(), 1e-6)
+    return u + vt_u * weight, v + vt_v * weight
+
+
+def interpolate_track(track, times):
+    """Interpolate a track table to the requested times.
+
+    Also returns the translation velocity (m/s) of the storm. Longitudes are
+    unwrapped before the interpolation, so tracks can cross the dateline.
+    """
+    ttrack = np.asarray(track["time"], dtype="datetime64[s]").astype("float64")
+    t = np.asarray(times, dtype="datetime64[s]").astype("float64")
+
+    out = {}
+    for key in ["lon", "lat", "pc", "rmax", "vmax"]:
+        if key in track:
+            out[key] = np.interp(t, ttrack, np.asarray(track[key], dtype="float64"))
+        else:
+            out[key] = np.full(t.shape, np.nan)
+
+    lon = np.asarray(track["lon"], dtype="float64")
+    unwrapped = np.rad2deg(np.unwrap(np.deg2rad(lon)))
+    # back to the longitude convention of the track
+    west = 0. if lon.min() >= 0. else -180.
+    out["lon"] = (np.interp(t, ttrack, unwrapped) - west) % 360. + west
+
+    # translation speed from the track itself
+    lat = np.asarray(track["lat"], dtype="float64")
+    if ttrack.size > 1:
+        dt = np.gradient(ttrack)
+        cu = np.gradient(np.deg2rad(unwrapped)) * EARTH_RADIUS * 1000. * \
+            np.cos(np.deg2rad(lat)) / dt
+        cv = np.gradient(np.deg2rad(lat)) * EARTH_RADIUS * 1000. / dt
+    else:
+        cu = cv = np.zeros(ttrack.shape)
+    out["vt_u"] = np.interp(t, ttrack, cu)
+    out["vt_v"] = np.interp(t, ttrack, cv)
+
+    return out
+
+
+def write_wind_forcing(track, lon, lat, times, filename, pn=1010.,
+                       inflow=20., surface_factor=SURFACE_FACTOR):
+    """Write the 10 m wind field of a storm track to a netCDF forcing file.
+
+    The file is written one time step at a time, so memory use does not
+    depend on the number of time steps.
+    """
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    times = np.asarray(times, dtype="datetime64[s]")
+    storm = interpolate_track(track, times)
+
+    with netCDF4.Dataset(filename, "w") as nc:
+        nc.createDimension("time", None)
+        nc.createDimension("latitude", lat.size)
+        nc.createDimension("longitude", lon.size)
+
+        t = nc.createVariable("time", "f8", ("time",))
+        t.units = TIME_UNITS
+        t.calendar = "standard"
+        x = nc.createVariable("longitude", "f8", ("longitude",))
+        x.units = "degrees_east"
+        x[:] = lon
+        y = nc.createVariable("latitude", "f8", ("latitude",))
+        y.units = "degrees_north"
+        y[:] = lat
+
+        components = []
+        for name, long_name in [("u10", "10 metre U wind component"),
+                                ("v10", "10 metre V wind component")]:
+            var = nc.createVariable(name, "f4", ("time", "latitude", "longitude"),
+                                    zlib=True, shuffle=True,
+                                    chunksizes=(1, lat.size, lon.size))
+            var.units = "m s**-1"
+            var.long_name = long_name
+            components.append(var)
+
+        for i, time in enumerate(times):
+            u, v = wind_field(lon, lat,
+                              storm["lon"][i], storm["lat"][i],
+                              storm["pc"][i], storm["rmax"][i], storm["vmax"][i],
+                              storm["vt_u"][i], storm["vt_v"][i],
+                              pn=pn, inflow=inflow, surface_factor=surface_factor)
+            t[i] = netCDF4.date2num(time.astype(object), TIME_UNITS, "standard")
+            components[0][i] = u
+            components[1][i] = v
+
+    return filename
+
+
+def perturb_track(track, n, seed=None, sigma_position=50., sigma_pc=5.,
+                  sigma_rmax=0.2, pn=1010.):
+    """Build ``n`` perturbed copies of a track.
+
+    Each member gets a constant random shift of its position (km), central
+    pressure (hPa) and a log-normal scaling of its radius of maximum winds.
+    If the track has ``vmax``, it is scaled by sqrt(dp_new / dp_old), with
+    dp = pn - pc, so the members keep the Holland B of the track.
+    """
+    rng = np.random.default_rng(seed)
+    lat = np.asarray(track["lat"], dtype="float64")
+    pc = np.asarray(track["pc"], dtype="float64")
+
+    members = []
+    for _ in range(n):
+        dx, dy = rng.normal(0., sigma_position, 2)
+        member = {key: np.asarray(track[key]) for key in track.keys()}
+        member["lat"] = lat + np.rad2deg(dy / EARTH_RADIUS)
+        member["lon"] = np.asarray(track["lon"], dtype="float64") + \
+            np.rad2deg(dx / (EARTH_RADIUS * np.cos(np.deg2rad(lat))))
+        member["pc"] = pc + rng.normal(0., sigma_pc)
+        if "vmax" in track:
+            # dp is bounded by 1 Pa as in holland_b
+            member["vmax"] = np.asarray(track["vmax"], dtype="float64") * \
+                np.sqrt(np.maximum(pn - member["pc"], 0.01) / np.maximum(pn - pc, 0.01))
+        member["rmax"] = np.asarray(track["rmax"], dtype="float64") * \
+            np.exp(rng.normal(0., sigma_rmax))
+        members.append(member)
+
+    return members
+
+
+def generate_ensemble(tracks, lon, lat, times, outpath, prefix="member",
+                      max_workers=None, pn=1010., inflow=20.,
+                      surface_factor=SURFACE_FACTOR):
+    """Write one forcing file per track using a process pool.
+
+    ``pn``, ``inflow`` and ``surface_factor`` are passed to
+    :func:`write_wind_forcing`. Returns the list of files, in the same order
+    as ``tracks``.
+    """
+    os.makedirs(outpath, exist_ok=True)
+    fnames = [os.path.join(outpath, f"{prefix}_{i:04d}.nc")
+              for i in range(len(tracks))]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        jobs = [pool.submit(write_wind_forcing, track, lon, lat, times, fname, pn,
+                            inflow, surface_factor)
+                for track, fname in zip(tracks, fnames)]
+        for job in jobs:
+            job.result()
+
+    return fnames
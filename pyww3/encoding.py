@@ -0,0 +1,110 @@
+"""
+Encoding policy for the netCDF forcing files written by pyww3.
+
+Each variable gets a precision budget (the largest absolute error that is
+acceptable). If int16 packing with scale_factor/add_offset fits in that
+budget the variable is packed, otherwise it is stored as float32. Everything
+is zlib/shuffle compressed and chunked one time step at a time, which is how
+ww3_prnc reads the data.
+"""
+import numpy as np
+
+# largest acceptable absolute error, in the units of the variable
+PRECISION = {"u10": 0.01,
+             "v10": 0.01,
+             "siconc": 0.001,
+             "ci": 0.001,
+             "uo": 0.001,
+             "vo": 0.001,
+             "zos": 0.001}
+
+INT16_FILL = -32768
+INT16_LEVELS = 2 ** 16 - 2  # one value is reserved for _FillValue
+
+
+def _minmax(da, time="time", chunk=24):
+    """Data range of a variable, reading ``chunk`` time steps at a time."""
+    if time not in da.dims:
+        values = da.values
+        return np.nanmin(values), np.nanmax(values)
+
+    vmin, vmax = np.inf, -np.inf
+    for t in range(0, da.sizes[time], chunk):
+        values = da.isel({time: slice(t, t + chunk)}).values
+        if np.isfinite(values).any():
+            vmin = min(vmin, np.nanmin(values))
+            vmax = max(vmax, np.nanmax(values))
+    return vmin, vmax
+
+
+def pack_parameters(vmin, vmax, precision):
+    """Return (scale_factor, add_offset) if int16 packing fits the budget.
+
+    Returns None if the quantization error (half a packing step) would be
+    larger than ``precision``.
+    """
+    if not (np.isfinite(vmin) and np.isfinite(vmax)):
+        return None
+
+    scale = (vmax - vmin) / INT16_LEVELS
+    if scale == 0:
+        scale = precision
+    if scale / 2 > precision:
+        return None
+
+    return float(scale), float((vmax + vmin) / 2)
+
+
+def variable_encoding(da, precision=None, complevel=4, time="time"):
+    """Encoding dictionary for one variable."""
+    encoding = {"zlib": True,
+                "shuffle": True,
+                "complevel": complevel,
+                "chunksizes": tuple(1 if dim == time else size
+                                    for dim, size in zip(da.dims, da.shape))}
+
+    if da.dtype.kind != "f":
+        return encoding
+
+    packing = None
+    if precision is not None:
+        packing = pack_parameters(*_minmax(da, time), precision)
+
+    if packing:
+        encoding.update({"dtype": "int16",
+                         "scale_factor": packing[0],
+                         "add_offset": packing[1],
+                         "_FillValue": INT16_FILL})
+    else:
+        encoding.update({"dtype": "float32"})
+
+    return encoding
+
+
+def forcing_encoding(ds, precision=None, complevel=4, time="time"):
+    """Build the ``to_netcdf`` encoding for all data variables of a dataset.
+
+    Args:
+        ds: the dataset to be written.
+        precision: budget per variable name. Updates :data:`PRECISION`.
+        complevel: zlib compression level.
+        time: name of the time dimension.
+    """
+    budget = dict(PRECISION)
+    if precision:
+        budget.update(precision)
+
+    return {var: variable_encoding(ds[var], budget.get(var), complevel, time)
+            for var in ds.data_vars if ds[var].ndim > 0}
+
+
+def write_forcing(ds, path, precision=None, complevel=4, time="time"):
+    """Write a forcing dataset using the encoding policy.
+
+    Encodings inherited from the source file (e.g. its own packing) are
+    discarded first so that they do not clash with the new ones.
+    """
+    for var in ds.data_vars:
+        ds[var].encoding = {}
+    encoding = forcing_encoding(ds, precision, complevel, time)
+    ds.to_netcdf(path, encoding=encoding)
@@ -0,0 +1,111 @@
+"""
+Time series at many stations from the gridded ww3_ounf outputs.
+
+The interpolation weights of all stations are computed once with
+:func:`pyww3.regrid.compute_weights`. Each file is then read once, only over
+the rows spanned by the stations, and all stations are gathered with a
+single fancy-indexing operation. Files are processed from a thread pool.
+
+A station table is any table-like object (a dict of arrays or a
+pandas.DataFrame) with the columns ``name``, ``lon`` and ``lat``.
+"""
+from typing import Any
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import xarray as xr
+
+from .regrid import compute_weights, apply_weights
+
+
+@dataclass
+class PointExtractor():
+    """Extract time series at stations from regular lat/lon grids."""
+
+    lon: np.ndarray
+    lat: np.ndarray
+    stations: Any
+    method: str = "bilinear"
+
+    def __post_init__(self):
+        """Compute the interpolation weights."""
+        self.__setattr__("lon", np.asarray(self.lon, dtype="float64"))
+        self.__setattr__("lat", np.asarray(self.lat, dtype="float64"))
+        if self.lon.ndim != 1 or self.lat.ndim != 1:
+            error = "Only regular grids (1D longitude and latitude) are supported."
+            raise ValueError(error)
+
+        names = [str(n) for n in self.stations["name"]]
+        slon = np.asarray(self.stations["lon"], dtype="float64")
+        slat = np.asarray(self.stations["lat"], dtype="float64")
+        index, weight = compute_weights(self.lon, self.lat, slon, slat, self.method)
+
+        outside = np.isnan(weight).any(axis=1)
+        if outside.any():
+            error = (f"{outside.sum()} stations are outside of the grid, "
+                     f"e.g. \'{names[np.where(outside)[0][0]]}\'.")
+            raise ValueError(error)
+
+        # only the rows spanned by the stations are read
+        rows = index // self.lon.size
+        self.__setattr__("row0", int(rows.min()))
+        self.__setattr__("row1", int(rows.max()) + 1)
+        self.__setattr__("index", index - self.row0 * self.lon.size)
+        self.__setattr__("weight", weight)
+        self.__setattr__("names", names)
+        self.__setattr__("station_lon", slon)
+        self.__setattr__("station_lat", slat)
+
+    @classmethod
+    def from_file(cls, fname, stations, method="bilinear", lon="longitude",
+                  lat="latitude"):
+        """Build an extractor on the grid of a netCDF file."""
+        with xr.open_dataset(fname) as ds:
+            return cls(ds[lon].values, ds[lat].values, stations, method)
+
+    def extract_file(self, fname, variables, time="time", lat="latitude",
+                     chunk=None):
+        """Time series of ``variables`` at the stations, from one file.
+
+        ``chunk`` limits the number of time steps read at once.
+        """
+        out = {}
+        with xr.open_dataset(fname) as ds:
+            times = ds[time].values
+            step = chunk or max(times.size, 1)
+            for var in variables:
+                da = ds[var].isel({lat: slice(self.row0, self.row1)})
+                parts = [apply_weights(da.isel({time: slice(t, t + step)}).values,
+                                       self.index, self.weight)
+                         for t in range(0, times.size, step)]
+                out[var] = (np.concatenate(parts) if parts else
+                            np.empty((0, len(self.names)))).T
+            attrs = {var: ds[var].attrs for var in variables}
+
+        result = xr.Dataset(coords={"station": np.arange(len(self.names)),
+                                    time: times,
+                                    "station_name": ("station", self.names),
+                                    "longitude": ("station", self.station_lon),
+                                    "latitude": ("station", self.station_lat)})
+        for var in variables:
+            result[var] = xr.Variable(("station", time), out[var], attrs[var])
+        return result
+
+    def extract(self, files, variables, time="time", max_workers=None,
+                chunk=None):
+        """Time series of ``variables`` at the stations, from many files.
+
+        The files are read concurrently and the results concatenated along
+        time, in time order.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(lambda f: self.extract_file(f, variables, time,
+                                                              chunk=chunk), files))
+        parts = [p for p in parts if p.sizes[time]]
+        if not parts:
+            error = "No time steps in the files."
+            raise ValueError(error)
+        out = xr.concat(parts, dim=time, data_vars="minimal", coords="minimal",
+                        compat="override")
+        return out.sortby(time)
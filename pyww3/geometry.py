@@ -0,0 +1,164 @@
+"""
+Helpers to recover the model grid geometry from a WW3GRid instance.
+"""
+import os
+
+import numpy as np
+
+
+def rect_coordinates(grid):
+    """Return the 1D longitudes (x) and latitudes (y) of a RECT grid."""
+    if grid.grid_type != "RECT":
+        raise ValueError("rect_coordinates() only works with RECT grids.")
+
+    x = grid.rect_x0 / grid.rect_sf0 + \
+        np.arange(grid.rect_nx) * grid.rect_sx / grid.rect_sf
+    y = grid.rect_y0 / grid.rect_sf0 + \
+        np.arange(grid.rect_ny) * grid.rect_sy / grid.rect_sf
+    return x, y
+
+
+def read_ascii_field(runpath, filename, nx, ny, sf=1., off=0., idla=1, idfm=1):
+    """Read a (ny, nx) ascii field, returned with the rows from south.
+
+    ``idla`` and ``idfm`` are the layout and format of the file as given to
+    ww3_grid. Only free format files (IDFM=1) can be read. With IDLA=1 or 2
+    the rows are written from south to north, with IDLA=3 or 4 from north
+    to south.
+    """
+    if idfm != 1:
+        error = f"Only free format files (IDFM=1) can be read, \'{filename}\' has IDFM={idfm}."
+        raise ValueError(error)
+    if idla not in [1, 2, 3, 4]:
+        error = f"IDLA must be 1, 2, 3 or 4, \'{filename}\' has IDLA={idla}."
+        raise ValueError(error)
+
+    fname = os.path.join(runpath, filename)
+    if not os.path.isfile(fname):
+        error = f"No such file or directory \'{fname}\'."
+        raise ValueError(error)
+
+    values = np.loadtxt(fname).ravel()
+    if values.size != nx * ny:
+        error = (f"File \'{fname}\' has {values.size} values, "
+                 f"expected {nx * ny} ({ny} rows by {nx} columns).")
+        raise ValueError(error)
+    values = values.reshape(ny, nx)
+    if idla in [3, 4]:
+        values = values[::-1]
+    return values * sf + off
+
+
+def grid_shape(grid):
+    """Return (ny, nx) of a RECT or CURV grid."""
+    if grid.grid_type == "RECT":
+        return grid.rect_ny, grid.rect_nx
+    return grid.curv_ny, grid.curv_nx
+
+
+def read_mask(grid):
+    """Read the (ny, nx) mask file of a RECT or CURV grid."""
+    ny, nx = grid_shape(grid)
+    return read_ascii_field(grid.runpath, grid.mask_filename, nx, ny,
+                            idla=grid.mask_idla, idfm=grid.mask_idfm)
+
+
+def read_depth(grid):
+    """Read the (ny, nx) bottom levels of a RECT or CURV grid."""
+    ny, nx = grid_shape(grid)
+    return read_ascii_field(grid.runpath, grid.depth_filename, nx, ny, grid.depth_sf,
+                            idla=grid.depth_dla, idfm=grid.depth_dfm)
+
+
+def curv_coordinates(grid):
+    """Return the 2D longitudes (x) and latitudes (y) of a CURV grid."""
+    if grid.grid_type != "CURV":
+        raise ValueError("curv_coordinates() only works with CURV grids.")
+
+    x = read_ascii_field(grid.runpath, grid.curv_xcoord_filename,
+                         grid.curv_nx, grid.curv_ny,
+                         grid.curv_xcoord_sf, grid.curv_xcoord_off,
+                         grid.curv_xcoord_idla, grid.curv_xcoord_idfm)
+    y = read_ascii_field(grid.runpath, grid.curv_ycoord_filename,
+                         grid.curv_nx, grid.curv_ny,
+                         grid.curv_ycoord_sf, grid.curv_ycoord_off,
+                         grid.curv_ycoord_idla, grid.curv_ycoord_idfm)
+    return x, y
+
+
+def sea_points(grid):
+    """Return the (nsea, 2) zero-based (iy, ix) positions of the sea points.
+
+    The sea points are numbered as in the model: row by row from the south,
+    west to east. They are the points flagged 1 (sea) or 2 (active boundary)
+    in the mask file or, without a mask, the points whose bottom level is
+    below ``grid_zlim``. Without a mask or depth file all points are sea.
+    """
+    if grid.grid_type == "UNST":
+        raise ValueError("sea_points() does not work with UNST grids.")
+
+    if grid.mask_filename:
+        sea = np.isin(read_mask(grid), [1, 2])
+    elif grid.depth_filename:
+        sea = read_depth(grid) < grid.grid_zlim
+    else:
+        sea = np.ones(grid_shape(grid), dtype=bool)
+    return np.argwhere(sea)
+
+
+def read_gmsh(filename):
+    """Read nodes and triangles from an ascii gmsh (v2) mesh.
+
+    Returns node ids, x, y, z and a (ntri, 3) array of zero-based
+    triangle node indices.
+    """
+    if not os.path.isfile(filename):
+        error = f"No such file or directory \'{filename}\'."
+        raise ValueError(error)
+
+    with open(filename, "r") as f:
+        lines = f.read().splitlines()
+
+    try:
+        i = lines.index("$Nodes")
+        nnodes = int(lines[i + 1])
+        nodes = np.array([ln.split()[:4] for ln in lines[i + 2:i + 2 + nnodes]],
+                         dtype="float64")
+
+        j = lines.index("$Elements")
+        nelem = int(lines[j + 1])
+        elements = [ln.split() for ln in lines[j + 2:j + 2 + nelem]]
+    except (ValueError, IndexError):
+        error = f"Could not parse \'{filename}\' as a gmsh v2 ascii mesh."
+        raise ValueError(error)
+
+    # element type 2 is a 3-node triangle. The node list comes after the
+    # element number, type, number of tags and the tags themselves.
+    triangles = [e[3 + int(e[2]):3 + int(e[2]) + 3] for e in elements
+                 if e[1] == "2"]
+    triangles = np.array(triangles, dtype="int64").reshape(-1, 3)
+
+    ids = nodes[:, 0].astype("int64")
+    lookup = np.zeros(ids.max() + 1, dtype="int64")
+    lookup[ids] = np.arange(ids.size)
+
+    return ids, nodes[:, 1], nodes[:, 2], nodes[:, 3], lookup[triangles]
+
+
+def unst_coordinates(grid):
+    """Return the node longitudes (x) and latitudes (y) of a UNST grid."""
+    if grid.grid_type != "UNST":
+        raise ValueError("unst_coordinates() only works with UNST grids.")
+
+    _, x, y, _, _ = read_gmsh(os.path.join(grid.runpath, grid.unst_filename))
+    return x, y
+
+
+def grid_coordinates(grid):
+    """Return the coordinates of any WW3GRid, whatever its grid_type."""
+    if grid.grid_type == "RECT":
+        return rect_coordinates(grid)
+    elif grid.grid_type == "CURV":
+        return curv_coordinates(grid)
+    else:
+        return unst_coordinates(grid)
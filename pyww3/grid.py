@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from textwrap import dedent as dtxt
 
 from .ww3 import WW3Base
+from .timestep import cfl_timesteps
 from .utils import (bool_to_str, verify_runpath, verify_ww3_file)
 
 
@@ -172,6 +173,17 @@ class WW3GRid(WW3Base):
 
         self.__setattr__("text", self.populate_namelist())
 
+    def optimise_timesteps(self, cfl=0.9, current=0., dtmax_ratio=3, dtmin=10.):
+        """Set the largest stable timesteps and update the namelist text.
+
+        See :func:`pyww3.timestep.cfl_timesteps`.
+        """
+        steps = cfl_timesteps(self, cfl, current, dtmax_ratio, dtmin)
+        for key, value in steps.items():
+            self.__setattr__(f"timesteps_{key}", value)
+        self.__setattr__("text", self.populate_namelist())
+        return steps
+
     # NOTE: I am doing this this way instead of reading it from a file
     # because f-strings in a file allow for arbitrary code execution,
     # and are thefore a security issue. Writting everything here at
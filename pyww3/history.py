@@ -0,0 +1,279 @@
+"""
+Run history database and runtime cost model.
+
+Every :meth:`pyww3.ww3.WW3Base.run` is recorded in a local SQLite database
+with the features of its configuration (grid size, sea points, spectral grid,
+timesteps, simulated duration, nproc, forcing and output fields) and its
+measured cost (wall time, core time and bytes of the outputs it wrote).
+
+The database defaults to ``~/.pyww3/history.sqlite`` and can be changed with
+the ``PYWW3_HISTORY`` environment variable (set it to ``off`` to disable the
+recording). Grid features that are not known before a run (e.g. the number
+of sea points) are taken from earlier runs with the same mod_def.
+
+The cost model fits, for each program, the wall time as
+
+    wall = startup + rate * work / nproc + overhead * nproc
+
+where ``work`` is the number of sea point x spectral bin updates (ww3_shel)
+or of output values (ww3_ounf, ww3_ounp), and the output volume as linear in
+the number of output values.
+"""
+import os
+import glob
+import sqlite3
+import datetime
+
+from contextlib import closing
+from logging import warning
+
+import numpy as np
+
+from .binary import FortranFile, read_out_grd_header
+from .scaling import mod_def_hash, nonnegative_lstsq
+
+DEFAULT_DATABASE = os.path.join("~", ".pyww3", "history.sqlite")
+
+COLUMNS = {"started": "TEXT", "exe": "TEXT", "runpath": "TEXT", "mod_def": "TEXT",
+           "nx": "INTEGER", "ny": "INTEGER", "nsea": "INTEGER", "nk": "INTEGER",
+           "nth": "INTEGER", "dtmax": "REAL", "dtxy": "REAL", "duration": "REAL",
+           "nproc": "INTEGER", "forcing": "TEXT", "nfields": "INTEGER",
+           "noutputs": "INTEGER", "work": "REAL", "output_work": "REAL",
+           "wall": "REAL", "core": "REAL", "output_bytes": "INTEGER",
+           "returncode": "INTEGER"}
+
+# features describing the model grid, shared by all runs of a mod_def
+GRID_FEATURES = ["nx", "ny", "nsea", "nk", "nth", "dtmax", "dtxy"]
+
+# output files of each program, relative to its run path. Fields of the
+# program instance are substituted, e.g. {file_prefix}.
+OUTPUT_PATTERNS = {"ww3_grid": ["mod_def.ww3"],
+                   "ww3_prnc": ["wind.ww3", "current.ww3", "level.ww3", "ice.ww3",
+                                "ice[1-5].ww3", "mud[1-3].ww3", "rhoa.ww3",
+                                "momentum.ww3", "data[0-2].ww3"],
+                   "ww3_shel": ["out_grd.*", "out_pnt.*", "track_o.*", "restart*.*",
+                                "nest*.*", "partition.*", "log.*"],
+                   "ww3_ounf": ["{file_prefix}*.nc"],
+                   "ww3_ounp": ["{file_prefix}*.nc"],
+                   "ww3_bounc": ["nest.ww3"]}
+
+# programs whose outputs are also searched in the subdirectories of the run
+# path (the others write them in the run path only)
+RECURSIVE_OUTPUTS = ["ww3_ounf", "ww3_ounp"]
+
+
+def database_path(database=None):
+    """Path to the history database, or None if the recording is disabled."""
+    database = database or os.environ.get("PYWW3_HISTORY", DEFAULT_DATABASE)
+    if database.lower() in ["off", "none", "0", ""]:
+        return None
+    return os.path.expanduser(database)
+
+
+def connect(database=None):
+    """Open (and create if needed) the history database."""
+    fname = database_path(database)
+    if fname is None:
+        error = "The run history is disabled (PYWW3_HISTORY=off)."
+        raise ValueError(error)
+    os.makedirs(os.path.dirname(os.path.abspath(fname)), exist_ok=True)
+    con = sqlite3.connect(fname, timeout=30.)
+    con.row_factory = sqlite3.Row
+    columns = ", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())
+    con.execute(f"CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, {columns})")
+    return con
+
+
+def _grid_header(runpath):
+    """nx, ny and nsea from the out_grd.ww3 of a run path, if any."""
+    fname = os.path.join(runpath, "out_grd.ww3")
+    if not os.path.isfile(fname):
+        return {}
+    try:
+        head = read_out_grd_header(FortranFile(fname))
+    except Exception:
+        return {}
+    return {"nx": head["nx"], "ny": head["ny"], "nsea": head["nsea"]}
+
+
+def known_grid(mod_def, database=None):
+    """Grid features recorded by earlier runs with this mod_def hash."""
+    fname = database_path(database)
+    if fname is None or not os.path.isfile(fname):
+        return {}
+    with closing(connect(database)) as con, con:
+        rows = con.execute(f"SELECT {', '.join(GRID_FEATURES)} FROM runs WHERE mod_def = ? "
+                           "ORDER BY id DESC", (mod_def,)).fetchall()
+    # the latest value of each feature, e.g. nk from ww3_grid and nsea from ww3_shel
+    features = {}
+    for row in rows:
+        for key in GRID_FEATURES:
+            if row[key] is not None:
+                features.setdefault(key, row[key])
+    return features
+
+
+def run_features(program, nproc=1, grid=None, database=None):
+    """Configuration features of a program instance.
+
+    Args:
+        program: any :class:`pyww3.ww3.WW3Base` instance.
+        nproc: number of MPI processes.
+        grid: the :class:`pyww3.grid.WW3GRid` of the run, if available.
+        database: the history database, to look up the grid features.
+    """
+    features = {"exe": program.EXE, "runpath": os.path.abspath(program.runpath),
+                "nproc": int(nproc)}
+
+    mod_def = os.path.join(program.runpath, "mod_def.ww3")
+    if os.path.isfile(mod_def):
+        features["mod_def"] = mod_def_hash(mod_def)
+        features.update(known_grid(features["mod_def"], database))
+    if grid is None and program.EXE == "ww3_grid":
+        grid = program
+    if grid is not None:
+        if grid.grid_type != "UNST":
+            nx = grid.rect_nx if grid.grid_type == "RECT" else grid.curv_nx
+            ny = grid.rect_ny if grid.grid_type == "RECT" else grid.curv_ny
+            features.update({"nx": nx, "ny": ny})
+        features.update({"nk": grid.spectrum_nk,
+                         "nth": grid.spectrum_nth, "dtmax": grid.timesteps_dtmax,
+                         "dtxy": grid.timesteps_dtxy})
+    features.update(_grid_header(program.runpath))
+    nsea = features.get("nsea") or (features.get("nx", 0) * features.get("ny", 0))
+
+    if program.EXE == "ww3_shel":
+        duration = (program.domain_stop - program.domain_start).total_seconds()
+        forcing = [name[len("input_forcing_"):] for name, value in vars(program).items()
+                   if name.startswith("input_forcing_") and value]
+        nfields = len(program.type_field_list) if program.date_field_stride > 0 else 0
+        noutputs = int(duration // program.date_field_stride) + 1 \
+            if program.date_field_stride > 0 else 0
+        features.update({"duration": duration, "forcing": ",".join(forcing),
+                         "nfields": nfields, "noutputs": noutputs})
+        if features.get("dtmax"):
+            nbins = features.get("nk", 0) * features.get("nth", 0)
+            features["work"] = nsea * nbins * duration / features["dtmax"]
+        features["output_work"] = nsea * nfields * noutputs
+    elif program.EXE in ["ww3_ounf", "ww3_ounp"]:
+        if program.EXE == "ww3_ounf":
+            nfields = len(program.field_list)
+            try:
+                noutputs = min(program.field_timecount, len(program.output_times()))
+            except Exception:
+                noutputs = None
+        else:
+            nfields, noutputs = 1, None
+        features.update({"nfields": nfields, "noutputs": noutputs})
+        if noutputs is not None:
+            features["work"] = features["output_work"] = nsea * nfields * noutputs
+    return features
+
+
+def output_snapshot(program):
+    """Size and modification time of the output files of ``program``.
+
+    The files are matched with the :data:`OUTPUT_PATTERNS` of the program,
+    in its run path, and also in its subdirectories for the programs of
+    :data:`RECURSIVE_OUTPUTS`. Returns a dictionary of path -> (size, mtime_ns).
+    """
+    recursive = program.EXE in RECURSIVE_OUTPUTS
+    snapshot = {}
+    for pattern in OUTPUT_PATTERNS.get(program.EXE, []):
+        try:
+            pattern = pattern.format(**vars(program))
+        except (KeyError, AttributeError, ValueError, IndexError):
+            continue  # e.g. a file_prefix with braces
+        # "**" also matches the run path itself
+        pattern = os.path.join(program.runpath, "**", pattern) if recursive else \
+            os.path.join(program.runpath, pattern)
+        for fname in glob.glob(pattern, recursive=recursive):
+            try:
+                stat = os.stat(fname)
+            except OSError:
+                continue  # removed in the meantime
+            if os.path.isfile(fname):
+                snapshot[os.path.abspath(fname)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def output_bytes(before, after):
+    """Bytes of the files of ``after`` that are new or changed since ``before``."""
+    return sum(size for fname, (size, mtime) in after.items()
+               if before.get(fname) != (size, mtime))
+
+
+def record_run(program, wall, nproc=1, started=None, grid=None, database=None,
+               outputs=None):
+    """Store a run of ``program`` in the history database.
+
+    ``started`` is the start of the run (a datetime) and ``outputs`` the
+    :func:`output_snapshot` taken before it. Without it, all the current
+    outputs of the program are counted. Returns the record id, or None if
+    the history is disabled. Errors only issue a warning, so the history
+    never breaks a run.
+    """
+    if database_path(database) is None:
+        return None
+    started = started or datetime.datetime.now() - datetime.timedelta(seconds=wall)
+    try:
+        record = run_features(program, nproc, grid, database)
+        record.update({"started": started.isoformat(), "wall": wall,
+                       "core": wall * nproc,
+                       "output_bytes": output_bytes(outputs or {}, output_snapshot(program)),
+                       "returncode": getattr(program, "returncode", None)})
+        names = [name for name in COLUMNS if name in record]
+        with closing(connect(database)) as con, con:
+            cur = con.execute(f"INSERT INTO runs ({', '.join(names)}) VALUES "
+                              f"({', '.join('?' * len(names))})",
+                              [record[name] for name in names])
+            return cur.lastrowid
+    except Exception as e:
+        warning(f"Could not record the run in the history: {e}")
+        return None
+
+
+def load_history(exe=None, database=None):
+    """Recorded runs (successful ones only) as a list of dictionaries."""
+    query, args = "SELECT * FROM runs WHERE returncode = 0", []
+    if exe is not None:
+        query, args = query + " AND exe = ?", [exe]
+    with closing(connect(database)) as con, con:
+        return [dict(row) for row in con.execute(query + " ORDER BY id", args)]
+
+
+def fit_cost_model(records):
+    """Coefficients of the wall time and output volume models."""
+    records = [r for r in records if r.get("work") is not None]
+    if len(records) < 3:
+        error = f"At least 3 recorded runs are needed, found {len(records)}."
+        raise ValueError(error)
+
+    work = np.array([r["work"] for r in records], dtype="float64")
+    nproc = np.array([r["nproc"] for r in records], dtype="float64")
+    wall = np.array([r["wall"] for r in records], dtype="float64")
+    basis = np.stack([np.ones_like(work), work / nproc, nproc], axis=1)
+
+    outwork = np.array([r.get("output_work") or 0. for r in records], dtype="float64")
+    nbytes = np.array([r["output_bytes"] for r in records], dtype="float64")
+    volume = nonnegative_lstsq(np.stack([np.ones_like(outwork), outwork], axis=1), nbytes)
+    return {"wall": nonnegative_lstsq(basis, wall), "output": volume,
+            "nrecords": len(records)}
+
+
+def estimate(program, nproc=1, grid=None, database=None):
+    """Predicted wall time (s), core hours and output bytes of a run.
+
+    The model is fitted on the recorded runs of the same program.
+    """
+    features = run_features(program, nproc, grid, database)
+    if features.get("work") is None:
+        error = (f"Not enough information to estimate this {program.EXE} run. "
+                 "Give its grid, or run the same mod_def once.")
+        raise ValueError(error)
+
+    model = fit_cost_model(load_history(program.EXE, database))
+    wall = float(model["wall"] @ [1., features["work"] / nproc, nproc])
+    output = float(model["output"] @ [1., features.get("output_work") or 0.])
+    return {"wall_seconds": wall, "core_hours": wall * nproc / 3600.,
+            "output_bytes": output, "nrecords": model["nrecords"]}
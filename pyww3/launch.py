@@ -0,0 +1,189 @@
+"""
+Topology-aware MPI/OpenMP launch commands.
+
+The local CPU topology (logical CPUs, physical cores, sockets and NUMA nodes)
+is read from ``lscpu`` or, if that is not available, from ``/proc/cpuinfo``
+and ``/sys``. A :class:`LaunchConfig` turns it into the process binding and
+mapping options of a launcher backend (``mpirun``, ``mpiexec`` or ``srun``)
+and into the OpenMP environment of hybrid builds.
+
+Other launchers can be added with :func:`register_launcher`.
+"""
+import os
+import glob
+import shutil
+import subprocess
+
+from functools import lru_cache
+from dataclasses import dataclass, field
+from logging import warning
+from typing import Optional, List
+
+
+@dataclass(frozen=True)
+class Topology():
+    """Counts of the CPU resources of the local machine."""
+
+    cpus: int
+    cores: int
+    sockets: int = 1
+    numa_nodes: int = 1
+
+
+def parse_lscpu(text):
+    """Topology from the output of ``lscpu -p=CPU,CORE,SOCKET,NODE``."""
+    rows = [line.split(",") for line in text.splitlines()
+            if line.strip() and not line.startswith("#")]
+    if not rows:
+        error = "No CPUs in the lscpu output."
+        raise ValueError(error)
+    cpus = {r[0] for r in rows}
+    cores = {(r[2], r[1]) for r in rows}
+    sockets = {r[2] for r in rows}
+    nodes = {r[3] for r in rows if len(r) > 3 and r[3]}
+    return Topology(len(cpus), len(cores), len(sockets), max(len(nodes), 1))
+
+
+def parse_cpuinfo(text):
+    """Topology from the content of ``/proc/cpuinfo``."""
+    cpus, cores, sockets = 0, set(), set()
+    socket = core = None
+    for line in text.splitlines() + [""]:
+        key, _, value = line.partition(":")
+        key = key.strip()
+        if key == "processor":
+            cpus += 1
+        elif key == "physical id":
+            socket = value.strip()
+        elif key == "core id":
+            core = value.strip()
+        elif not key:
+            if core is not None:
+                cores.add((socket, core))
+                sockets.add(socket)
+            socket = core = None
+    if not cpus:
+        error = "No processors in /proc/cpuinfo."
+        raise ValueError(error)
+    return Topology(cpus, len(cores) or cpus, max(len(sockets), 1))
+
+
+@lru_cache(maxsize=None)
+def detect_topology():
+    """Topology of the local machine (cached)."""
+    if shutil.which("lscpu"):
+        out = subprocess.run(["lscpu", "-p=CPU,CORE,SOCKET,NODE"], check=False,
+                             capture_output=True, text=True)
+        if out.returncode == 0:
+            try:
+                return parse_lscpu(out.stdout)
+            except ValueError:
+                pass
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            topology = parse_cpuinfo(f.read())
+        nodes = len(glob.glob("/sys/devices/system/node/node[0-9]*"))
+        return Topology(topology.cpus, topology.cores, topology.sockets, max(nodes, 1))
+    except (OSError, ValueError):
+        cpus = os.cpu_count() or 1
+        warning("Could not read the CPU topology, assuming one core per CPU.")
+        return Topology(cpus, cpus)
+
+
+def _mpirun(config):
+    """Open MPI ``mpirun`` options."""
+    args = ["mpirun", "-n", str(config.nproc)]
+    if config.mapping != "none":
+        pe = f":PE={config.threads}" if config.threads > 1 else ""
+        args += ["--map-by", f"{config.mapping}{pe}"]
+    args += ["--bind-to", config.binding]
+    if config.threads > 1:
+        args += ["-x", "OMP_NUM_THREADS"]
+    return args
+
+
+def _mpiexec(config):
+    """MPICH/Hydra ``mpiexec`` options."""
+    args = ["mpiexec", "-n", str(config.nproc)]
+    if config.mapping != "none":
+        args += ["-map-by", config.mapping]
+    if config.binding != "none":
+        threads = f":{config.threads}" if config.threads > 1 else ""
+        args += ["-bind-to", f"{config.binding}{threads}"]
+    if config.threads > 1:
+        args += ["-genv", "OMP_NUM_THREADS", str(config.threads)]
+    return args
+
+
+def _srun(config):
+    """Slurm ``srun`` options (the environment is exported by default)."""
+    args = ["srun", "-n", str(config.nproc), f"--cpus-per-task={config.threads}"]
+    binding = {"core": "cores", "socket": "sockets", "none": "none"}
+    args.append(f"--cpu-bind={binding.get(config.binding, config.binding)}")
+    if config.mapping == "numa":
+        args.append("--distribution=block:cyclic")
+    return args
+
+
+LAUNCHERS = {"mpirun": _mpirun, "mpiexec": _mpiexec, "srun": _srun}
+
+
+def register_launcher(name, builder):
+    """Add a launcher backend.
+
+    ``builder`` takes a :class:`LaunchConfig` and returns the launcher
+    command and options as a list of strings.
+    """
+    LAUNCHERS[name] = builder
+
+
+@dataclass
+class LaunchConfig():
+    """Process placement of an MPI (and OpenMP) run.
+
+    ``mapping`` and ``binding`` default to spreading the ranks over the NUMA
+    nodes (when the run does not fill the machine) and binding them to cores.
+    Runs oversubscribing the cores are not bound.
+    """
+
+    nproc: int
+    threads: int = 1
+    launcher: str = "mpirun"
+    binding: Optional[str] = None
+    mapping: Optional[str] = None
+    extra: List[str] = field(default_factory=list)
+    topology: Optional[Topology] = None
+
+    def __post_init__(self):
+        if self.launcher not in LAUNCHERS:
+            error = "launcher must be: {}".format(",".join(LAUNCHERS))
+            raise ValueError(error)
+        if self.nproc < 1 or self.threads < 1:
+            error = "nproc and threads must be at least 1."
+            raise ValueError(error)
+
+        if self.topology is None:
+            self.__setattr__("topology", detect_topology())
+
+        used = self.nproc * self.threads
+        if used > self.topology.cores:
+            warn = (f"{self.nproc} processes x {self.threads} threads oversubscribe "
+                    f"the {self.topology.cores} cores, processes are not bound.")
+            warning(warn)
+            self.__setattr__("binding", "none")
+        if self.binding is None:
+            self.__setattr__("binding", "core")
+        if self.mapping is None:
+            spread = self.topology.numa_nodes > 1 and used < self.topology.cores
+            self.__setattr__("mapping", "numa" if spread else "core")
+
+    def command(self, cmd):
+        """Full command line launching ``cmd``."""
+        return " ".join(LAUNCHERS[self.launcher](self) + list(self.extra) + [cmd])
+
+    def environment(self):
+        """OpenMP environment variables of the run."""
+        env = {"OMP_NUM_THREADS": str(self.threads)}
+        if self.threads > 1:
+            env.update({"OMP_PLACES": "cores", "OMP_PROC_BIND": "close"})
+        return env
@@ -0,0 +1,509 @@
+"""
+Abstracts the ww3_multi program.
+"""
+import os
+
+import datetime
+
+from typing import Dict, List, Tuple
+
+from logging import warning
+from dataclasses import dataclass, field
+from textwrap import dedent as dtxt
+
+from .utils import (bool_to_str, verify_runpath, verify_mod_def)
+from .ww3 import WW3Base
+
+FORCING_FIELDS = ["WATER_LEVELS", "CURRENTS", "WINDS", "ICE_CONC",
+                  "ICE_PARAM1", "ICE_PARAM2", "ICE_PARAM3", "ICE_PARAM4",
+                  "ICE_PARAM5", "MUD_DENSITY", "MUD_THICKNESS",
+                  "MUD_VISCOSITY"]
+ASSIM_FIELDS = ["MEAN", "SPEC1D", "SPEC2D"]
+
+# decimals of the COMM_FRAC intervals written in the namelist
+COMM_FRAC_DECIMALS = 4
+
+
+@dataclass
+class WW3MultiInput():
+    """An input grid of ww3_multi, i.e. a grid that only provides forcing.
+
+    ``forcing`` and ``assim`` list the fields this grid provides, for example
+    ``["WINDS", "ICE_CONC"]``.
+    """
+
+    name: str
+    mod_def: str
+    forcing: List[str] = field(default_factory=list)
+    assim: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        """Validate the input grid definition."""
+        for fld in self.forcing:
+            if fld not in FORCING_FIELDS:
+                error = f"Forcing \'{fld}\' is not valid. Options are {FORCING_FIELDS}."
+                raise ValueError(error)
+        for fld in self.assim:
+            if fld not in ASSIM_FIELDS:
+                error = f"Assimilation \'{fld}\' is not valid. Options are {ASSIM_FIELDS}."
+                raise ValueError(error)
+
+
+@dataclass
+class WW3MultiModel():
+    """A wave model grid of ww3_multi.
+
+    ``forcing`` maps forcing fields to their source, which can be
+    ``'native'`` (the grid has its own input files, e.g. ``wind.NAME``) or
+    the name of a :class:`WW3MultiInput` grid. Fields that are not given are
+    not used. The ``rank_id``, ``group_id`` and ``comm_frac`` resources
+    control which grids run concurrently and on which share of the
+    processes.
+    """
+
+    name: str
+    mod_def: str
+    forcing: Dict[str, str] = field(default_factory=dict)
+    assim: Dict[str, str] = field(default_factory=dict)
+    rank_id: int = 1
+    group_id: int = 1
+    comm_frac: Tuple[float, float] = (0.0, 1.0)
+    bound_flag: bool = False
+
+    def __post_init__(self):
+        """Validate the model grid definition."""
+        for fld in self.forcing:
+            if fld not in FORCING_FIELDS:
+                error = f"Forcing \'{fld}\' is not valid. Options are {FORCING_FIELDS}."
+                raise ValueError(error)
+        for fld in self.assim:
+            if fld not in ASSIM_FIELDS:
+                error = f"Assimilation \'{fld}\' is not valid. Options are {ASSIM_FIELDS}."
+                raise ValueError(error)
+
+        # compared as written in the namelist
+        low, high = (round(x, COMM_FRAC_DECIMALS) for x in self.comm_frac)
+        if not 0 <= low < high <= 1:
+            error = (f"comm_frac must be two increasing fractions between 0 and 1 "
+                     f"(to {COMM_FRAC_DECIMALS} decimals).")
+            raise ValueError(error)
+
+
+@dataclass
+class WW3Multi(WW3Base):
+    """This class abstracts the program ww3_multi. It is an extension of the class
+    :class:`pyww3.ww3.WW3Base()`.
+    """
+
+    # withoput these two parameters, everything breaks
+    runpath: str
+    model_grids: List[WW3MultiModel]
+
+    EXE = "ww3_multi"
+    DATE_FORMAT = "%Y%m%d %H%M%S"
+    output: str = "ww3_multi.nml"
+
+    nproc: int = 1
+
+    input_grids: List[WW3MultiInput] = field(default_factory=list)
+
+    # namelist parameters start here
+    domain_unipts: bool = False
+    domain_iostyp: int = 1
+    domain_upproc: bool = False
+    domain_pshare: bool = False
+    domain_flghg1: bool = False
+    domain_flghg2: bool = False
+    domain_start: datetime.datetime = datetime.datetime(1900, 1, 1)
+    domain_stop: datetime.datetime = datetime.datetime(2900, 12, 31)
+
+    type_field_list: List[str] = field(default_factory=lambda:
+                                       ["DPT", "WND", "HS", "LM", "T02",
+                                        "T0M1", "T01", "FP", "DIR", "SPR",
+                                        "DP", "PHS", "PTP", "PLP", "PDIR",
+                                        "PSPR", "PWS", "TWS", "PNR"])
+    type_point_name: str = "points"
+    type_point_file: str = "mylist"
+    type_track_format: bool = True
+    type_partition_x0: int = 0
+    type_partition_xn: int = 0
+    type_partition_nx: int = 0
+    type_partition_y0: int = 0
+    type_partition_yn: int = 0
+    type_partition_ny: int = 0
+    type_partition_format: bool = True
+
+    date_field_stride: int = 0
+    date_point_stride: int = 0
+    date_track_stride: int = 0
+    date_restart_stride: int = 0
+    date_boundary_stride: int = 0
+    date_partition_stride: int = 0
+
+    homog_count_n_ic1: int = 0
+    homog_count_n_ic2: int = 0
+    homog_count_n_ic3: int = 0
+    homog_count_n_ic4: int = 0
+    homog_count_n_ic5: int = 0
+    homog_count_n_mdn: int = 0
+    homog_count_n_mth: int = 0
+    homog_count_n_mvs: int = 0
+    homog_count_n_lev: int = 0
+    homog_count_n_cur: int = 0
+    homog_count_n_wnd: int = 0
+    homog_count_n_ice: int = 0
+    homog_count_n_mov: int = 0
+
+    # validate the data types and values, where possible
+    def __post_init__(self):
+
+        verify_runpath(self.runpath)
+
+        if not self.model_grids:
+            raise ValueError("At least one model grid is required.")
+
+        # every grid reads its own mod_def.NAME
+        names = [grid.name for grid in self.input_grids + self.model_grids]
+        if len(set(names)) != len(names):
+            raise ValueError("Grid names must be unique.")
+        for grid in self.input_grids + self.model_grids:
+            verify_mod_def(self.runpath, grid.mod_def, f"mod_def.{grid.name}")
+
+        # forcing must come from the grid itself or from an input grid
+        sources = ["no", "native"] + [grid.name for grid in self.input_grids]
+        for grid in self.model_grids:
+            for fld, source in {**grid.forcing, **grid.assim}.items():
+                if source not in sources:
+                    error = (f"Forcing \'{fld}\' of grid \'{grid.name}\' comes "
+                             f"from \'{source}\'. Options are {sources}.")
+                    raise ValueError(error)
+
+        # check domain_iostyp
+        if self.domain_iostyp not in [0, 1, 2, 3]:
+            error = "Parameter \'domain_iostyp\' must be 0, 1, 2 or 3."
+            raise ValueError(error)
+
+        # check if point list exists if date_point_stride > 0
+        if self.date_point_stride > 0:
+            if not os.path.isfile(self.type_point_file):
+                error = f"No such file or directory \'{self.type_point_file}\'."
+                raise ValueError(error)
+            else:
+                basename = os.path.basename(self.type_point_file)
+                if not os.path.isfile(os.path.join(self.runpath, basename)):
+                    warn = (f"File \'{self.type_point_file}\' is not in the run path. "
+                            "I am creating a link for you.")
+                    warning(warn)
+                    os.symlink(os.path.abspath(self.type_point_file),
+                               os.path.join(self.runpath, basename))
+
+                self.__setattr__("type_point_file", basename)
+
+        # create the namelist text here
+        self.__setattr__("text", self.populate_namelist())
+
+    def allocate(self, weights: Dict[str, float]):
+        """Share the processes between grids of the same rank.
+
+        ``weights`` maps grid names to their relative cost (e.g. the number of
+        sea points times the number of time steps). Grids of the same rank
+        get contiguous ``comm_frac`` intervals proportional to their weight,
+        rounded to :data:`COMM_FRAC_DECIMALS` decimals as in the namelist.
+        """
+        ranks = sorted(set(grid.rank_id for grid in self.model_grids))
+        for rank in ranks:
+            grids = [grid for grid in self.model_grids if grid.rank_id == rank]
+            total = sum(weights.get(grid.name, 1.) for grid in grids)
+            start = 0.
+            for grid in grids:
+                stop = start + weights.get(grid.name, 1.) / total
+                frac = (round(start, COMM_FRAC_DECIMALS),
+                        round(min(stop, 1.), COMM_FRAC_DECIMALS))
+                if frac[0] >= frac[1]:
+                    error = f"The weight of grid \'{grid.name}\' is too small to get processes."
+                    raise ValueError(error)
+                grid.comm_frac = frac
+                start = stop
+
+        # update namelist
+        self.__setattr__("text", self.populate_namelist())
+
+    def _alldate(self, stride):
+        """Format an ALLDATE entry."""
+        fmt = self.DATE_FORMAT
+        return (f"'{self.domain_start.strftime(fmt)}' '{stride}' "
+                f"'{self.domain_stop.strftime(fmt)}'")
+
+    def _input_grid_text(self):
+        """Build the content of INPUT_GRID_NML."""
+        lines = []
+        for i, grid in enumerate(self.input_grids, start=1):
+            lines.append(f"  INPUT({i})%NAME = '{grid.name}'")
+            for fld in FORCING_FIELDS:
+                if fld in grid.forcing:
+                    lines.append(f"  INPUT({i})%FORCING%{fld} = T")
+            for fld in ASSIM_FIELDS:
+                if fld in grid.assim:
+                    lines.append(f"  INPUT({i})%ASSIM%{fld} = T")
+        return "\n".join(lines)
+
+    def _model_grid_text(self):
+        """Build the content of MODEL_GRID_NML."""
+        lines = []
+        for i, grid in enumerate(self.model_grids, start=1):
+            lines.append(f"  MODEL({i})%NAME = '{grid.name}'")
+            for fld in FORCING_FIELDS:
+                if fld in grid.forcing:
+                    lines.append(f"  MODEL({i})%FORCING%{fld} = '{grid.forcing[fld]}'")
+            for fld in ASSIM_FIELDS:
+                if fld in grid.assim:
+                    lines.append(f"  MODEL({i})%ASSIM%{fld} = '{grid.assim[fld]}'")
+            lines.append(f"  MODEL({i})%RESOURCE%RANK_ID = {grid.rank_id}")
+            lines.append(f"  MODEL({i})%RESOURCE%GROUP_ID = {grid.group_id}")
+            lines.append(f"  MODEL({i})%RESOURCE%COMM_FRAC = "
+                         f"{grid.comm_frac[0]:.{COMM_FRAC_DECIMALS}f},"
+                         f"{grid.comm_frac[1]:.{COMM_FRAC_DECIMALS}f}")
+            lines.append(f"  MODEL({i})%RESOURCE%BOUND_FLAG = "
+                         f"{bool_to_str(grid.bound_flag).upper()}")
+        return "\n".join(lines)
+
+    # NOTE: I am doing this this way instead of reading it from a file
+    # because f-strings in a file allow for arbitrary code execution,
+    # and are thefore a security issue. Writting everything here at
+    # least controls what is being executed.
+    def populate_namelist(self):
+        """Create the namelist text using NOAA's latest template."""
+
+        # the grid blocks have a variable number of lines, so they are
+        # built first and indented here to survive dedent()
+        pad = " " * 20
+        input_grids = self._input_grid_text().replace("\n", "\n" + pad)
+        model_grids = self._model_grid_text().replace("\n", "\n" + pad)
+
+        txt = dtxt(f"""\
+                    ! -------------------------------------------------------------------- !
+                    ! WAVEWATCH III ww3_multi.nml - multi-grid model                       !
+                    ! -------------------------------------------------------------------- !
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define top-level model parameters via DOMAIN_NML namelist
+                    !
+                    ! * IOSTYP defines the output server mode for parallel implementation.
+                    !             0 : No data server processes, direct access output from
+                    !                 each process (requires true parallel file system).
+                    !             1 : No data server process. All output for each type
+                    !                 performed by process that performs computations too.
+                    !             2 : Last process is reserved for all output, and does no
+                    !                 computing.
+                    !             3 : Multiple dedicated output processes.
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     DOMAIN%NRINP  =  0  ! Number of grids defining input fields.
+                    !     DOMAIN%NRGRD  =  1  ! Number of wave model grids.
+                    !     DOMAIN%UNIPTS =  F  ! Flag for using unified point output file.
+                    !     DOMAIN%IOSTYP =  1  ! Output server type
+                    !     DOMAIN%UPPROC =  F  ! Flag for dedicated process for unified point output.
+                    !     DOMAIN%PSHARE =  F  ! Flag for grids sharing dedicated output processes.
+                    !     DOMAIN%FLGHG1 =  F  ! Flag for masking computation in two-way nesting
+                    !     DOMAIN%FLGHG2 =  F  ! Flag for masking at printout time
+                    !     DOMAIN%START  = '19680606 000000'  ! Start date for the entire model
+                    !     DOMAIN%STOP   = '19680607 000000'  ! Stop date for the entire model
+                    ! -------------------------------------------------------------------- !
+                    &DOMAIN_NML
+                      DOMAIN%NRINP  = {len(self.input_grids)}
+                      DOMAIN%NRGRD  = {len(self.model_grids)}
+                      DOMAIN%UNIPTS = {bool_to_str(self.domain_unipts).upper()}
+                      DOMAIN%IOSTYP = {self.domain_iostyp}
+                      DOMAIN%UPPROC = {bool_to_str(self.domain_upproc).upper()}
+                      DOMAIN%PSHARE = {bool_to_str(self.domain_pshare).upper()}
+                      DOMAIN%FLGHG1 = {bool_to_str(self.domain_flghg1).upper()}
+                      DOMAIN%FLGHG2 = {bool_to_str(self.domain_flghg2).upper()}
+                      DOMAIN%START  = '{self.domain_start.strftime(self.DATE_FORMAT)}'
+                      DOMAIN%STOP   = '{self.domain_stop.strftime(self.DATE_FORMAT)}'
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define each input grid via the INPUT_GRID_NML namelist
+                    !
+                    ! * index I must match indexes from 1 to DOMAIN%NRINP
+                    ! * INPUT(I)%NAME must be set for each active input grid I
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     INPUT(I)%NAME                  = 'unset'
+                    !     INPUT(I)%FORCING%WATER_LEVELS  = F
+                    !     INPUT(I)%FORCING%CURRENTS      = F
+                    !     INPUT(I)%FORCING%WINDS         = F
+                    !     INPUT(I)%FORCING%ICE_CONC      = F
+                    !     INPUT(I)%FORCING%ICE_PARAM1    = F
+                    !     INPUT(I)%FORCING%ICE_PARAM2    = F
+                    !     INPUT(I)%FORCING%ICE_PARAM3    = F
+                    !     INPUT(I)%FORCING%ICE_PARAM4    = F
+                    !     INPUT(I)%FORCING%ICE_PARAM5    = F
+                    !     INPUT(I)%FORCING%MUD_DENSITY   = F
+                    !     INPUT(I)%FORCING%MUD_THICKNESS = F
+                    !     INPUT(I)%FORCING%MUD_VISCOSITY = F
+                    !     INPUT(I)%ASSIM%MEAN            = F
+                    !     INPUT(I)%ASSIM%SPEC1D          = F
+                    !     INPUT(I)%ASSIM%SPEC2D          = F
+                    ! -------------------------------------------------------------------- !
+                    &INPUT_GRID_NML
+                    {input_grids}
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define each model grid via the MODEL_GRID_NML namelist
+                    !
+                    ! * index I must match indexes from 1 to DOMAIN%NRGRD
+                    ! * MODEL(I)%NAME must be set for each active model grid I
+                    ! * FORCING can be set as :
+                    !    - 'no'          : This input is not used.
+                    !    - 'native'      : This grid has its own input files, e.g. grid
+                    !                      grdX (mod_def.grdX) uses ice.grdX.
+                    !    - 'INPUT%NAME'  : Take input from the grid identified by
+                    !                      INPUT%NAME.
+                    ! * RESOURCE%RANK_ID : Rank number of grid (internally sorted and reassigned).
+                    ! * RESOURCE%GROUP_ID : Group number (internally reassigned so that different
+                    !                                     ranks result in different group numbers).
+                    ! * RESOURCE%COMM_FRAC : Fraction of communicator (processes) used for this grid.
+                    ! * RESOURCE%BOUND_FLAG : Flag identifying dumping of boundary data used by this
+                    !                         grid. If true, the file nest.MODID is generated.
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     MODEL(I)%NAME                  = 'unset'
+                    !     MODEL(I)%FORCING%WATER_LEVELS  = 'no'
+                    !     MODEL(I)%FORCING%CURRENTS      = 'no'
+                    !     MODEL(I)%FORCING%WINDS         = 'no'
+                    !     MODEL(I)%FORCING%ICE_CONC      = 'no'
+                    !     MODEL(I)%FORCING%ICE_PARAM1    = 'no'
+                    !     MODEL(I)%FORCING%ICE_PARAM2    = 'no'
+                    !     MODEL(I)%FORCING%ICE_PARAM3    = 'no'
+                    !     MODEL(I)%FORCING%ICE_PARAM4    = 'no'
+                    !     MODEL(I)%FORCING%ICE_PARAM5    = 'no'
+                    !     MODEL(I)%FORCING%MUD_DENSITY   = 'no'
+                    !     MODEL(I)%FORCING%MUD_THICKNESS = 'no'
+                    !     MODEL(I)%FORCING%MUD_VISCOSITY = 'no'
+                    !     MODEL(I)%ASSIM%MEAN            = 'no'
+                    !     MODEL(I)%ASSIM%SPEC1D          = 'no'
+                    !     MODEL(I)%ASSIM%SPEC2D          = 'no'
+                    !     MODEL(I)%RESOURCE%RANK_ID      = I
+                    !     MODEL(I)%RESOURCE%GROUP_ID     = 1
+                    !     MODEL(I)%RESOURCE%COMM_FRAC    = 0.00,1.00
+                    !     MODEL(I)%RESOURCE%BOUND_FLAG   = F
+                    ! -------------------------------------------------------------------- !
+                    &MODEL_GRID_NML
+                    {model_grids}
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define the output types point parameters via OUTPUT_TYPE_NML namelist
+                    !
+                    ! * ALLTYPE will apply the output types for all the model grids
+                    ! * need DOMAIN%UNIPTS equal true to use a unified point output file
+                    ! * the point file is a space separated values per line : lon lat 'name'
+                    ! * the full list of field names is given in ww3_shel.nml
+                    ! * output track file formatted (T) or unformated (F)
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     ALLTYPE%FIELD%LIST         =  'unset'
+                    !     ALLTYPE%POINT%NAME         =  'unset'
+                    !     ALLTYPE%POINT%FILE         =  'points.list'
+                    !     ALLTYPE%TRACK%FORMAT       =  T
+                    !     ALLTYPE%PARTITION%X0       =  0
+                    !     ALLTYPE%PARTITION%XN       =  0
+                    !     ALLTYPE%PARTITION%NX       =  0
+                    !     ALLTYPE%PARTITION%Y0       =  0
+                    !     ALLTYPE%PARTITION%YN       =  0
+                    !     ALLTYPE%PARTITION%NY       =  0
+                    !     ALLTYPE%PARTITION%FORMAT   =  T
+                    ! -------------------------------------------------------------------- !
+                    &OUTPUT_TYPE_NML
+                      ALLTYPE%FIELD%LIST = '{" ".join(self.type_field_list)}'
+                      ALLTYPE%POINT%NAME = '{self.type_point_name}'
+                      ALLTYPE%POINT%FILE = '{self.type_point_file}'
+                      ALLTYPE%TRACK%FORMAT = {bool_to_str(self.type_track_format).upper()}
+                      ALLTYPE%PARTITION%X0 = {self.type_partition_x0}
+                      ALLTYPE%PARTITION%XN = {self.type_partition_xn}
+                      ALLTYPE%PARTITION%NX = {self.type_partition_nx}
+                      ALLTYPE%PARTITION%Y0 = {self.type_partition_y0}
+                      ALLTYPE%PARTITION%YN = {self.type_partition_yn}
+                      ALLTYPE%PARTITION%NY = {self.type_partition_ny}
+                      ALLTYPE%PARTITION%FORMAT = {bool_to_str(self.type_partition_format).upper()}
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define output dates via OUTPUT_DATE_NML namelist
+                    !
+                    ! * ALLDATE will apply the output dates for all the model grids
+                    ! * start and stop times are with format 'yyyymmdd hhmmss'
+                    ! * if time stride is equal '0', then output is disabled
+                    ! * time stride is given in seconds
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     ALLDATE%FIELD          = '19680606 000000' '0' '19680607 000000'
+                    !     ALLDATE%POINT          = '19680606 000000' '0' '19680607 000000'
+                    !     ALLDATE%TRACK          = '19680606 000000' '0' '19680607 000000'
+                    !     ALLDATE%RESTART        = '19680606 000000' '0' '19680607 000000'
+                    !     ALLDATE%BOUNDARY       = '19680606 000000' '0' '19680607 000000'
+                    !     ALLDATE%PARTITION      = '19680606 000000' '0' '19680607 000000'
+                    ! -------------------------------------------------------------------- !
+                    &OUTPUT_DATE_NML
+                      ALLDATE%FIELD = {self._alldate(self.date_field_stride)}
+                      ALLDATE%POINT = {self._alldate(self.date_point_stride)}
+                      ALLDATE%TRACK = {self._alldate(self.date_track_stride)}
+                      ALLDATE%RESTART = {self._alldate(self.date_restart_stride)}
+                      ALLDATE%BOUNDARY = {self._alldate(self.date_boundary_stride)}
+                      ALLDATE%PARTITION = {self._alldate(self.date_partition_stride)}
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! Define homogeneous input via HOMOG_COUNT_NML and HOMOG_INPUT_NML namelist
+                    !
+                    ! * the number of each homogeneous input is defined by HOMOG_COUNT
+                    ! * the total number of homogeneous input is automatically calculated
+                    ! * the homogeneous input must start from index 1 to N
+                    ! * if VALUE1 is equal 0, then the homogeneous input is desactivated
+                    ! * NAME can be IC1, IC2, IC3, IC4, IC5, MDN, MTH, MVS, LEV, CUR, WND, ICE, MOV
+                    ! * each homogeneous input is defined over a maximum of 3 values
+                    !
+                    ! * namelist must be terminated with /
+                    ! * definitions & defaults:
+                    !     HOMOG_COUNT%N_IC1            =  0
+                    !     ...
+                    !     HOMOG_COUNT%N_MOV            =  0
+                    !
+                    !     HOMOG_INPUT(I)%NAME           =  'unset'
+                    !     HOMOG_INPUT(I)%DATE           =  '19680606 000000'
+                    !     HOMOG_INPUT(I)%VALUE1         =  0
+                    !     HOMOG_INPUT(I)%VALUE2         =  0
+                    !     HOMOG_INPUT(I)%VALUE3         =  0
+                    ! -------------------------------------------------------------------- !
+                    &HOMOG_COUNT_NML
+                      HOMOG_COUNT%N_IC1 = {self.homog_count_n_ic1}
+                      HOMOG_COUNT%N_IC2 = {self.homog_count_n_ic2}
+                      HOMOG_COUNT%N_IC3 = {self.homog_count_n_ic3}
+                      HOMOG_COUNT%N_IC4 = {self.homog_count_n_ic4}
+                      HOMOG_COUNT%N_IC5 = {self.homog_count_n_ic5}
+                      HOMOG_COUNT%N_MDN = {self.homog_count_n_mdn}
+                      HOMOG_COUNT%N_MTH = {self.homog_count_n_mth}
+                      HOMOG_COUNT%N_MVS = {self.homog_count_n_mvs}
+                      HOMOG_COUNT%N_LEV = {self.homog_count_n_lev}
+                      HOMOG_COUNT%N_CUR = {self.homog_count_n_cur}
+                      HOMOG_COUNT%N_WND = {self.homog_count_n_wnd}
+                      HOMOG_COUNT%N_ICE = {self.homog_count_n_ice}
+                      HOMOG_COUNT%N_MOV = {self.homog_count_n_mov}
+                    /
+
+                    &HOMOG_INPUT_NML
+                    ! REQUIRES USER INTERVENTION IF ANYTHING ABOVE IS SET TO > 0
+                    /
+
+                    ! -------------------------------------------------------------------- !
+                    ! WAVEWATCH III - end of namelist                                      !
+                    ! -------------------------------------------------------------------- !""")
+
+        return txt
@@ -0,0 +1,175 @@
+"""
+Boundary spectra of a child grid interpolated from the spectra of a parent run.
+
+The parent spectra are a ww3_ounp ``_spec.nc`` dataset, with an ``efth``
+(time, station, frequency, direction) variable. The raw records read by
+:func:`pyww3.binary.open_out_pnt` are rejected: their directions follow the
+model's internal convention, not the one of the ``_spec.nc`` files read by
+ww3_bounc. Each boundary point of the child grid gets
+the inverse-distance weighted spectrum of its nearest parent stations. If the
+spectral grids differ, the spectra are interpolated linearly in frequency and
+periodically in direction. All boundary points and times are processed with
+array operations, ``batch`` boundary points at a time.
+
+The result is one ``_spec.nc`` file per boundary point and a ``spec.list``,
+ready for :class:`pyww3.bounc.WW3Bounc`.
+"""
+import os
+
+import numpy as np
+
+from .spectra import write_spec_nc
+from .staging import write_list
+
+EARTH_RADIUS = 6371.  # km
+
+
+def distances(lon1, lat1, lon2, lat2):
+    """Great circle distances (km) between all points of 1 and all points of 2."""
+    lon1, lat1 = np.deg2rad(lon1)[:, None], np.deg2rad(lat1)[:, None]
+    lon2, lat2 = np.deg2rad(lon2)[None, :], np.deg2rad(lat2)[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + \
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0., 1.)))
+
+
+def idw_weights(src_lon, src_lat, dst_lon, dst_lat, k=4, power=2.,
+                max_distance=None):
+    """Inverse distance weights of the ``k`` nearest sources of each target.
+
+    Returns (index, weight) arrays of shape (ntargets, k). Targets on top of a
+    source take its value. Targets further than ``max_distance`` (km) from
+    all sources raise an error.
+    """
+    d = distances(np.asarray(dst_lon, dtype="float64"), np.asarray(dst_lat, dtype="float64"),
+                  np.asarray(src_lon, dtype="float64"), np.asarray(src_lat, dtype="float64"))
+    k = min(k, d.shape[1])
+    index = np.argpartition(d, k - 1, axis=1)[:, :k]
+    dist = np.take_along_axis(d, index, axis=1)
+
+    if max_distance is not None and (dist.min(axis=1) > max_distance).any():
+        far = int(np.argmax(dist.min(axis=1) > max_distance))
+        error = (f"Boundary point {far} is more than {max_distance} km away "
+                 "from the parent stations.")
+        raise ValueError(error)
+
+    exact = dist < 1e-6
+    with np.errstate(divide="ignore"):
+        weight = np.where(exact.any(axis=1, keepdims=True), exact.astype("float64"),
+                          1. / dist ** power)
+    return index, weight / weight.sum(axis=1, keepdims=True)
+
+
+def linear_matrix(src, dst, period=None):
+    """Matrix M such that M @ values interpolates ``values`` from src to dst.
+
+    With ``period``, the axis is periodic (directions). Otherwise, targets
+    outside of the source range get zero.
+    """
+    src = np.asarray(src, dtype="float64")
+    dst = np.asarray(dst, dtype="float64")
+    matrix = np.zeros((dst.size, src.size))
+    for j in range(src.size):
+        basis = np.zeros(src.size)
+        basis[j] = 1.
+        if period is None:
+            order = np.argsort(src)
+            matrix[:, j] = np.interp(dst, src[order], basis[order], left=0., right=0.)
+        else:
+            matrix[:, j] = np.interp(dst % period, src % period, basis, period=period)
+    return matrix
+
+
+def check_parent(ds):
+    """Raise if ``ds`` does not look like ww3_ounp spectra."""
+    missing = [c for c in ["efth", "frequency", "direction", "longitude", "latitude"]
+               if c not in ds.variables]
+    if missing:
+        error = f"The parent spectra have no {', '.join(missing)}."
+        raise ValueError(error)
+    if str(ds.attrs.get("idstr", "")).startswith("WAVEWATCH III POINT OUTPUT"):
+        error = ("The parent spectra are raw out_pnt.ww3 records. Convert them "
+                 "with ww3_ounp (WW3Ounp) first.")
+        raise ValueError(error)
+
+
+def _station_coordinates(ds):
+    """Longitude and latitude of the parent stations."""
+    lon, lat = ds["longitude"], ds["latitude"]
+    if "time" in lon.dims:
+        lon, lat = lon.isel(time=0), lat.isel(time=0)
+    return lon.values, lat.values
+
+
+def nest_spectra(parent, points, outpath, freq=None, dirs=None, k=4, power=2.,
+                 max_distance=None, batch=16, prefix="", listfile=None):
+    """Write the boundary spectra of a child grid from a parent run.
+
+    Args:
+        parent: parent spectra from ww3_ounp (xarray.Dataset with ``efth``,
+            ``frequency``, ``direction``, ``longitude`` and ``latitude``).
+        points: table with the ``lon``, ``lat`` and (optional) ``name``
+            columns of the child boundary points.
+        outpath: directory of the ``_spec.nc`` files.
+        freq, dirs: spectral grid of the child (see
+            :func:`pyww3.spectra.spectral_grid`). Default to the parent's.
+        k, power: number of parent stations and power of the inverse
+            distance weighting.
+        max_distance: maximum distance (km) to the nearest parent station.
+        batch: number of boundary points processed at once.
+        listfile: the list file. Defaults to ``spec.list`` next to
+            ``outpath``, with paths relative to it, as in WW3Bounc.
+
+    Returns the list of files written.
+    """
+    check_parent(parent)
+    os.makedirs(outpath, exist_ok=True)
+    plon, plat = _station_coordinates(parent)
+    blon = np.asarray(points["lon"], dtype="float64")
+    blat = np.asarray(points["lat"], dtype="float64")
+    names = [str(n) for n in points["name"]] if "name" in points else \
+        [f"B{i + 1:04d}" for i in range(blon.size)]
+
+    pfreq = parent["frequency"].values
+    pdirs = parent["direction"].values
+    freq = pfreq if freq is None else np.asarray(freq)
+    dirs = pdirs if dirs is None else np.asarray(dirs)
+    mfreq = None if np.array_equal(freq, pfreq) else linear_matrix(pfreq, freq)
+    mdirs = None if np.array_equal(dirs, pdirs) else linear_matrix(pdirs, dirs, 360.)
+    direction_attrs = {key: value for key, value in parent["direction"].attrs.items()
+                       if not key.startswith("_")}
+
+    index, weight = idw_weights(plon, plat, blon, blat, k, power, max_distance)
+    times = parent["time"].values
+    efth = parent["efth"].transpose("time", "station", "frequency", "direction")
+
+    fnames = []
+    for b0 in range(0, blon.size, batch):
+        bidx, bw = index[b0:b0 + batch], weight[b0:b0 + batch]
+
+        # read each parent station needed by this batch only once
+        needed, inverse = np.unique(bidx, return_inverse=True)
+        spectra = np.nan_to_num(efth.isel(station=needed).values.astype("float64"))
+        matrix = np.zeros((bidx.shape[0], needed.size))
+        np.add.at(matrix, (np.repeat(np.arange(bidx.shape[0]), bidx.shape[1]),
+                           inverse.ravel()), bw.ravel())
+        spectra = np.einsum("tufd,bu->tbfd", spectra, matrix)
+
+        if mfreq is not None:
+            spectra = np.einsum("gf,tbfd->tbgd", mfreq, spectra)
+        if mdirs is not None:
+            spectra = np.einsum("tbfd,ed->tbfe", spectra, mdirs)
+
+        for j in range(bidx.shape[0]):
+            b = b0 + j
+            fname = os.path.join(outpath, f"{prefix}{names[b]}_spec.nc")
+            write_spec_nc(fname, times, blon[b], blat[b], names[b], freq, dirs,
+                          spectra[:, j], direction_attrs)
+            fnames.append(fname)
+
+    if listfile is None:
+        listfile = os.path.join(os.path.dirname(os.path.normpath(outpath)), "spec.list")
+    lastp = os.path.basename(os.path.normpath(outpath))
+    write_list(listfile, [os.path.join(lastp, os.path.basename(f)) for f in fnames])
+
+    return fnames
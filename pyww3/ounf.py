@@ -1,12 +1,24 @@
+import os
+import shutil
 import datetime
 
+from glob import glob
 from typing import List
 
-from dataclasses import dataclass, field
+from logging import warning
+from dataclasses import dataclass, field, replace
 from textwrap import dedent as dtxt
 
+import numpy as np
+import xarray as xr
+
 from .utils import (bool_to_str, verify_runpath, verify_mod_def,
-                    verify_ww3_out)
+                    verify_ww3_out, make_scratch, run_many)
+from .archive import build_index, open_index, resolve_fields, select_files
+from .binary import open_out_grd
+from .store import outputs_to_store
+from .climatology import outputs_climatology
+from .extract import PointExtractor
 from .ww3 import WW3Base
 
 
@@ -30,7 +42,7 @@ class WW3Ounf(WW3Base):
     field_timestride: int = 0
     field_timecount: int = 1000000000
     field_timesplit: int = 6
-    field_list: List[str] = field(default_factory=lambda: ["HS", "FP", "DIR", "SPR", "WND" "ICE"])
+    field_list: List[str] = field(default_factory=lambda: ["HS", "FP", "DIR", "SPR", "WND", "ICE"])
     field_samefile: bool = True
     field_partition: List[int] = field(default_factory=lambda: [0, 1, 2, 3])
     field_type: int = 3
@@ -188,4 +200,179 @@ class WW3Ounf(WW3Base):
                     ! -------------------------------------------------------------------- !
                     ! WAVEWATCH III - end of namelist                                      !
                     ! -------------------------------------------------------------------- !""")
-        return txt
\ No newline at end of file
+        return txt
+
+    def index_outputs(self):
+        """Create or update the time index of the netCDF outputs.
+
+        See :func:`pyww3.archive.build_index`. The index is saved as
+        ``runpath/file_prefix + "index.json"``.
+        """
+        return build_index(self.runpath, self.file_prefix)
+
+    def open_outputs(self, start=None, stop=None, fields=None):
+        """Open the netCDF outputs between ``start`` and ``stop``.
+
+        Only the files overlapping the period are opened. ``fields`` can be
+        output tags (e.g. ["HS", "WND"]) or netCDF variable names. The index
+        is updated first, so files written since the last call are found.
+        """
+        index = self.index_outputs()
+        return open_index(self.runpath, index, start, stop, fields)
+
+    def output_times(self):
+        """Times of out_grd.ww3 that this namelist will convert."""
+        times = open_out_grd(os.path.join(self.runpath, os.path.basename(self.ww3_grd)),
+                             fields=[]).time.values
+        times = [t.astype("datetime64[us]").item() for t in times]
+        times = [t for t in times if t >= self.field_timestart]
+        if self.field_timestride > 0 and times:
+            stride = datetime.timedelta(seconds=self.field_timestride)
+            times = [t for t in times if (t - times[0]) % stride == datetime.timedelta(0)]
+        return times[:self.field_timecount]
+
+    def split(self, nwindows=1, field_groups=None):
+        """Split this program in time windows and groups of fields.
+
+        Args:
+            nwindows: number of time windows.
+            field_groups: list of lists of output tags, or the number of
+                groups to split ``field_list`` into. Defaults to one group.
+
+        Returns a list of (window, group, :class:`WW3Ounf`) running in the
+        scratch directories ``runpath/ounf_wWWW_gGG``, which link mod_def.ww3
+        and the out_grd.ww3 file of this run path.
+        """
+        if field_groups is None:
+            field_groups = [self.field_list]
+        elif isinstance(field_groups, int):
+            field_groups = [list(g) for g in np.array_split(self.field_list, field_groups)
+                            if len(g)]
+
+        times = self.output_times()
+        if not times:
+            error = f"No output times to convert after {self.field_timestart}."
+            raise ValueError(error)
+        windows = [w for w in np.array_split(np.arange(len(times)), nwindows) if w.size]
+
+        programs = []
+        for i, window in enumerate(windows):
+            for j, group in enumerate(field_groups):
+                scratch = make_scratch(self.runpath, f"ounf_w{i:03d}_g{j:02d}",
+                                       ["mod_def.ww3", os.path.basename(self.ww3_grd)])
+                program = replace(self, runpath=scratch,
+                                  ww3_grd=os.path.join(scratch, os.path.basename(self.ww3_grd)),
+                                  field_timestart=times[window[0]],
+                                  field_timecount=int(window.size),
+                                  field_list=list(group))
+                programs.append((i, j, program))
+        return programs
+
+    def run_parallel(self, nwindows=1, field_groups=None, max_workers=None,
+                     keep_scratch=False):
+        """Run ww3_ounf concurrently on time windows and groups of fields.
+
+        See :meth:`split`. The outputs of all instances are merged into the
+        usual ``file_prefix`` files in the run path. Note that changes made to
+        ``text`` with :meth:`update_text` are not passed to the instances.
+        """
+        programs = self.split(nwindows, field_groups)
+        run_many([p for _, _, p in programs], max_workers)
+
+        self.__setattr__("returncode", max(p.returncode for _, _, p in programs))
+        self.__setattr__("stdout", b"\n".join(p.stdout for _, _, p in programs))
+        self.__setattr__("stderr", b"\n".join(p.stderr for _, _, p in programs))
+        if self.returncode != 0:
+            warn = ("At least one ww3_ounf instance failed. The outputs were not "
+                    "merged, check the scratch directories.")
+            warning(warn)
+            return
+
+        merge_outputs([(i, j, p.runpath) for i, j, p in programs],
+                      self.runpath, self.file_prefix)
+        if not keep_scratch:
+            for _, _, program in programs:
+                shutil.rmtree(program.runpath)
+
+    def to_store(self, store, layout="timeseries", **kwargs):
+        """Stream the netCDF outputs into a Zarr store.
+
+        See :func:`pyww3.store.update_store`. Only the time steps not yet in
+        the store are appended, so this can be called again as the outputs
+        grow. With ``field_samefile=False``, the files of the fields of each
+        time segment are merged.
+        """
+        return outputs_to_store(self.runpath, self.file_prefix, store,
+                                layout=layout, **kwargs)
+
+    def climatology(self, fields=None, state=None, **kwargs):
+        """Streaming statistics of the netCDF outputs.
+
+        ``fields`` are output tags or variable names and default to
+        ``field_list``. If ``state`` is given, the accumulator is saved there
+        and only the new time steps are read next time. See
+        :class:`pyww3.climatology.Climatology` for the keyword arguments
+        (e.g. ``nbins`` for percentiles).
+        """
+        index = self.index_outputs()
+        if not index:
+            error = f"No file '{self.file_prefix}*.nc' in '{self.runpath}'."
+            raise ValueError(error)
+        variables = next(iter(index.values()))["variables"]
+        names = resolve_fields(self.field_list if fields is None else fields, variables)
+        return outputs_climatology(self.runpath, self.file_prefix, names,
+                                   state=state, **kwargs)
+
+    def extract_points(self, stations, fields=None, start=None, stop=None,
+                       method="bilinear", max_workers=None):
+        """Time series at a table of stations (name, lon, lat).
+
+        Only the files overlapping [start, stop] are read. See
+        :class:`pyww3.extract.PointExtractor`.
+        """
+        index = self.index_outputs()
+        keys = select_files(index, start, stop)
+        if not keys:
+            error = f"No file '{self.file_prefix}*.nc' covers {start} to {stop}."
+            raise ValueError(error)
+        names = resolve_fields(self.field_list if fields is None else fields,
+                               index[keys[0]]["variables"])
+
+        files = [os.path.join(self.runpath, key) for key in keys]
+        extractor = PointExtractor.from_file(files[0], stations, method)
+        out = extractor.extract(files, names, max_workers=max_workers)
+        return out.sel(time=slice(start, stop))
+
+
+def merge_outputs(scratches, runpath, prefix="ww3.", time="time"):
+    """Merge the ww3_ounf outputs of :meth:`WW3Ounf.split` into ``runpath``.
+
+    ``scratches`` is a list of (window, group, path). Files with the same
+    name are concatenated along time over the windows and merged over the
+    groups. Files found in a single scratch directory are just moved.
+    """
+    sources = {}
+    for i, j, path in scratches:
+        for fname in glob(os.path.join(path, prefix + "*.nc")):
+            sources.setdefault(os.path.basename(fname), []).append((i, j, fname))
+
+    for name, files in sorted(sources.items()):
+        target = os.path.join(runpath, name)
+        if len(files) == 1:
+            shutil.move(files[0][2], target)
+            continue
+
+        groups = {}
+        for i, j, fname in sorted(files):
+            groups.setdefault(j, []).append(xr.open_dataset(fname))
+        parts = [xr.concat(dss, dim=time, data_vars="minimal", coords="minimal",
+                           compat="override") if len(dss) > 1 else dss[0]
+                 for _, dss in sorted(groups.items())]
+        out = xr.merge(parts, compat="override", combine_attrs="override").load()
+        for dss in groups.values():
+            for ds in dss:
+                ds.close()
+
+        if os.path.isfile(target):
+            os.remove(target)
+        out.to_netcdf(target)
@@ -1,13 +1,20 @@
 from logging import warning
 import os
+import shutil
 
 import datetime
 
-from dataclasses import dataclass
+from glob import glob
+from dataclasses import dataclass, replace
 from textwrap import dedent as dtxt
 
+import numpy as np
+import xarray as xr
+
 from .utils import (bool_to_str, verify_runpath, verify_mod_def,
-                    verify_ww3_out)
+                    verify_ww3_out, make_scratch, run_many)
+from .binary import FortranFile, read_out_pnt_header
+from .store import outputs_to_store
 from .ww3 import WW3Base
 
 
@@ -323,3 +330,98 @@ class WW3Ounp(WW3Base):
                     ! -------------------------------------------------------------------- !""")
 
         return txt
+
+    def stations(self):
+        """Station indexes (1-based) selected by ``point_list``."""
+        if self.point_list.strip().lower() == "all":
+            ffile = FortranFile(os.path.join(self.runpath, os.path.basename(self.ww3_pnt)))
+            nopts = read_out_pnt_header(ffile)["nopts"]
+            ffile.close()
+            return list(range(1, nopts + 1))
+        return [int(i) for i in self.point_list.split()]
+
+    def split(self, nshards):
+        """Split the stations in ``nshards`` contiguous subsets.
+
+        Returns a list of :class:`WW3Ounp` running in the scratch directories
+        ``runpath/ounp_sKKK``, which link mod_def.ww3 and out_pnt.ww3. Shard
+        ``k`` always gets the same stations, so outputs are reproducible.
+        """
+        shards = [s for s in np.array_split(self.stations(), nshards) if s.size]
+        programs = []
+        for k, shard in enumerate(shards):
+            scratch = make_scratch(self.runpath, f"ounp_s{k:03d}",
+                                   ["mod_def.ww3", os.path.basename(self.ww3_pnt)])
+            program = replace(self, runpath=scratch,
+                              ww3_pnt=os.path.join(scratch, os.path.basename(self.ww3_pnt)),
+                              point_list=" ".join(str(i) for i in shard))
+            programs.append(program)
+        return programs
+
+    def run_sharded(self, nshards, max_workers=None, keep_scratch=False):
+        """Run ww3_ounp concurrently on disjoint subsets of stations.
+
+        See :meth:`split`. The outputs are concatenated along the station
+        dimension, in shard order, into the usual ``file_prefix`` files.
+        """
+        programs = self.split(nshards)
+        run_many(programs, max_workers)
+
+        self.__setattr__("returncode", max(p.returncode for p in programs))
+        self.__setattr__("stdout", b"\n".join(p.stdout for p in programs))
+        self.__setattr__("stderr", b"\n".join(p.stderr for p in programs))
+        if self.returncode != 0:
+            warn = ("At least one ww3_ounp instance failed. The outputs were not "
+                    "merged, check the scratch directories.")
+            warning(warn)
+            return
+
+        merge_shards([p.runpath for p in programs], self.runpath, self.file_prefix)
+        if not keep_scratch:
+            for program in programs:
+                shutil.rmtree(program.runpath)
+
+    def to_store(self, store, layout="timeseries", **kwargs):
+        """Stream the netCDF outputs of ``point_type`` into a Zarr store.
+
+        See :func:`pyww3.store.update_store`. Only the time steps not yet in
+        the store are appended, so this can be called again as the outputs
+        grow.
+        """
+        suffixes = {1: "_spec", 2: "_tab", 3: "_src"}
+        if self.point_type not in suffixes:
+            error = (f"Point type {self.point_type} has no netCDF outputs, "
+                     "point_type must be 1, 2 or 3.")
+            raise ValueError(error)
+        suffix = suffixes[self.point_type]
+        return outputs_to_store(self.runpath, self.file_prefix, store,
+                                suffix=suffix, layout=layout, **kwargs)
+
+
+def merge_shards(scratches, runpath, prefix="ww3.", station="station"):
+    """Concatenate the ww3_ounp outputs of :meth:`WW3Ounp.split`.
+
+    Files with the same name in several scratch directories are concatenated
+    along ``station`` in the order of ``scratches``. Other files are moved.
+    """
+    sources = {}
+    for path in scratches:
+        for fname in glob(os.path.join(path, prefix + "*.nc")):
+            sources.setdefault(os.path.relpath(fname, path), []).append(fname)
+
+    for name, files in sorted(sources.items()):
+        target = os.path.join(runpath, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if len(files) == 1:
+            shutil.move(files[0], target)
+            continue
+
+        dss = [xr.open_dataset(fname) for fname in files]
+        out = xr.concat(dss, dim=station, data_vars="minimal", coords="minimal",
+                        compat="override").load()
+        for ds in dss:
+            ds.close()
+
+        if os.path.isfile(target):
+            os.remove(target)
+        out.to_netcdf(target)
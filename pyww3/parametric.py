@@ -0,0 +1,133 @@
+"""
+Parametric (JONSWAP/TMA) frequency-direction spectra for boundary conditions.
+
+The spectra are built on the spectral grid of a :class:`pyww3.grid.WW3GRid`
+from tables of Hs, Tp, Dp and directional spread given per time and boundary
+point. All times of a batch of points are computed with numpy broadcasting
+and written straight to the ``_spec.nc`` files and ``spec.list`` read by
+:class:`pyww3.bounc.WW3Bounc`.
+
+Dp is the nautical direction the peak waves are coming from (clockwise from
+north), as in most wave datasets. The ``_spec.nc`` files follow ww3_ounp and
+hold nautical directions the waves are going to, so Dp is turned by 180
+degrees when the files are written.
+"""
+import os
+
+import numpy as np
+
+from .spectra import (GRAVITY, SPEC_DIRECTION_ATTRS, frequency_bandwidths,
+                      spectral_grid, wavenumber, write_spec_nc)
+from .staging import write_list
+
+
+def jonswap(freq, hs, tp, gamma=3.3, depth=None):
+    """Frequency spectra E(f) (m2/Hz) scaled to the requested Hs.
+
+    ``hs``, ``tp`` and ``depth`` broadcast against each other; the result
+    has their shape plus a trailing frequency dimension. With ``depth``, the
+    TMA depth-limitation factor is applied.
+    """
+    freq = np.asarray(freq, dtype="float64")
+    hs = np.asarray(hs, dtype="float64")[..., None]
+    fp = 1. / np.asarray(tp, dtype="float64")[..., None]
+    gamma = np.asarray(gamma, dtype="float64")[..., None]
+
+    sigma = np.where(freq <= fp, 0.07, 0.09)
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        peak = gamma ** np.exp(-(freq - fp) ** 2 / (2 * sigma ** 2 * fp ** 2))
+        ef = GRAVITY ** 2 * (2 * np.pi) ** -4 * freq ** -5 * \
+            np.exp(-1.25 * (fp / freq) ** 4) * peak
+
+    if depth is not None:
+        depth = np.asarray(depth, dtype="float64")[..., None]
+        k = wavenumber(freq, depth)
+        kh = k * depth
+        with np.errstate(over="ignore", invalid="ignore"):
+            ef = ef * np.tanh(kh) ** 2 / np.where(kh < 20., 1 + 2 * kh / np.sinh(2 * kh), 1.)
+
+    # scale so that the discrete m0 gives exactly hs
+    ef = np.nan_to_num(ef)
+    m0 = ef @ frequency_bandwidths(freq)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(m0[..., None] > 0, (hs / 4.) ** 2 / m0[..., None], 0.)
+    return ef * scale
+
+
+def spreading(dirs, dp, spread):
+    """cos-2s directional distributions D(theta) (1/rad).
+
+    ``spread`` is the directional spread (degrees, Kuik's definition) and
+    sets s = 2 / spread^2 - 1. The result integrates to 1 over the grid.
+    """
+    dirs = np.asarray(dirs, dtype="float64")
+    dp = np.asarray(dp, dtype="float64")[..., None]
+    sigma = np.deg2rad(np.asarray(spread, dtype="float64"))[..., None]
+    s = np.maximum(2. / np.maximum(sigma, 1e-3) ** 2 - 1., 0.)
+
+    half = np.abs(np.cos(np.deg2rad(dirs - dp) / 2.))
+    dist = half ** (2 * s)
+    dth = 2 * np.pi / dirs.size
+    return dist / (dist.sum(axis=-1, keepdims=True) * dth)
+
+
+def parametric_spectra(freq, dirs, hs, tp, dp, spread=30., gamma=3.3, depth=None):
+    """Frequency-direction spectra (m2/Hz/rad), shape (..., nfreq, ndir).
+
+    ``dp`` is in the convention of ``dirs``.
+    """
+    ef = jonswap(freq, hs, tp, gamma, depth)
+    dist = spreading(dirs, dp, spread)
+    return ef[..., :, None] * dist[..., None, :]
+
+
+def write_parametric_boundary(grid, points, times, hs, tp, dp, spread=30.,
+                              gamma=3.3, depth=None, outpath="spc", batch=16,
+                              listfile=None):
+    """Write parametric boundary spectra for ww3_bounc.
+
+    Args:
+        grid: the :class:`pyww3.grid.WW3GRid` defining the spectral grid.
+        points: table with ``lon``, ``lat`` and (optional) ``name`` columns.
+        times: the ntimes output times.
+        hs, tp, dp, spread, gamma, depth: arrays broadcastable to
+            (ntimes, npoints). ``dp`` is the nautical direction the waves
+            are coming from.
+        outpath: directory of the ``_spec.nc`` files.
+        batch: number of points computed at once.
+        listfile: defaults to ``spec.list`` next to ``outpath``.
+
+    Returns the list of files written.
+    """
+    freq, dirs = spectral_grid(grid)
+    os.makedirs(outpath, exist_ok=True)
+
+    lon = np.asarray(points["lon"], dtype="float64")
+    lat = np.asarray(points["lat"], dtype="float64")
+    names = [str(n) for n in points["name"]] if "name" in points else \
+        [f"B{i + 1:04d}" for i in range(lon.size)]
+    shape = (len(times), lon.size)
+    going_to = (np.asarray(dp, dtype="float64") + 180.) % 360.
+    params = [np.broadcast_to(np.asarray(p, dtype="float64"), shape)
+              for p in [hs, tp, going_to, spread, gamma]]
+    depth = None if depth is None else np.broadcast_to(np.asarray(depth, dtype="float64"), shape)
+
+    fnames = []
+    for b0 in range(0, lon.size, batch):
+        sel = slice(b0, b0 + batch)
+        spectra = parametric_spectra(freq, dirs, *[p[:, sel] for p in params[:3]],
+                                     params[3][:, sel], params[4][:, sel],
+                                     None if depth is None else depth[:, sel])
+        for j in range(spectra.shape[1]):
+            b = b0 + j
+            fname = os.path.join(outpath, f"{names[b]}_spec.nc")
+            write_spec_nc(fname, times, lon[b], lat[b], names[b], freq, dirs,
+                          spectra[:, j], SPEC_DIRECTION_ATTRS)
+            fnames.append(fname)
+
+    if listfile is None:
+        listfile = os.path.join(os.path.dirname(os.path.normpath(outpath)), "spec.list")
+    lastp = os.path.basename(os.path.normpath(outpath))
+    write_list(listfile, [os.path.join(lastp, os.path.basename(f)) for f in fnames])
+
+    return fnames
@@ -0,0 +1,221 @@
+"""
+Watershed partitioning of frequency-direction spectra.
+
+Every spectral bin points to its most energetic neighbour (8 neighbours, the
+direction axis is periodic). Following the pointers leads to a local maximum,
+and all the bins draining to the same maximum form a partition. The pointers
+of a whole batch of spectra are resolved at once by pointer jumping, so the
+cost is a few numpy operations per batch instead of a loop per spectrum.
+
+The outputs follow the partition fields of ww3_shel (PHS, PTP, PDIR, PDP and
+PNR). Partition 0 is the wind sea, partitions 1 to ``noswll`` are the swells
+sorted by decreasing height. Without wind information there is no wind sea
+and partition 0 is zero.
+"""
+import functools
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xarray as xr
+
+from .spectra import frequency_bandwidths
+
+GRAVITY = 9.806
+
+# wave age criterion for the wind sea: c_p < WIND_SEA_FACTOR * U cos(dtheta)
+WIND_SEA_FACTOR = 1.7
+
+PARTITION_FIELDS = {"phs": ("Partitioned wave heights", "m"),
+                    "ptp": ("Partitioned peak period", "s"),
+                    "pdir": ("Partitioned mean direction", "degree"),
+                    "pdp": ("Peak wave direction of partition", "degree")}
+
+
+@functools.lru_cache(maxsize=16)
+def neighbour_table(nk, nth):
+    """Indexes of the 8 neighbours (and itself, first) of each spectral bin.
+
+    Bins are numbered ``k * nth + th``. Neighbours outside of the frequency
+    range point to the bin itself.
+    """
+    k, th = np.divmod(np.arange(nk * nth), nth)
+    table = [k * nth + th]
+    for dk in [-1, 0, 1]:
+        for dth in [-1, 0, 1]:
+            if dk == 0 and dth == 0:
+                continue
+            kk = k + dk
+            nb = kk * nth + (th + dth) % nth
+            table.append(np.where((kk >= 0) & (kk < nk), nb, k * nth + th))
+    table = np.stack(table, axis=1)
+    table.flags.writeable = False
+    return table
+
+
+def watershed(energy, table):
+    """Label each bin of a (n, nbins) batch with the index of its peak bin."""
+    neighbours = energy[:, table]  # (n, nbins, 9)
+    ptr = table[np.arange(table.shape[0])[None, :], neighbours.argmax(axis=2)]
+    while True:
+        jump = np.take_along_axis(ptr, ptr, axis=1)
+        if np.array_equal(jump, ptr):
+            return ptr
+        ptr = jump
+
+
+def _partition_block(efth, freq, dirs, noswll, min_hs, wind_speed, wind_dir):
+    """Partition parameters of a (n, nk, nth) block of spectra."""
+    n, nk, nth = efth.shape
+    efth = np.nan_to_num(efth.astype("float64"))
+    df = frequency_bandwidths(freq)
+    dth = 2 * np.pi / nth
+    theta = np.deg2rad(dirs)
+
+    energy = (efth * df[None, :, None] * dth).reshape(n, -1)
+    labels = watershed(energy, neighbour_table(nk, nth))
+
+    # integrals per (spectrum, peak) with bincounts over a flat label
+    flat = (np.arange(n)[:, None] * nk * nth + labels).ravel()
+    unique, inverse = np.unique(flat, return_inverse=True)
+    cos = np.tile(np.cos(theta), nk)[None, :]
+    sin = np.tile(np.sin(theta), nk)[None, :]
+    m0 = np.bincount(inverse, energy.ravel())
+    a = np.bincount(inverse, (energy * cos).ravel())
+    b = np.bincount(inverse, (energy * sin).ravel())
+
+    row, peak = np.divmod(unique, nk * nth)
+    kpeak, thpeak = np.divmod(peak, nth)
+    hs = 4. * np.sqrt(m0)
+    fpeak = freq[kpeak]
+
+    # wind sea: partitions whose peak is forced by the local wind
+    windsea = np.zeros(row.size, dtype=bool)
+    if wind_speed is not None:
+        cp = GRAVITY / (2 * np.pi * fpeak)
+        ucos = wind_speed[row] * np.cos(theta[thpeak] - np.deg2rad(wind_dir[row]))
+        windsea = cp < WIND_SEA_FACTOR * ucos
+
+    out = {key: np.full((n, noswll + 1), np.nan) for key in PARTITION_FIELDS}
+    out["phs"][:] = 0.
+    out["pnr"] = np.zeros(n, dtype="int32")
+
+    # wind sea is the sum of all wind-sea partitions
+    if windsea.any():
+        ws = np.where(windsea)[0]
+        wm0 = np.bincount(row[ws], m0[ws], minlength=n)
+        wa = np.bincount(row[ws], a[ws], minlength=n)
+        wb = np.bincount(row[ws], b[ws], minlength=n)
+        # the peak of the wind sea is the peak of its largest partition
+        order = ws[np.lexsort((-m0[ws], row[ws]))]
+        first = order[np.r_[True, row[order][1:] != row[order][:-1]]]
+        has = wm0 > 0
+        out["phs"][has, 0] = 4. * np.sqrt(wm0[has])
+        out["pdir"][has, 0] = np.rad2deg(np.arctan2(wb[has], wa[has])) % 360.
+        out["ptp"][row[first], 0] = 1. / fpeak[first]
+        out["pdp"][row[first], 0] = dirs[thpeak[first]] % 360.
+
+    # swells, sorted by decreasing height
+    sw = np.where(~windsea & (hs >= min_hs) & (m0 > 0))[0]
+    order = sw[np.lexsort((-m0[sw], row[sw]))]
+    if order.size:
+        start = np.r_[True, row[order][1:] != row[order][:-1]]
+        group_start = np.maximum.accumulate(np.where(start, np.arange(order.size), 0))
+        rank = np.arange(order.size) - group_start
+        out["pnr"] += np.bincount(row[order], minlength=n).astype("int32")
+        keep = rank < noswll
+        sel, r = order[keep], rank[keep] + 1
+        out["phs"][row[sel], r] = hs[sel]
+        out["ptp"][row[sel], r] = 1. / fpeak[sel]
+        out["pdir"][row[sel], r] = np.rad2deg(np.arctan2(b[sel], a[sel])) % 360.
+        out["pdp"][row[sel], r] = dirs[thpeak[sel]] % 360.
+    if windsea.any():
+        out["pnr"] += (out["phs"][:, 0] > 0).astype("int32")
+
+    return out
+
+
+def partition_spectra(efth, freq, dirs, noswll=3, min_hs=0.01, wind_speed=None,
+                      wind_dir=None, chunk=2048, max_workers=1):
+    """Partition many spectra at once.
+
+    Args:
+        efth: array (..., nk, nth) of spectra in m2/Hz/rad.
+        freq: frequencies (Hz).
+        dirs: directions (degrees), regularly spaced and in circular order.
+        noswll: number of swell partitions kept (NOSWLL in ww3_grid).
+        min_hs: swell partitions smaller than this are ignored.
+        wind_speed, wind_dir: optional arrays with the leading shape of
+            ``efth``, to identify the wind sea. The wind direction must use
+            the convention of ``dirs``.
+        chunk: number of spectra per batch.
+        max_workers: number of processes. Use 1 to run in this process.
+
+    Returns a dictionary with phs, ptp, pdir and pdp of shape
+    (..., noswll + 1) and pnr of the leading shape.
+    """
+    efth = np.asarray(efth)
+    shape, (nk, nth) = efth.shape[:-2], efth.shape[-2:]
+    if nk != len(freq) or nth != len(dirs):
+        error = (f"Spectra of shape {efth.shape} do not match {len(freq)} "
+                 f"frequencies and {len(dirs)} directions.")
+        raise ValueError(error)
+
+    if (wind_speed is None) != (wind_dir is None):
+        error = "Both wind_speed and wind_dir are needed to find the wind sea."
+        raise ValueError(error)
+
+    freq = np.asarray(freq, dtype="float64")
+    dirs = np.asarray(dirs, dtype="float64")
+    flat = efth.reshape(-1, nk, nth)
+    if wind_speed is not None:
+        wind_speed = np.broadcast_to(wind_speed, shape).ravel()
+        wind_dir = np.broadcast_to(wind_dir, shape).ravel()
+
+    blocks = []
+    for i in range(0, flat.shape[0], chunk):
+        ws = None if wind_speed is None else wind_speed[i:i + chunk]
+        wd = None if wind_dir is None else wind_dir[i:i + chunk]
+        blocks.append((flat[i:i + chunk], freq, dirs, noswll, min_hs, ws, wd))
+
+    if max_workers == 1 or len(blocks) == 1:
+        results = [_partition_block(*block) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_partition_block, *zip(*blocks)))
+
+    out = {}
+    for key in list(PARTITION_FIELDS) + ["pnr"]:
+        values = np.concatenate([r[key] for r in results])
+        out[key] = values.reshape(shape + values.shape[1:])
+    return out
+
+
+def partition_dataset(ds, var="efth", freq="frequency", dirs="direction",
+                      noswll=3, wind_speed=None, wind_dir=None, **kwargs):
+    """Partition the spectra of a ww3_ounp dataset.
+
+    ``wind_speed`` and ``wind_dir`` can be variable names of ``ds`` (such as
+    "wnd" and "wnddir" in ww3_ounp spectral files). See
+    :func:`partition_spectra` for the other arguments.
+    """
+    ds = ds.sortby(dirs)
+    da = ds[var].transpose(..., freq, dirs)
+    dims = da.dims[:-2]
+
+    if isinstance(wind_speed, str):
+        wind_speed = ds[wind_speed].transpose(*dims).values
+    if isinstance(wind_dir, str):
+        wind_dir = ds[wind_dir].transpose(*dims).values
+
+    params = partition_spectra(da.values, ds[freq].values, ds[dirs].values,
+                               noswll, wind_speed=wind_speed, wind_dir=wind_dir,
+                               **kwargs)
+
+    out = xr.Dataset(coords={dim: ds[dim] for dim in dims if dim in ds.coords})
+    for key, (long_name, units) in PARTITION_FIELDS.items():
+        out[key] = xr.Variable(dims + ("partition",), params[key],
+                               {"long_name": long_name, "units": units})
+    out["pnr"] = xr.Variable(dims, params["pnr"],
+                             {"long_name": "Number of partitions", "units": "1"})
+    return out
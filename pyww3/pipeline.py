@@ -0,0 +1,225 @@
+"""
+Declarative pipelines of WW3 programs.
+
+A pipeline file (YAML, or JSON) lists stages, each one a WW3 program and the
+arguments of its pyww3 class::
+
+    runpath: run/
+    stages:
+      - name: grid
+        program: ww3_grid
+        args: {grid_name: GLOB, grid_nml: GLOB.nml, ...}
+      - name: shel
+        program: ww3_shel
+        after: [grid]
+        mpi: true
+        nproc: 8
+        args: {mod_def: run/mod_def.ww3, domain_start: 2021-01-01, ...}
+
+``runpath`` defaults to the pipeline ``runpath``. A stage runs after the
+stages listed in ``after`` (by default, after the previous stage), so
+independent stages run concurrently. The program instances are only built
+when their stage starts, so they can use the files of earlier stages.
+
+The progress is kept in a state file next to the pipeline file, which
+:func:`pipeline_status` reads and which allows resuming a pipeline.
+"""
+import os
+import json
+import datetime
+import threading
+
+from dataclasses import fields
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .grid import WW3GRid
+from .prnc import WW3Prnc
+from .shel import WW3Shel
+from .ounf import WW3Ounf
+from .ounp import WW3Ounp
+from .bounc import WW3Bounc
+
+PROGRAMS = {cls.EXE: cls for cls in [WW3GRid, WW3Prnc, WW3Shel, WW3Ounf,
+                                     WW3Ounp, WW3Bounc]}
+
+# stage status values
+PENDING, RUNNING, DONE, FAILED, SKIPPED = "pending", "running", "done", "failed", "skipped"
+
+
+def _yaml():
+    """Import yaml, which is an optional dependency."""
+    try:
+        import yaml
+    except ImportError:
+        error = "YAML pipelines need pyyaml. Install it with \'pip install pyyaml\', or use JSON."
+        raise ImportError(error)
+    return yaml
+
+
+def load_pipeline(fname):
+    """Read and validate a pipeline file.
+
+    Returns the list of stages, each a dictionary with ``name``,
+    ``program``, ``after``, ``mpi``, ``nproc``, ``launch`` and ``args``.
+    """
+    with open(fname, "r") as f:
+        if fname.endswith(".json"):
+            config = json.load(f)
+        else:
+            config = _yaml().safe_load(f)
+
+    if not isinstance(config, dict) or not config.get("stages"):
+        error = f"Pipeline \'{fname}\' has no stages."
+        raise ValueError(error)
+
+    stages, names = [], set()
+    for i, stage in enumerate(config["stages"]):
+        name = str(stage.get("name", f"stage{i + 1:02d}"))
+        if name in names:
+            error = f"Stage name \'{name}\' is used twice."
+            raise ValueError(error)
+        program = stage.get("program", "")
+        if program not in PROGRAMS:
+            error = f"Stage \'{name}\': program must be: {','.join(PROGRAMS)}"
+            raise ValueError(error)
+
+        after = stage.get("after", [stages[-1]["name"]] if stages else [])
+        after = [after] if isinstance(after, str) else list(after)
+        unknown = [a for a in after if a not in names]
+        if unknown:
+            error = (f"Stage \'{name}\' runs after unknown (or later) stages: "
+                     f"{','.join(unknown)}")
+            raise ValueError(error)
+
+        args = dict(stage.get("args", {}))
+        args.setdefault("runpath", stage.get("runpath", config.get("runpath")))
+        stages.append({"name": name, "program": program, "after": after,
+                       "mpi": bool(stage.get("mpi", False)),
+                       "nproc": stage.get("nproc"),
+                       "launch": dict(stage.get("launch", {})), "args": args})
+        names.add(name)
+    return stages
+
+
+def build_program(stage):
+    """The pyww3 instance of a stage. Dates given as strings are parsed."""
+    cls = PROGRAMS[stage["program"]]
+    args = dict(stage["args"])
+    for f in fields(cls):
+        if f.name in args and f.type is datetime.datetime and \
+                isinstance(args[f.name], (str, datetime.date)):
+            value = args[f.name]
+            if isinstance(value, str):
+                value = datetime.datetime.fromisoformat(value)
+            elif not isinstance(value, datetime.datetime):
+                value = datetime.datetime(value.year, value.month, value.day)
+            args[f.name] = value
+    return cls(**args)
+
+
+def state_file(fname):
+    """State file of a pipeline file."""
+    return os.path.splitext(fname)[0] + ".state.json"
+
+
+def load_state(fname):
+    """Read the state of a pipeline (empty if it never ran)."""
+    sfile = state_file(fname)
+    if not os.path.isfile(sfile):
+        return {}
+    with open(sfile, "r") as f:
+        return json.load(f)
+
+
+class _State():
+    """Thread-safe state of a pipeline, saved on every update."""
+
+    def __init__(self, fname, stages, resume):
+        self.fname = state_file(fname)
+        self.lock = threading.Lock()
+        previous = load_state(fname) if resume else {}
+        self.stages = {}
+        for stage in stages:
+            entry = previous.get(stage["name"], {})
+            if entry.get("status") != DONE:
+                entry = {"status": PENDING}
+            self.stages[stage["name"]] = entry
+        self.save()
+
+    def save(self):
+        tmp = self.fname + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.stages, f, indent=2)
+        os.replace(tmp, self.fname)
+
+    def update(self, name, **values):
+        with self.lock:
+            self.stages[name].update(values)
+            self.save()
+
+    def status(self, name):
+        return self.stages[name]["status"]
+
+
+def _run_stage(stage, nproc, state):
+    """Build, write and run the program of a stage."""
+    started = datetime.datetime.now()
+    state.update(stage["name"], status=RUNNING, started=started.isoformat())
+    try:
+        program = build_program(stage)
+        program.to_file()
+        program.run(mpi=stage["mpi"], nproc=stage["nproc"] or nproc, **stage["launch"])
+        returncode, message = program.returncode, ""
+    except Exception as e:
+        returncode, message = None, str(e)
+
+    finished = datetime.datetime.now()
+    state.update(stage["name"], status=DONE if returncode == 0 else FAILED,
+                 finished=finished.isoformat(), returncode=returncode,
+                 wall=(finished - started).total_seconds(), error=message)
+    return returncode == 0
+
+
+def run_pipeline(fname, max_workers=1, nproc=2, resume=False):
+    """Run the stages of a pipeline file.
+
+    Args:
+        fname: the pipeline file.
+        max_workers: number of stages running at the same time.
+        nproc: MPI processes of the MPI stages that do not set ``nproc``.
+        resume: skip the stages that completed in a previous run.
+
+    Returns True if all the stages completed. The stages depending on a
+    failed stage are skipped.
+    """
+    stages = load_pipeline(fname)
+    state = _State(fname, stages, resume)
+    todo = [s for s in stages if state.status(s["name"]) != DONE]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while todo or running:
+            for stage in list(todo):
+                status = [state.status(a) for a in stage["after"]]
+                if any(s in [FAILED, SKIPPED] for s in status):
+                    state.update(stage["name"], status=SKIPPED)
+                    todo.remove(stage)
+                elif all(s == DONE for s in status):
+                    running[pool.submit(_run_stage, stage, nproc, state)] = stage
+                    todo.remove(stage)
+            if not running:
+                continue  # everything left was skipped
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for job in finished:
+                job.result()
+                running.pop(job)
+
+    return all(state.status(s["name"]) == DONE for s in stages)
+
+
+def pipeline_status(fname):
+    """Status of each stage of a pipeline, in pipeline order."""
+    state = load_state(fname)
+    return [dict(name=stage["name"], program=stage["program"],
+                 **state.get(stage["name"], {"status": PENDING}))
+            for stage in load_pipeline(fname)]
@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from textwrap import dedent as dtxt
 
 from .utils import (bool_to_str, verify_runpath, verify_mod_def)
+from .encoding import write_forcing
+from .qa import scan_forcing
 
 from .ww3 import WW3Base
 
@@ -43,6 +45,7 @@ class WW3Prnc(WW3Base):
     forcing_timestart: datetime.datetime = datetime.datetime(1900, 1, 1)
     forcing_timestop: datetime.datetime = datetime.datetime(2900, 12, 31)
     file_timeshift: str = "00000000 000000"
+    forcing_grid_asis: bool = False
 
     VALID_FORCING_FIELDS = ["ICE_PARAM1",
                             "ICE_PARAM2",
@@ -89,16 +92,15 @@ class WW3Prnc(WW3Base):
                      f" forcing field. Options are {self.VALID_FORCING_FIELDS}")
             raise ValueError(error)
 
-        # set forcing_grid_latlon to either t or f
-        if isinstance(self.forcing_grid_latlon, bool):
-            if self.forcing_grid_latlon:
-                self.__setattr__("forcing_grid_latlon", "t")
-            else:
-                self.__setattr__("forcing_grid_latlon", "f")
-        else:
+        # forcing_grid_latlon is converted to t or f in the namelist
+        if not isinstance(self.forcing_grid_latlon, bool):
             error = "forcing_grid_latlon must be a boolean."
             raise ValueError(error)
 
+        if not isinstance(self.forcing_grid_asis, bool):
+            error = "forcing_grid_asis must be a boolean."
+            raise ValueError(error)
+
         # try to load the netcdf to validate againt what was passed to the
         # class constructor.
         if not os.path.isfile(self.file_filename):
@@ -259,6 +261,7 @@ class WW3Prnc(WW3Base):
                       FORCING%TIMESTART = '{self.forcing_timestart.strftime(self.DATE_FORMAT)}'
                       FORCING%TIMESTOP = '{self.forcing_timestop.strftime(self.DATE_FORMAT)}'
                       FORCING%FIELD%{self.forcing_field} = t
+                      FORCING%GRID%ASIS = {bool_to_str(self.forcing_grid_asis).lower()}
                       FORCING%GRID%LATLON = {bool_to_str(self.forcing_grid_latlon).lower()}
                     /
 
@@ -312,8 +315,13 @@ class WW3Prnc(WW3Base):
 
         return txt
 
-    def reverse_latitudes(self, newfilename):
-        """Reverse latitudes if requested"""
+    def reverse_latitudes(self, newfilename, precision=None):
+        """Reverse latitudes if requested.
+
+        The new file is packed and compressed following
+        :func:`pyww3.encoding.forcing_encoding`. ``precision`` overrides the
+        precision budget of some variables.
+        """
 
         # open the dataset
         inp = os.path.join(self.runpath, self.file_filename)
@@ -331,7 +339,7 @@ class WW3Prnc(WW3Base):
 
             # write to file
             out = os.path.join(self.runpath, os.path.basename(newfilename))
-            newds.to_netcdf(out)
+            write_forcing(newds, out, precision)
             newds.close()
 
             # update class attribute
@@ -346,4 +354,80 @@ class WW3Prnc(WW3Base):
                              os.path.basename(self.file_filename))
             self.__setattr__("text", self.populate_namelist())
 
-        ds.close()
\ No newline at end of file
+        ds.close()
+
+    def variables(self):
+        """List the forcing variables that are set."""
+        return [self.__getattribute__(attr) for attr in
+                ["file_var_1", "file_var_2", "file_var_3"]
+                if self.__getattribute__(attr) != " "]
+
+    def qa(self, sea_mask=None, cadence=None, chunk=24):
+        """Scan the forcing file for problems before running ww3_prnc.
+
+        See :func:`pyww3.qa.scan_forcing`. The forcing period is only checked
+        if ``forcing_timestart`` and ``forcing_timestop`` were set.
+        """
+        timestart = self.forcing_timestart
+        if timestart == datetime.datetime(1900, 1, 1):
+            timestart = None
+        timestop = self.forcing_timestop
+        if timestop == datetime.datetime(2900, 12, 31):
+            timestop = None
+
+        report = scan_forcing(os.path.join(self.runpath, self.file_filename),
+                              self.variables(),
+                              forcing_field=self.forcing_field,
+                              sea_mask=sea_mask,
+                              cadence=cadence,
+                              timestart=timestart,
+                              timestop=timestop,
+                              chunk=chunk)
+        print(report.summary())
+        return report
+
+    def regrid(self, newfilename, regridder, precision=None):
+        """Interpolate the forcing onto the model grid.
+
+        Uses the weights from a :class:`pyww3.regrid.Regridder`, one time
+        step at a time. The new file is written in the run path, packed as in
+        :meth:`reverse_latitudes`, and the class is updated to use it with
+        ``FORCING%GRID%ASIS``, so the regridder must target the model grid
+        (see :meth:`pyww3.regrid.Regridder.from_grid`).
+
+        UNST grids are not supported: ww3_prnc only reads forcing on a
+        regular or curvilinear grid and interpolates it on the mesh nodes
+        itself.
+        """
+        if regridder.dst_type == "UNST":
+            error = ("ww3_prnc cannot read forcing on the nodes of a UNST grid. "
+                     "Give it the regular forcing grid instead.")
+            raise ValueError(error)
+
+        # open the dataset
+        inp = os.path.join(self.runpath, self.file_filename)
+        ds = xr.open_dataset(inp)
+
+        variables = self.variables()
+
+        print("Regridding forcing, please wait...")
+        newds = regridder.regrid(ds, variables,
+                                 lon=self.file_longitude,
+                                 lat=self.file_latitude)
+
+        # write to file
+        out = os.path.join(self.runpath, os.path.basename(newfilename))
+        write_forcing(newds, out, precision)
+        newds.close()
+        ds.close()
+
+        # update class attributes
+        self.__setattr__("file_filename", os.path.basename(out))
+        self.__setattr__("file_longitude", "longitude")
+        self.__setattr__("file_latitude", "latitude")
+        self.__setattr__("forcing_grid_asis", True)
+        if regridder.dst_type != "RECT":
+            self.__setattr__("forcing_grid_latlon", False)
+
+        # update namelist
+        self.__setattr__("text", self.populate_namelist())
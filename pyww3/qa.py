@@ -0,0 +1,187 @@
+"""
+Pre-flight quality checks for forcing files.
+
+The scan walks the forcing variables a few time steps at a time so that
+memory use does not depend on the length of the file.
+"""
+import datetime
+
+from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
+import xarray as xr
+
+# physically plausible range for each forcing field. Two-component fields
+# are checked on their magnitude.
+VALID_RANGES = {"WINDS": (0., 80.),
+                "WIND_AST": (0., 80.),
+                "CURRENTS": (0., 10.),
+                "WATER_LEVELS": (-20., 20.),
+                "ICE_CONC": (0., 1.),
+                "ICE_PARAM1": (0., 100.),
+                "AIR_DENSITY": (0.5, 2.)}
+
+VECTOR_FIELDS = ["WINDS", "WIND_AST", "CURRENTS", "ATM_MOMENTUM"]
+
+# anything this large is an undecoded fill value
+FILL_THRESHOLD = 1e20
+
+
+@dataclass
+class ForcingReport():
+    """Result of :func:`scan_forcing`."""
+
+    filename: str
+    variables: List[str]
+    ntimes: int = 0
+    cadence: datetime.timedelta = datetime.timedelta(0)
+    first_time: datetime.datetime = None
+    last_time: datetime.datetime = None
+    gaps: List[Tuple[datetime.datetime, datetime.datetime]] = field(default_factory=list)
+    missing_steps: int = 0
+    coverage_problems: List[str] = field(default_factory=list)
+    nan_fraction: Dict[str, float] = field(default_factory=dict)
+    nan_steps: Dict[str, int] = field(default_factory=dict)
+    out_of_range: int = 0
+    first_out_of_range: datetime.datetime = None
+    valid_range: Tuple[float, float] = None
+
+    @property
+    def ok(self):
+        """True if no problem was found."""
+        return not (self.missing_steps or self.coverage_problems or
+                    self.out_of_range or any(self.nan_steps.values()))
+
+    def summary(self):
+        """Human readable summary of the scan."""
+        lines = [f"Forcing file \'{self.filename}\': {self.ntimes} time steps "
+                 f"from {self.first_time} to {self.last_time}, "
+                 f"every {self.cadence}."]
+        for start, stop in self.gaps:
+            lines.append(f"  gap between {start} and {stop}.")
+        if self.missing_steps:
+            lines.append(f"  {self.missing_steps} missing time steps in total.")
+        lines.extend(f"  {problem}" for problem in self.coverage_problems)
+        for var in self.variables:
+            if self.nan_steps.get(var):
+                lines.append(f"  {var}: NaN/fill in {self.nan_steps[var]} time "
+                             f"steps ({100 * self.nan_fraction[var]:.3f}% "
+                             "of sea values).")
+        if self.out_of_range:
+            lines.append(f"  {self.out_of_range} values outside of "
+                         f"{self.valid_range}, first at {self.first_out_of_range}.")
+        if self.ok:
+            lines.append("  No problems found.")
+        return "\n".join(lines)
+
+
+def _to_datetime(value):
+    """Convert a numpy or cftime date to datetime.datetime."""
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[us]").item()
+    return value
+
+
+def scan_forcing(filename, variables, forcing_field=None, sea_mask=None,
+                 cadence=None, timestart=None, timestop=None,
+                 valid_range=None, time="time", chunk=24):
+    """Scan a forcing file for gaps, NaNs/fill values and bad values.
+
+    Args:
+        filename: the forcing netCDF file.
+        variables: variable names, e.g. ["u10", "v10"].
+        forcing_field: one of WW3Prnc.VALID_FORCING_FIELDS. Used to pick the
+            valid range and whether the variables are vector components.
+        sea_mask: boolean (lat, lon) array, True over the sea. NaNs are only
+            counted over the sea. Defaults to the whole grid.
+        cadence: expected time step as datetime.timedelta. Defaults to the
+            most common time step in the file.
+        timestart, timestop: period that must be covered by the file.
+        valid_range: (min, max) overriding :data:`VALID_RANGES`.
+        time: name of the time dimension.
+        chunk: number of time steps read at once.
+    """
+    report = ForcingReport(filename=filename, variables=list(variables))
+    if valid_range is None:
+        valid_range = VALID_RANGES.get(forcing_field)
+    report.valid_range = valid_range
+
+    with xr.open_dataset(filename) as ds:
+
+        # time axis
+        times = ds[time].values
+        report.ntimes = times.size
+        if times.size == 0:
+            report.coverage_problems.append("The file has no time steps.")
+            return report
+
+        report.first_time = _to_datetime(times[0])
+        report.last_time = _to_datetime(times[-1])
+        seconds = np.diff(times).astype("timedelta64[s]").astype("int64")
+
+        if cadence is None and seconds.size:
+            steps, counts = np.unique(seconds, return_counts=True)
+            cadence = datetime.timedelta(seconds=int(steps[counts.argmax()]))
+        if cadence:
+            report.cadence = cadence
+            step = cadence.total_seconds()
+            for i in np.where(seconds > step)[0]:
+                report.gaps.append((_to_datetime(times[i]),
+                                    _to_datetime(times[i + 1])))
+                report.missing_steps += int(round(seconds[i] / step)) - 1
+            if (seconds <= 0).any():
+                report.coverage_problems.append("Times are not increasing.")
+
+        if timestart and timestart < report.first_time:
+            report.coverage_problems.append(
+                f"The file starts at {report.first_time}, after {timestart}.")
+        if timestop and timestop > report.last_time:
+            report.coverage_problems.append(
+                f"The file stops at {report.last_time}, before {timestop}.")
+
+        # field values
+        vector = forcing_field in VECTOR_FIELDS and len(report.variables) >= 2
+        nan_count = {var: 0 for var in report.variables}
+        nan_steps = {var: 0 for var in report.variables}
+        nsea = 0
+
+        for t in range(0, report.ntimes, chunk):
+            block = {var: ds[var].isel({time: slice(t, t + chunk)}).values
+                     for var in report.variables}
+
+            for var, values in block.items():
+                bad = ~np.isfinite(values) | (np.abs(values) >= FILL_THRESHOLD)
+                if sea_mask is not None:
+                    bad &= sea_mask
+                nan_count[var] += int(bad.sum())
+                nan_steps[var] += int(bad.reshape(bad.shape[0], -1).any(axis=1).sum())
+
+            first = block[report.variables[0]]
+            ncells = first[0].size if sea_mask is None else int(sea_mask.sum())
+            nsea += first.shape[0] * ncells
+
+            if valid_range:
+                if vector:
+                    values = np.hypot(block[report.variables[0]],
+                                      block[report.variables[1]])
+                    blocks = [values]
+                else:
+                    blocks = list(block.values())
+                for values in blocks:
+                    with np.errstate(invalid="ignore"):
+                        wrong = (values < valid_range[0]) | (values > valid_range[1])
+                    wrong &= np.abs(values) < FILL_THRESHOLD
+                    if sea_mask is not None:
+                        wrong &= sea_mask
+                    if wrong.any():
+                        if report.first_out_of_range is None:
+                            it = np.where(wrong.reshape(wrong.shape[0], -1).any(axis=1))[0][0]
+                            report.first_out_of_range = _to_datetime(times[t + it])
+                        report.out_of_range += int(wrong.sum())
+
+        report.nan_steps = nan_steps
+        report.nan_fraction = {var: nan_count[var] / max(nsea, 1)
+                               for var in report.variables}
+
+    return report
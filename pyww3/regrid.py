@@ -0,0 +1,249 @@
+"""
+Interpolation weights to move forcing fields onto the model grid.
+
+Weights are computed once for a pair of grids and stored as a fixed number of
+(index, weight) pairs per target point, which is a sparse matrix in disguise.
+Applying them to a time step is a gather followed by a weighted sum.
+"""
+import os
+import hashlib
+
+import numpy as np
+import xarray as xr
+
+from dataclasses import dataclass
+
+from .geometry import grid_coordinates
+
+
+def grid_fingerprint(*arrays):
+    """Hash coordinate arrays so that cached weights can be matched to grids."""
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype="float64")
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _axis_weights(src, dst, periodic=False):
+    """Find the bracketing source indices and linear fractions along an axis.
+
+    Target values outside the source axis get NaN fractions.
+    """
+    order = np.argsort(src)
+    s = np.asarray(src, dtype="float64")[order]
+    dst = np.asarray(dst, dtype="float64")
+
+    if periodic:
+        # close the circle so that points between the last and first
+        # longitudes are bracketed too
+        dst = s[0] + np.mod(dst - s[0], 360.)
+        s = np.concatenate([s, s[:1] + 360.])
+        order = np.concatenate([order, order[:1]])
+
+    i = np.clip(np.searchsorted(s, dst, side="right") - 1, 0, s.size - 2)
+    frac = (dst - s[i]) / (s[i + 1] - s[i])
+    frac[(dst < s[0]) | (dst > s[-1])] = np.nan
+
+    return order[i], order[i + 1], frac
+
+
+def compute_weights(src_lon, src_lat, dst_lon, dst_lat, method="bilinear",
+                    periodic=None):
+    """Compute interpolation weights from a rectilinear source grid.
+
+    Args:
+        src_lon, src_lat: 1D source coordinates (any ordering).
+        dst_lon, dst_lat: target point coordinates, same shape.
+        method: either "bilinear" or "nearest".
+        periodic: wrap longitudes. Guessed from the source grid if None.
+
+    Returns:
+        index, weight: (npoints, k) arrays indexing the flattened
+        (lat, lon) source field. k is 4 for bilinear and 1 for nearest.
+    """
+    if method not in ["bilinear", "nearest"]:
+        raise ValueError("method must be either \'bilinear\' or \'nearest\'.")
+
+    src_lon = np.asarray(src_lon, dtype="float64")
+    src_lat = np.asarray(src_lat, dtype="float64")
+    dst_lon = np.asarray(dst_lon, dtype="float64").ravel()
+    dst_lat = np.asarray(dst_lat, dtype="float64").ravel()
+    nx = src_lon.size
+
+    if periodic is None:
+        dx = np.abs(np.diff(np.sort(src_lon))).min()
+        periodic = np.ptp(src_lon) + 1.5 * dx >= 360.
+
+    if not periodic:
+        # bring the target longitudes to the source convention
+        dst_lon = np.where(dst_lon > src_lon.max(), dst_lon - 360., dst_lon)
+        dst_lon = np.where(dst_lon < src_lon.min(), dst_lon + 360., dst_lon)
+
+    i0, i1, fx = _axis_weights(src_lon, dst_lon, periodic)
+    j0, j1, fy = _axis_weights(src_lat, dst_lat)
+
+    if method == "nearest":
+        i = np.where(fx < 0.5, i0, i1)
+        j = np.where(fy < 0.5, j0, j1)
+        index = (j * nx + i)[:, None]
+        weight = np.ones(index.shape)
+        weight[np.isnan(fx) | np.isnan(fy)] = np.nan
+    else:
+        index = np.stack([j0 * nx + i0, j0 * nx + i1,
+                          j1 * nx + i0, j1 * nx + i1], axis=1)
+        weight = np.stack([(1 - fy) * (1 - fx), (1 - fy) * fx,
+                           fy * (1 - fx), fy * fx], axis=1)
+
+    return index.astype("int64"), weight
+
+
+def apply_weights(field, index, weight):
+    """Apply interpolation weights to the last two (lat, lon) dimensions.
+
+    NaNs in the source (e.g. land in an ice field) are skipped and the
+    remaining weights renormalised. Points with no valid neighbour are NaN.
+    """
+    field = np.asarray(field)
+    lead = field.shape[:-2]
+    flat = field.reshape(lead + (-1,))
+
+    values = flat[..., index]  # (..., npoints, k)
+    w = np.broadcast_to(weight, values.shape)
+    valid = np.isfinite(values) & np.isfinite(w)
+
+    num = np.where(valid, values * w, 0.).sum(axis=-1)
+    den = np.where(valid, w, 0.).sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(den > 0, num / den, np.nan)
+
+    return out.astype(field.dtype if field.dtype.kind == "f" else "float64")
+
+
+@dataclass
+class Regridder():
+    """Interpolate forcing fields from a regular lat/lon grid to a WW3 grid.
+
+    The target can be a RECT grid (1D ``dst_lon`` and ``dst_lat``), a CURV
+    grid (2D arrays) or a UNST mesh (1D node arrays, ``dst_type="UNST"``).
+    ww3_prnc cannot read fields on mesh nodes, so UNST targets are only
+    useful for analysis, not for :meth:`pyww3.prnc.WW3Prnc.regrid`. If
+    ``cache_dir`` is set, the weights are stored there keyed by the
+    fingerprints of both grids and re-used on the next call.
+    """
+
+    src_lon: np.ndarray
+    src_lat: np.ndarray
+    dst_lon: np.ndarray
+    dst_lat: np.ndarray
+
+    dst_type: str = "RECT"
+    method: str = "bilinear"
+    cache_dir: str = ""
+
+    def __post_init__(self):
+        """Validate the inputs and load or compute the weights."""
+
+        if self.dst_type not in ["RECT", "CURV", "UNST"]:
+            raise ValueError("dst_type type must be: RECT,CURV,UNST")
+
+        self.__setattr__("src_lon", np.asarray(self.src_lon, dtype="float64"))
+        self.__setattr__("src_lat", np.asarray(self.src_lat, dtype="float64"))
+        self.__setattr__("dst_lon", np.asarray(self.dst_lon, dtype="float64"))
+        self.__setattr__("dst_lat", np.asarray(self.dst_lat, dtype="float64"))
+
+        if self.src_lon.ndim != 1 or self.src_lat.ndim != 1:
+            raise ValueError("The source grid must be given as 1D coordinates.")
+
+        # target points
+        if self.dst_type == "RECT":
+            lon, lat = np.meshgrid(self.dst_lon, self.dst_lat)
+            shape = lat.shape
+        else:
+            if self.dst_lon.shape != self.dst_lat.shape:
+                raise ValueError("dst_lon and dst_lat must have the same shape.")
+            lon, lat = self.dst_lon, self.dst_lat
+            shape = lat.shape
+        self.__setattr__("shape", shape)
+
+        src_id = grid_fingerprint(self.src_lon, self.src_lat)
+        dst_id = grid_fingerprint(self.dst_lon, self.dst_lat)
+        self.__setattr__("src_id", src_id)
+        self.__setattr__("dst_id", dst_id)
+
+        cache = None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cache = os.path.join(self.cache_dir,
+                                 f"weights_{self.method}_{self.dst_type}_"
+                                 f"{src_id[:16]}_{dst_id[:16]}.npz")
+
+        if cache and os.path.isfile(cache):
+            with np.load(cache) as w:
+                index, weight = w["index"], w["weight"]
+        else:
+            index, weight = compute_weights(self.src_lon, self.src_lat,
+                                            lon, lat, self.method)
+            if cache:
+                np.savez(cache, index=index, weight=weight)
+
+        self.__setattr__("index", index)
+        self.__setattr__("weight", weight)
+
+    @classmethod
+    def from_grid(cls, grid, src_lon, src_lat, method="bilinear",
+                  cache_dir=""):
+        """Build a regridder targeting a :class:`pyww3.grid.WW3GRid`."""
+        x, y = grid_coordinates(grid)
+        return cls(src_lon, src_lat, x, y, dst_type=grid.grid_type,
+                   method=method, cache_dir=cache_dir)
+
+    def dims(self):
+        """Dimension names used for regridded fields."""
+        if self.dst_type == "RECT":
+            return ("latitude", "longitude")
+        elif self.dst_type == "CURV":
+            return ("y", "x")
+        else:
+            return ("node",)
+
+    def coords(self):
+        """Coordinates used for regridded fields."""
+        if self.dst_type == "RECT":
+            return {"longitude": ("longitude", self.dst_lon),
+                    "latitude": ("latitude", self.dst_lat)}
+        return {"longitude": (self.dims(), self.dst_lon),
+                "latitude": (self.dims(), self.dst_lat)}
+
+    def regrid_array(self, field):
+        """Regrid a numpy array whose last two dimensions are (lat, lon)."""
+        field = np.asarray(field)
+        out = apply_weights(field, self.index, self.weight)
+        return out.reshape(field.shape[:-2] + self.shape)
+
+    def regrid(self, ds, variables, lon="longitude", lat="latitude",
+               time="time"):
+        """Regrid some variables of a dataset, one time step at a time."""
+        dims = self.dims()
+        out = xr.Dataset(coords=self.coords())
+        if time in ds.coords:
+            out = out.assign_coords({time: ds[time]})
+
+        for var in variables:
+            da = ds[var].transpose(..., lat, lon)
+            lead = da.dims[:-2]
+            values = np.empty(da.shape[:-2] + self.shape, dtype="float32")
+
+            if time in lead:
+                axis = lead.index(time)
+                for t in range(da.sizes[time]):
+                    step = da.isel({time: t}).values
+                    values[(slice(None),) * axis + (t,)] = \
+                        self.regrid_array(step)
+            else:
+                values[...] = self.regrid_array(da.values)
+
+            out[var] = (lead + dims, values, da.attrs)
+
+        return out
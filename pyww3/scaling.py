@@ -0,0 +1,193 @@
+"""
+Strong-scaling calibration of ww3_shel and nproc recommendations.
+
+Short segments of a :class:`pyww3.shel.WW3Shel` run (outputs switched off)
+are timed at several process counts, each in its own scratch directory. The
+wall-clock times are fitted with the strong-scaling model
+
+    T(n) = serial + parallel / n + overhead * n
+
+where ``overhead`` captures the communication cost that eventually makes
+more processes slower. The measurements are cached per mod_def (by content
+hash), so the calibration only runs once per model setup.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import datetime
+
+from dataclasses import replace
+from logging import warning
+
+import numpy as np
+
+from .utils import make_scratch
+
+CACHE = "pyww3_scaling.json"
+
+# files of the run path that are not inputs of ww3_shel
+_OUTPUTS = ("out_", "log.", "ww3_shel.nml", "test", CACHE)
+
+
+def mod_def_hash(fname):
+    """Content hash of a mod_def file."""
+    digest = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def calibration_segment(shel, hours=6., name="scaling"):
+    """A copy of ``shel`` running the first ``hours`` without outputs.
+
+    The copy runs in the scratch directory ``runpath/name``, with links to
+    the inputs of the original run path.
+    """
+    files = [f for f in os.listdir(shel.runpath)
+             if os.path.isfile(os.path.join(shel.runpath, f)) and
+             not f.startswith(_OUTPUTS)]
+    scratch = make_scratch(shel.runpath, name, files)
+    stop = min(shel.domain_start + datetime.timedelta(hours=hours), shel.domain_stop)
+    return replace(shel, runpath=scratch, mod_def=os.path.join(scratch, "mod_def.ww3"),
+                   domain_stop=stop, date_field_stride=0, date_point_stride=0,
+                   date_track_stride=0, date_restart_stride=0,
+                   date_boundary_stride=0, date_partition_stride=0,
+                   date_coupling_stride=0)
+
+
+def calibrate(shel, nprocs=(1, 2, 4, 8), hours=6., repeats=1, keep_scratch=False):
+    """Time ``hours`` of ``shel`` with each process count of ``nprocs``.
+
+    The scratch directory of each nproc is removed once it is timed, unless
+    ``keep_scratch`` is set. The scratch directory of a failed run is kept.
+    Returns a dictionary of the best wall-clock time (s) of each nproc.
+    """
+    seconds = {}
+    for n in nprocs:
+        segment = calibration_segment(shel, hours, name=f"scaling_n{n:04d}")
+        segment.to_file()
+        best = np.inf
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            segment.run(mpi=n > 1, nproc=n)
+            elapsed = time.perf_counter() - t0
+            if segment.returncode != 0:
+                error = (f"The calibration run with nproc={n} failed, "
+                         f"see \'{segment.runpath}\'.")
+                raise RuntimeError(error)
+            best = min(best, elapsed)
+        seconds[int(n)] = best
+        if not keep_scratch:
+            shutil.rmtree(segment.runpath)
+    return seconds
+
+
+def nonnegative_lstsq(basis, values):
+    """Least squares coefficients, dropping the terms that come out negative."""
+    active = np.ones(basis.shape[1], dtype=bool)
+    coeffs = np.zeros(basis.shape[1])
+    while active.any():
+        coeffs[:] = 0.
+        coeffs[active] = np.linalg.lstsq(basis[:, active], values, rcond=None)[0]
+        if (coeffs >= 0).all():
+            break
+        active &= coeffs > 0
+    return coeffs
+
+
+def fit_scaling(nprocs, seconds):
+    """Non-negative (serial, parallel, overhead) coefficients of T(n)."""
+    n = np.asarray(nprocs, dtype="float64")
+    t = np.asarray(seconds, dtype="float64")
+    basis = np.stack([np.ones_like(n), 1. / n, n], axis=1)
+    return nonnegative_lstsq(basis, t)
+
+
+def predict(coeffs, nproc):
+    """Wall-clock time (s) predicted by the scaling model."""
+    n = np.asarray(nproc, dtype="float64")
+    return coeffs[0] + coeffs[1] / n + coeffs[2] * n
+
+
+def recommend(coeffs, max_nproc, deadline=None, factor=1., min_efficiency=0.7):
+    """Recommended number of processes.
+
+    Args:
+        coeffs: the scaling model (see :func:`fit_scaling`).
+        max_nproc: largest number of processes available.
+        deadline: wall-clock time (s) the run must take at most. The cheapest
+            nproc (in core-hours) meeting it is chosen.
+        factor: length of the run relative to the calibration segments.
+        min_efficiency: without a deadline, the largest nproc whose parallel
+            efficiency T(1) / (n T(n)) is at least this is chosen.
+    """
+    n = np.arange(1, int(max_nproc) + 1)
+    wall = predict(coeffs, n) * factor
+    if deadline is not None:
+        ok = wall <= deadline
+        if not ok.any():
+            warn = (f"No nproc up to {max_nproc} meets the deadline of {deadline} s, "
+                    "using the fastest.")
+            warning(warn)
+            return int(n[np.argmin(wall)])
+        return int(n[ok][np.argmin((n * wall)[ok])])
+
+    efficiency = wall[0] / (n * wall)
+    # never go past the fastest nproc
+    ok = (efficiency >= min_efficiency) & (n <= n[np.argmin(wall)])
+    return int(n[ok].max()) if ok.any() else 1
+
+
+def load_cache(fname):
+    """Read the calibrations cache."""
+    if not os.path.isfile(fname):
+        return {}
+    with open(fname, "r") as f:
+        return json.load(f)
+
+
+def autotune(shel, nprocs=(1, 2, 4, 8), hours=6., deadline=None,
+             min_efficiency=0.7, max_nproc=None, cache=None, force=False,
+             keep_scratch=False):
+    """Recommend the nproc of a WW3Shel run, calibrating it if needed.
+
+    Args:
+        shel: the :class:`pyww3.shel.WW3Shel` to tune.
+        nprocs: process counts to time.
+        hours: length of the calibration segments.
+        deadline: wall-clock time (s) of the whole run, see :func:`recommend`.
+        min_efficiency: see :func:`recommend`.
+        max_nproc: defaults to the number of CPUs.
+        cache: the cache file. Defaults to ``pyww3_scaling.json`` in the
+            run path.
+        force: calibrate again even if the mod_def is in the cache.
+        keep_scratch: keep the scratch directories of the calibration runs.
+
+    Returns the recommended nproc and the model coefficients.
+    """
+    cache = cache or os.path.join(shel.runpath, CACHE)
+    key = mod_def_hash(os.path.join(shel.runpath, "mod_def.ww3"))
+    calibrations = load_cache(cache)
+
+    entry = calibrations.get(key, {})
+    if force or entry.get("hours") != hours:
+        entry = {"hours": hours, "seconds": {}}
+    missing = [n for n in nprocs if str(n) not in entry["seconds"]]
+    if missing:
+        measured = calibrate(shel, missing, hours, keep_scratch=keep_scratch)
+        entry["seconds"].update({str(n): t for n, t in measured.items()})
+        calibrations[key] = entry
+        with open(cache, "w") as f:
+            json.dump(calibrations, f, indent=2)
+
+    n = [int(k) for k in entry["seconds"]]
+    coeffs = fit_scaling(n, list(entry["seconds"].values()))
+
+    run_hours = (shel.domain_stop - shel.domain_start).total_seconds() / 3600.
+    factor = max(run_hours / hours, 1.)
+    nproc = recommend(coeffs, max_nproc or os.cpu_count() or max(n), deadline,
+                      factor, min_efficiency)
+    return nproc, coeffs
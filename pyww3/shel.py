@@ -14,6 +14,7 @@ from textwrap import dedent as dtxt
 
 from .utils import (bool_to_str, verify_runpath, verify_mod_def)
 from .ww3 import WW3Base
+from .scaling import autotune
 
 
 @dataclass
@@ -191,6 +192,19 @@ class WW3Shel(WW3Base):
         # create the namelist text here
         self.__setattr__("text", self.populate_namelist())
 
+    def autotune_nproc(self, nprocs=(1, 2, 4, 8), hours=6., deadline=None,
+                       min_efficiency=0.7, max_nproc=None, force=False,
+                       keep_scratch=False):
+        """Set ``nproc`` from a strong-scaling calibration of this run.
+
+        See :func:`pyww3.scaling.autotune`. Returns the scaling model
+        coefficients.
+        """
+        nproc, coeffs = autotune(self, nprocs, hours, deadline, min_efficiency,
+                                 max_nproc, force=force, keep_scratch=keep_scratch)
+        self.__setattr__("nproc", nproc)
+        return coeffs
+
     # NOTE: I am doing this this way instead of reading it from a file
     # because f-strings in a file allow for arbitrary code execution,
     # and are thefore a security issue. Writting everything here at
@@ -0,0 +1,250 @@
+"""
+Integrated parameters of frequency-direction spectra.
+
+The spectra are the ``efth`` variable of the ww3_ounp spectral outputs
+(``point_type=1``), in m2/Hz/rad, with ``frequency`` in Hz and ``direction``
+in degrees. All spectra are processed at once, ``chunk`` spectra at a time,
+so the parameters of thousands of stations do not need a second ww3_ounp run
+with ``point_type=2``.
+
+Directions are returned in the convention of the input directions.
+"""
+import netCDF4
+import numpy as np
+import xarray as xr
+
+GRAVITY = 9.806
+
+SPEC_TIME_UNITS = "days since 1990-01-01 00:00:00"
+SPEC_FILL = 9.96921e36
+
+# direction attributes of the ww3_ounp spectra: nautical (clockwise from
+# north) directions the waves are going to
+SPEC_DIRECTION_ATTRS = {"units": "degree", "long_name": "sea surface wave to direction",
+                        "standard_name": "sea_surface_wave_to_direction",
+                        "globwave_name": "direction", "valid_min": 0., "valid_max": 360.}
+
+PARAMETERS = {"hs": ("Significant wave height", "m"),
+              "tp": ("Peak period", "s"),
+              "tm01": ("Mean period T01", "s"),
+              "tm02": ("Mean period T02", "s"),
+              "tm10": ("Mean period T-1,0", "s"),
+              "dp": ("Peak direction (at the peak frequency)", "degree"),
+              "dm": ("Mean direction", "degree"),
+              "dspr": ("Directional spread", "degree")}
+
+
+def spectral_grid(grid):
+    """Frequencies (Hz) and directions (degrees) of a :class:`pyww3.grid.WW3GRid`."""
+    freq = grid.spectrum_freq1 * grid.spectrum_xfr ** np.arange(grid.spectrum_nk)
+    dth = 360. / grid.spectrum_nth
+    dirs = (np.arange(grid.spectrum_nth) + grid.spectrum_thoff) * dth
+    return freq, dirs
+
+
+def wavenumber(freq, depth=np.inf):
+    """Wavenumber (rad/m) from the linear dispersion relation.
+
+    ``freq`` (Hz) and ``depth`` (m) are broadcast against each other.
+    """
+    omega = 2 * np.pi * np.asarray(freq, dtype="float64")
+    depth = np.asarray(depth, dtype="float64")
+    k = omega ** 2 / GRAVITY  # deep water
+    finite = np.isfinite(depth)
+    if not finite.any():
+        return k * np.ones(np.broadcast(omega, depth).shape)
+
+    # Newton iterations on omega^2 = g k tanh(k h), from a shallow water guess
+    h = np.where(finite, depth, 1e4)
+    k = np.maximum(k, omega / np.sqrt(GRAVITY * np.maximum(h, 1e-3)))
+    for _ in range(20):
+        t = np.tanh(k * h)
+        f = GRAVITY * k * t - omega ** 2
+        df = GRAVITY * (t + k * h * (1 - t ** 2))
+        k = k - f / df
+    return np.where(finite, k, omega ** 2 / GRAVITY)
+
+
+def group_velocity(freq, depth=np.inf):
+    """Group velocity (m/s) from the linear dispersion relation."""
+    freq = np.asarray(freq, dtype="float64")
+    depth = np.asarray(depth, dtype="float64")
+    k = wavenumber(freq, depth)
+    c = 2 * np.pi * freq / k
+    with np.errstate(over="ignore", invalid="ignore"):
+        kh = k * depth
+        n = np.where(kh < 20., 0.5 * (1 + 2 * kh / np.sinh(2 * kh)), 0.5)
+    return n * c
+
+
+def frequency_bandwidths(freq):
+    """Width of each frequency bin (trapezoidal rule)."""
+    freq = np.asarray(freq, dtype="float64")
+    if freq.size == 1:
+        return np.ones(1)
+    edges = np.concatenate([[freq[0]], (freq[1:] + freq[:-1]) / 2., [freq[-1]]])
+    return np.diff(edges)
+
+
+def _parameters(efth, freq, df, cos, sin, dth, dtype):
+    """Parameters of a (n, nfreq, ndir) block of spectra."""
+    efth = np.nan_to_num(efth.astype(dtype, copy=False))
+    ef = efth.sum(axis=2) * dth  # E(f)
+    ed = efth * df[None, :, None]  # E(f, theta) df
+
+    m0 = ef @ df
+    m1 = ef @ (df * freq)
+    m2 = ef @ (df * freq ** 2)
+    mm1 = ef @ (df / freq)
+
+    ipeak = ef.argmax(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = {"hs": 4. * np.sqrt(m0),
+               "tp": 1. / freq[ipeak],
+               "tm01": m0 / m1,
+               "tm02": np.sqrt(m0 / m2),
+               "tm10": mm1 / m0}
+
+        dspec = ed.sum(axis=1)  # D(theta), integrated over frequencies
+        a = dspec @ cos * dth
+        b = dspec @ sin * dth
+        # direction of the largest density at the peak frequency
+        jpeak = efth[np.arange(efth.shape[0]), ipeak].argmax(axis=1)
+        out["dp"] = np.rad2deg(np.arctan2(sin, cos))[jpeak] % 360.
+        out["dm"] = np.rad2deg(np.arctan2(b, a)) % 360.
+        ratio = np.clip(np.hypot(a, b) / m0, 0., 1.)
+        out["dspr"] = np.rad2deg(np.sqrt(2. * (1. - ratio)))
+
+    # periods and directions are undefined without energy
+    empty = ~(m0 > 0)
+    for key in out:
+        if key != "hs":
+            out[key] = np.where(empty, np.nan, out[key])
+    return out
+
+
+def spectral_parameters(efth, freq, dirs, chunk=4096, dtype="float64"):
+    """Compute the integrated parameters of many spectra at once.
+
+    Args:
+        efth: array (..., nfreq, ndir) of spectra.
+        freq: frequencies (Hz).
+        dirs: directions (degrees), regularly spaced.
+        chunk: number of spectra processed at once.
+        dtype: accumulation type. "float32" halves memory and time at the
+            cost of precision.
+
+    Returns a dictionary of arrays with the leading shape of ``efth``. See
+    :data:`PARAMETERS`.
+    """
+    efth = np.asarray(efth)
+    shape = efth.shape[:-2]
+    nfreq, ndir = efth.shape[-2:]
+    if nfreq != len(freq) or ndir != len(dirs):
+        error = (f"Spectra of shape {efth.shape} do not match {len(freq)} "
+                 f"frequencies and {len(dirs)} directions.")
+        raise ValueError(error)
+
+    freq = np.asarray(freq, dtype=dtype)
+    df = frequency_bandwidths(freq).astype(dtype)
+    theta = np.deg2rad(np.asarray(dirs, dtype="float64"))
+    cos, sin = np.cos(theta).astype(dtype), np.sin(theta).astype(dtype)
+    dth = np.dtype(dtype).type(2 * np.pi / ndir)
+
+    flat = efth.reshape(-1, nfreq, ndir)
+    out = {key: np.empty(flat.shape[0], dtype=dtype) for key in PARAMETERS}
+    for i in range(0, flat.shape[0], chunk):
+        block = _parameters(flat[i:i + chunk], freq, df, cos, sin, dth, dtype)
+        for key, values in block.items():
+            out[key][i:i + chunk] = values
+
+    return {key: values.reshape(shape) for key, values in out.items()}
+
+
+def spectral_stats(ds, var="efth", freq="frequency", dirs="direction",
+                   chunk=4096, dtype="float64"):
+    """Integrated parameters of the spectra of a ww3_ounp dataset.
+
+    Returns a xarray.Dataset with the dimensions of ``ds[var]`` other than
+    frequency and direction. The spectra are read ``chunk`` at a time along
+    the first dimension, so the file does not need to fit in memory.
+    """
+    da = ds[var].transpose(..., freq, dirs)
+    dims = da.dims[:-2]
+    f, d = ds[freq].values, ds[dirs].values
+
+    if dims:
+        step = max(1, chunk // max(int(np.prod(da.shape[1:-2])), 1))
+        parts = [spectral_parameters(da.isel({dims[0]: slice(i, i + step)}).values,
+                                     f, d, chunk, dtype)
+                 for i in range(0, da.shape[0], step)]
+        params = {key: np.concatenate([p[key] for p in parts]) for key in PARAMETERS}
+    else:
+        params = spectral_parameters(da.values, f, d, chunk, dtype)
+
+    out = xr.Dataset(coords={dim: ds[dim] for dim in dims if dim in ds.coords})
+    for key, (long_name, units) in PARAMETERS.items():
+        out[key] = xr.Variable(dims, params[key],
+                               {"long_name": long_name, "units": units})
+    return out
+
+
+def write_spec_nc(filename, times, lon, lat, name, freq, dirs, efth,
+                  direction_attrs=None):
+    """Write the spectra of one location in the ww3_ounp ``_spec.nc`` format.
+
+    This is the format read by ww3_bounc. ``efth`` is (time, nfreq, ndir) in
+    m2/Hz/rad and ``times`` are datetime-like. ``dirs`` are nautical
+    directions the waves are going to, described by ``direction_attrs``
+    (default :data:`SPEC_DIRECTION_ATTRS`). The file is written one time
+    step at a time.
+    """
+    times = np.asarray(times, dtype="datetime64[s]")
+    freq = np.asarray(freq, dtype="float64")
+    df = frequency_bandwidths(freq)
+
+    with netCDF4.Dataset(filename, "w") as nc:
+        nc.createDimension("time", None)
+        nc.createDimension("station", 1)
+        nc.createDimension("string40", 40)
+        nc.createDimension("frequency", freq.size)
+        nc.createDimension("direction", len(dirs))
+
+        t = nc.createVariable("time", "f8", ("time",))
+        t.units = SPEC_TIME_UNITS
+        t.calendar = "standard"
+        st = nc.createVariable("station", "i4", ("station",))
+        st[:] = [1]
+        sname = nc.createVariable("station_name", "S1", ("station", "string40"))
+        sname[0, :] = np.frombuffer(name[:40].ljust(40).encode("ascii"), dtype="S1")
+
+        x = nc.createVariable("longitude", "f4", ("time", "station"), fill_value=SPEC_FILL)
+        x.units = "degree_east"
+        y = nc.createVariable("latitude", "f4", ("time", "station"), fill_value=SPEC_FILL)
+        y.units = "degree_north"
+
+        f = nc.createVariable("frequency", "f4", ("frequency",))
+        f.units = "s-1"
+        f[:] = freq
+        f1 = nc.createVariable("frequency1", "f4", ("frequency",))
+        f1.units = "s-1"
+        f1[:] = freq - df / 2.
+        f2 = nc.createVariable("frequency2", "f4", ("frequency",))
+        f2.units = "s-1"
+        f2[:] = freq + df / 2.
+        d = nc.createVariable("direction", "f4", ("direction",))
+        d.setncatts(direction_attrs or SPEC_DIRECTION_ATTRS)
+        d[:] = dirs
+
+        e = nc.createVariable("efth", "f4", ("time", "station", "frequency", "direction"),
+                              fill_value=SPEC_FILL, zlib=True)
+        e.units = "m2 s rad-1"
+        e.long_name = "sea surface wave directional variance spectral density"
+
+        for i, time in enumerate(times):
+            t[i] = netCDF4.date2num(time.astype(object), SPEC_TIME_UNITS, "standard")
+            x[i] = lon
+            y[i] = lat
+            e[i, 0] = efth[i]
+
+    return filename
@@ -0,0 +1,100 @@
+"""
+Incremental staging of input files (e.g. boundary spectra) into a run path.
+
+The source directory is scanned with ``os.scandir`` and compared against a
+manifest of the files staged before (size and modification time). Only new
+or changed files are hard-linked (or copied, across file systems) and this
+happens from a thread pool, so re-staging thousands of unchanged files only
+costs one directory scan.
+"""
+import os
+import json
+import shutil
+import fnmatch
+
+from concurrent.futures import ThreadPoolExecutor
+from natsort import natsorted
+
+MANIFEST = ".pyww3_manifest.json"
+
+
+def scan(path, pattern="*"):
+    """Regular files of ``path`` matching ``pattern``, with (size, mtime)."""
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+
+def _stage(src, dst, link=True):
+    """Hard-link ``src`` to ``dst``, or copy it if that is not possible."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # different file systems, or no hard links
+    shutil.copy2(src, dst)
+
+
+def stage_files(src, dst, pattern="*", max_workers=None, link=True):
+    """Stage the files of directory ``src`` into directory ``dst``.
+
+    Args:
+        src, dst: source and destination directories.
+        pattern: shell-style pattern of the files to stage.
+        max_workers: number of threads linking or copying files.
+        link: try hard links before copying.
+
+    Returns the (natsorted) names of all the staged files and the number of
+    files that actually had to be linked or copied. Files that disappeared
+    from ``src`` are removed from ``dst``.
+    """
+    os.makedirs(dst, exist_ok=True)
+    files = scan(src, pattern)
+
+    manifest = {}
+    mfile = os.path.join(dst, MANIFEST)
+    if os.path.isfile(mfile):
+        with open(mfile, "r") as f:
+            manifest = json.load(f)
+
+    same = os.path.realpath(src) == os.path.realpath(dst)
+    todo = [] if same else [name for name, stat in files.items()
+                            if manifest.get(name) != stat or
+                            not os.path.isfile(os.path.join(dst, name))]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        jobs = [pool.submit(_stage, os.path.join(src, name), os.path.join(dst, name), link)
+                for name in todo]
+        for job in jobs:
+            job.result()
+
+    if not same:
+        for name in set(manifest) - set(files):
+            if os.path.isfile(os.path.join(dst, name)):
+                os.remove(os.path.join(dst, name))
+
+    with open(mfile, "w") as f:
+        json.dump(files, f)
+
+    return natsorted(files), len(todo)
+
+
+def write_list(fname, lines):
+    """Write a list file (e.g. spec.list), only if its content changed."""
+    text = "".join(line + "\n" for line in lines)
+    if os.path.isfile(fname):
+        with open(fname, "r") as f:
+            if f.read() == text:
+                return False
+    with open(fname, "w") as f:
+        f.write(text)
+    return True
@@ -0,0 +1,226 @@
+"""
+Analysis-ready Zarr stores built from the ww3_ounf and ww3_ounp outputs.
+
+The netCDF files of ww3_ounf/ww3_ounp are split in time and chunked one time
+step at a time, which is the worst possible layout to extract long time
+series. This module streams them into a Zarr store with one of two layouts:
+
+    spatial: a few time steps per chunk, whole grid (maps).
+    timeseries: long time chunks, small spatial tiles (time series).
+
+Files are appended a block of time steps at a time, so memory use is bounded
+by ``max_memory`` and not by the size of the files. The files already in the
+store are listed in its attributes, so new segments of a running hindcast can
+be appended by calling :func:`update_store` again.
+
+Requires zarr (``pip install zarr``).
+"""
+import os
+import json
+
+from glob import glob
+from contextlib import ExitStack
+from logging import warning
+from natsort import natsorted
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+LAYOUTS = ["spatial", "timeseries"]
+
+# dimensions that are never split
+FULL_DIMS = ["frequency", "frequency1", "frequency2", "direction", "string16",
+             "string40", "partition", "level"]
+
+SOURCES = "pyww3_sources"
+
+
+def _zarr():
+    """Import zarr, which is an optional dependency."""
+    try:
+        import zarr
+    except ImportError:
+        error = "Zarr stores need zarr. Install it with \'pip install zarr\'."
+        raise ImportError(error)
+    return zarr
+
+
+def chunk_sizes(ds, layout="timeseries", time="time", time_chunk=None,
+                space_chunk=32):
+    """Chunk size of every dimension of ``ds`` for a layout.
+
+    Args:
+        layout: "spatial" or "timeseries".
+        time_chunk: time steps per chunk. Defaults to 24 for "spatial" and
+            8760 (a year of hourly outputs) for "timeseries".
+        space_chunk: size of the spatial tiles of the "timeseries" layout.
+    """
+    if layout not in LAYOUTS:
+        error = f"Layout must be one of {LAYOUTS}, got \'{layout}\'."
+        raise ValueError(error)
+    if time_chunk is None:
+        time_chunk = 24 if layout == "spatial" else 8760
+
+    chunks = {}
+    for dim, size in ds.sizes.items():
+        if dim == time:
+            chunks[dim] = time_chunk
+        elif layout == "spatial" or dim in FULL_DIMS:
+            chunks[dim] = size
+        else:
+            chunks[dim] = min(space_chunk, size)
+    return chunks
+
+
+def _stamp(value):
+    """Time of a time step as stored in the sources attribute."""
+    return pd.Timestamp(value).isoformat()
+
+
+def store_sources(store):
+    """Files already written to ``store``, with the last time read from each."""
+    zarr = _zarr()
+    if not os.path.isdir(store):
+        return {}
+    sources = json.loads(zarr.open_group(store, mode="r").attrs.get(SOURCES, "{}"))
+    if isinstance(sources, list):  # stores written before the times were kept
+        sources = {fname: None for fname in sources}
+    return sources
+
+
+def _open_segment(stack, fnames):
+    """Open the files of one time segment, merging their variables."""
+    dss = [stack.enter_context(xr.open_dataset(f)) for f in fnames]
+    if len(dss) == 1:
+        return dss[0]
+    # the fields of a growing segment may not have the same time steps yet
+    return xr.merge(dss, join="inner", combine_attrs="override")
+
+
+def append_file(store, fname, layout="timeseries", time="time",
+                time_chunk=None, space_chunk=32, max_memory=2**28, start=0):
+    """Append one netCDF file to ``store``, creating it if needed.
+
+    ``fname`` can also be a list of files of the same time segment (e.g.
+    one file per field of ww3_ounf with ``field_samefile=False``), whose
+    variables are merged. Only the time steps from index ``start`` on are
+    appended. The file is read ``block`` time steps at a time, with
+    ``block`` chosen so that a block of all variables fits in
+    ``max_memory`` bytes.
+    """
+    zarr = _zarr()
+    sources = store_sources(store)
+    fnames = [fname] if isinstance(fname, str) else list(fname)
+
+    with ExitStack() as stack:
+        ds = _open_segment(stack, fnames)
+        chunks = chunk_sizes(ds, layout, time, time_chunk, space_chunk)
+        step = sum(ds[v].dtype.itemsize * ds[v].size // max(ds.sizes[time], 1)
+                   for v in ds.variables if time in ds[v].dims)
+        block = int(max(1, min(chunks[time], max_memory // max(step, 1))))
+        ntimes = ds.sizes[time]
+        end = _stamp(ds[time].values[-1]) if ntimes else None
+
+        for t in range(start, ntimes, block):
+            part = ds.isel({time: slice(t, t + block)}).load()
+            # xarray overwrites the attributes of the store on append
+            part.attrs[SOURCES] = json.dumps(sources)
+            for var in part.variables.values():
+                var.encoding.pop("chunksizes", None)
+                var.encoding.pop("contiguous", None)
+            if os.path.isdir(store):
+                part.to_zarr(store, mode="a", append_dim=time)
+            else:
+                encoding = {v: {"chunks": tuple(chunks[d] for d in part[v].dims)}
+                            for v in part.data_vars}
+                part.to_zarr(store, mode="w", encoding=encoding)
+
+    # only listed once the whole file is in the store
+    for f in fnames:
+        sources[os.path.abspath(f)] = end
+    group = zarr.open_group(store, mode="a")
+    group.attrs[SOURCES] = json.dumps(sources)
+
+
+def update_store(store, files, layout="timeseries", time="time",
+                 time_chunk=None, space_chunk=32, max_memory=2**28):
+    """Append the time steps of ``files`` not yet in ``store``.
+
+    Files starting at the same time are one time segment, whose variables
+    are merged (e.g. the per-field files of ww3_ounf with
+    ``field_samefile=False``). Segments are read in natural sort order and
+    only their time steps after the end of the store are appended, so
+    files that grew since they were last read (e.g. the current TIMESPLIT
+    file of a running hindcast) are completed. Files whose last time did
+    not change are not read again. Segments with time steps before the end
+    of the store that were never in it are skipped (partly or entirely)
+    with a warning, since Zarr stores can only grow along time.
+    """
+    sources = store_sources(store)
+
+    last = None
+    if os.path.isdir(store):
+        with xr.open_zarr(store) as ds:
+            last = ds[time].values[-1] if ds.sizes[time] else None
+
+    segments = {}
+    for fname in natsorted(files):
+        with xr.open_dataset(fname) as ds:
+            times = ds[time].values
+        if times.size:
+            segments.setdefault(_stamp(times[0]), []).append((fname, times))
+
+    for segment in segments.values():
+        fnames = [fname for fname, _ in segment]
+        times = segment[0][1]
+        for _, other in segment[1:]:
+            times = np.intersect1d(times, other)
+        if times.size == 0 or \
+                all(sources.get(os.path.abspath(f)) == _stamp(times[-1]) for f in fnames):
+            continue
+
+        start = 0 if last is None else int(np.searchsorted(times, last, side="right"))
+        if start > 0 and any(os.path.abspath(f) not in sources for f in fnames):
+            warn = (f"'{fnames[0]}' starts before the end of '{store}', "
+                    f"skipping its first {start} time steps.")
+            warning(warn)
+        if start == times.size:
+            continue
+        append_file(store, fnames, layout, time, time_chunk, space_chunk,
+                    max_memory, start=start)
+        sources = store_sources(store)
+        last = times[-1]
+
+    return store
+
+
+def outputs_to_store(runpath, prefix, store, suffix="", **kwargs):
+    """Stream the files ``runpath/prefix*suffix.nc`` into ``store``.
+
+    See :func:`update_store` for the keyword arguments.
+    """
+    files = glob(os.path.join(runpath, f"{prefix}*{suffix}.nc"))
+    if not files:
+        error = f"No file \'{prefix}*{suffix}.nc\' in \'{runpath}\'."
+        raise ValueError(error)
+    return update_store(store, files, **kwargs)
+
+
+def open_store(store, **kwargs):
+    """Open a store created by this module (lazily, with dask if available)."""
+    _zarr()
+    return xr.open_zarr(store, **kwargs)
+
+
+def point_series(store, dims, variables=None):
+    """Full time series at one grid point or station.
+
+    ``dims`` selects the point by index, e.g. {"latitude": 10, "longitude": 3}
+    or {"station": 42}. With the "timeseries" layout only the chunks of that
+    point are read.
+    """
+    ds = open_store(store)
+    if variables is not None:
+        ds = ds[list(np.atleast_1d(variables))]
+    return ds.isel(dims).load()
@@ -0,0 +1,151 @@
+"""
+CFL-based timesteps for a :class:`pyww3.grid.WW3GRid`.
+
+The spatial timestep DTXY is the largest one that satisfies the CFL condition
+of the fastest waves (the lowest frequency, ``spectrum_freq1``) in every wet
+cell, given the local grid spacing and water depth. Spherical RECT grids
+account for the convergence of the meridians, CURV grids use the distance
+between neighbouring cells and UNST grids the length of the mesh edges.
+
+DTMAX is a multiple of DTXY and DTKTH an integer fraction of DTMAX that
+shrinks as the shallowest water gets shallower (where refraction is stronger).
+"""
+import os
+
+import numpy as np
+
+from .geometry import (curv_coordinates, grid_shape, read_depth, read_gmsh,
+                       read_mask, rect_coordinates)
+from .spectra import group_velocity, wavenumber
+
+EARTH_RADIUS = 6371e3  # m
+
+
+def _length(x1, y1, x2, y2, spherical=True):
+    """Distances (m) between points 1 and points 2."""
+    if not spherical:
+        return np.hypot(x2 - x1, y2 - y1)
+    x1, y1, x2, y2 = [np.deg2rad(v) for v in (x1, y1, x2, y2)]
+    a = np.sin((y2 - y1) / 2) ** 2 + \
+        np.cos(y1) * np.cos(y2) * np.sin((x2 - x1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0., 1.)))
+
+
+def rect_spacing(grid):
+    """Smallest cell size (m) of each cell of a RECT grid, shape (ny, nx)."""
+    _, y = rect_coordinates(grid)
+    sx = grid.rect_sx / grid.rect_sf
+    sy = grid.rect_sy / grid.rect_sf
+    if grid.grid_coord == "SPHE":
+        dy = np.deg2rad(sy) * EARTH_RADIUS
+        dx = np.deg2rad(sx) * EARTH_RADIUS * np.cos(np.deg2rad(y))
+    else:
+        dx, dy = np.full(y.size, sx), sy
+    return np.broadcast_to(np.minimum(np.abs(dx), abs(dy))[:, None],
+                           (grid.rect_ny, grid.rect_nx))
+
+
+def curv_spacing(grid):
+    """Smallest distance (m) of each cell of a CURV grid to its neighbours."""
+    x, y = curv_coordinates(grid)
+    spherical = grid.grid_coord == "SPHE"
+    dx = _length(x[:, :-1], y[:, :-1], x[:, 1:], y[:, 1:], spherical)
+    dy = _length(x[:-1], y[:-1], x[1:], y[1:], spherical)
+
+    spacing = np.full(x.shape, np.inf)
+    spacing[:, :-1] = np.minimum(spacing[:, :-1], dx)
+    spacing[:, 1:] = np.minimum(spacing[:, 1:], dx)
+    spacing[:-1] = np.minimum(spacing[:-1], dy)
+    spacing[1:] = np.minimum(spacing[1:], dy)
+    return spacing
+
+
+def edge_spacing(x, y, triangles, spherical=True):
+    """Length (m) of the shortest mesh edge touching each node."""
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]],
+                            triangles[:, [2, 0]]])
+    length = _length(x[edges[:, 0]], y[edges[:, 0]], x[edges[:, 1]], y[edges[:, 1]],
+                     spherical)
+    spacing = np.full(x.size, np.inf)
+    np.minimum.at(spacing, edges[:, 0], length)
+    np.minimum.at(spacing, edges[:, 1], length)
+    return spacing
+
+
+def grid_spacing(grid):
+    """Cell sizes (m) and water depths (m) of the wet points of any WW3GRid.
+
+    Depths are None if the grid has no depth file. The depths of structured
+    grids follow ww3_grid: sea points are below ``grid_zlim`` and are at
+    least ``grid_dmin`` deep.
+    """
+    if grid.grid_type == "UNST":
+        _, x, y, z, triangles = read_gmsh(os.path.join(grid.runpath, grid.unst_filename))
+        spacing = edge_spacing(x, y, triangles, grid.grid_coord == "SPHE")
+        depth = z * grid.unst_sf
+        wet = np.isfinite(spacing) & (depth > 0)
+        return spacing[wet], np.maximum(depth[wet], grid.grid_dmin)
+
+    spacing = rect_spacing(grid) if grid.grid_type == "RECT" else curv_spacing(grid)
+
+    wet = np.ones(grid_shape(grid), dtype=bool)
+    if grid.mask_filename:
+        wet &= np.isin(read_mask(grid), [1, 2])  # sea and active boundary
+    depth = None
+    if grid.depth_filename:
+        z = read_depth(grid)
+        wet &= z < grid.grid_zlim
+        depth = np.maximum(-z[wet], grid.grid_dmin)
+    return spacing[wet], depth
+
+
+def max_group_velocity(freq, depth=None):
+    """Largest group velocity (m/s) of ``freq`` at each depth.
+
+    Without depths, this is the maximum over all depths, which is about 20%
+    above the deep water value.
+    """
+    if depth is None:
+        depth = np.concatenate([np.geomspace(0.1, 1e4, 500), [np.inf]])
+        return np.full(1, group_velocity(freq, depth).max())
+    return group_velocity(freq, depth)
+
+
+def kth_substeps(freq, depth=None, max_substeps=10):
+    """Number of DTKTH steps per DTMAX, from 2 in deep water to ``max_substeps``."""
+    if depth is None or np.size(depth) == 0:
+        return 2
+    kh = wavenumber(freq, np.min(depth)) * np.min(depth)
+    return int(np.clip(np.ceil(2. / np.tanh(kh)), 2, max_substeps))
+
+
+def cfl_timesteps(grid, cfl=0.9, current=0., dtmax_ratio=3, dtmin=10.,
+                  max_substeps=10):
+    """Largest stable timesteps (s) of a WW3GRid.
+
+    Args:
+        grid: the :class:`pyww3.grid.WW3GRid`.
+        cfl: target Courant number of the spatial propagation.
+        current: largest current speed (m/s) expected over the grid.
+        dtmax_ratio: DTMAX as a multiple of DTXY.
+        dtmin: minimum source term timestep, capped at DTKTH.
+        max_substeps: largest number of DTKTH steps per DTMAX.
+
+    Returns a dictionary with ``dtmax``, ``dtxy``, ``dtkth`` and ``dtmin``.
+    """
+    spacing, depth = grid_spacing(grid)
+    if spacing.size == 0:
+        error = "The grid has no wet points."
+        raise ValueError(error)
+
+    speed = max_group_velocity(grid.spectrum_freq1, depth) + current
+    dtxy = float(np.floor(cfl * np.min(spacing / speed)))
+    if dtxy < 1:
+        error = (f"The CFL timestep is below 1 s (smallest cell is "
+                 f"{np.min(spacing):.1f} m).")
+        raise ValueError(error)
+
+    dtmax = dtxy * int(dtmax_ratio)
+    dtkth = dtmax / kth_substeps(grid.spectrum_freq1, depth, max_substeps)
+    return {"dtmax": dtmax, "dtxy": dtxy, "dtkth": dtkth,
+            "dtmin": float(min(dtmin, dtkth))}
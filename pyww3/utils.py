@@ -5,8 +5,12 @@ import os
 import shutil
 import subprocess
 
+from concurrent.futures import ThreadPoolExecutor
+
 from logging import warning
 
+from .launch import LaunchConfig
+
 
 def cmd_exists(cmd):
     "Check if a system command is available."
@@ -24,27 +28,64 @@ def run(runpath, cmd):
     "Run a command in a given path."
     cmd_exists(cmd)
     print(f"Running {cmd}, please wait...")
-    path_before = os.getcwd()  # wherever path we where before
-    os.chdir(runpath)  # change to the run path because of WW3
-    out = subprocess.run(cmd, shell=True, check=False, capture_output=True)
-    os.chdir(path_before)  # go back to where we were
+    # run in the run path because of WW3. Using cwd instead of os.chdir
+    # allows several programs to run at the same time from threads.
+    out = subprocess.run(cmd, shell=True, check=False, capture_output=True,
+                         cwd=runpath)
     print(f"Done running {cmd}. Return code was {out.returncode}.")
     return out
 
 
-def mpirun(runpath, cmd, nproc):
-    "Run a command in a given path using mpi."
+def mpirun(runpath, cmd, nproc, **options):
+    """Run a command in a given path using mpi.
+
+    ``options`` are given to :class:`pyww3.launch.LaunchConfig` (launcher,
+    threads, binding, mapping, ...).
+    """
     cmd_exists(cmd)
+    config = LaunchConfig(nproc, **options)
+    cmd_exists(config.launcher)
     print(f"Running {cmd} with MPI, please wait...")
-    path_before = os.getcwd()  # wherever path we where before
-    os.chdir(runpath)  # change to the run path because of WW3
-    mpicmd = f"mpirun -n {nproc} {cmd}"
-    out = subprocess.run(mpicmd, shell=True, check=False, capture_output=True)
-    os.chdir(path_before)  # go back to where we were
+    mpicmd = config.command(cmd)
+    env = dict(os.environ, **config.environment())
+    out = subprocess.run(mpicmd, shell=True, check=False, capture_output=True,
+                         cwd=runpath, env=env)
     print(f"Done running {cmd}. Return code was {out.returncode}.")
     return out
 
 
+def run_many(programs, max_workers=None):
+    """Run several programs at the same time.
+
+    ``programs`` is a list of :class:`pyww3.ww3.WW3Base` instances, each with
+    its own run path. The namelists are written and the programs run from a
+    thread pool. Returns the programs, in the same order.
+    """
+    for program in programs:
+        program.to_file()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        jobs = [pool.submit(program.run) for program in programs]
+        for job in jobs:
+            job.result()
+    return programs
+
+
+def make_scratch(runpath, name, files):
+    """Create the scratch directory ``runpath/name`` with links to ``files``.
+
+    The files are given relative to ``runpath``. Existing scratch
+    directories are emptied first.
+    """
+    scratch = os.path.join(runpath, name)
+    if os.path.isdir(scratch):
+        shutil.rmtree(scratch)
+    os.makedirs(scratch)
+    for fname in files:
+        os.symlink(os.path.realpath(os.path.join(runpath, fname)),
+                   os.path.join(scratch, os.path.basename(fname)))
+    return scratch
+
+
 def bool_to_str(mybool, long=False):
     """Convert a boolean to \'t\' or \'f\'."""
     if mybool:
@@ -67,17 +108,17 @@ def verify_runpath(runpath):
         os.makedirs(runpath)
 
 
-def verify_mod_def(runpath, mod_def):
+def verify_mod_def(runpath, mod_def, name="mod_def.ww3"):
     """Verify for mod_def file exists in the runpath."""
     if not os.path.isfile(mod_def):
         error = f"No such file or directory \'{mod_def}\'"
         raise ValueError(error)
-    if not os.path.isfile(os.path.join(runpath, "mod_def.ww3")):
+    if not os.path.isfile(os.path.join(runpath, name)):
         try:
             shutil.copy(os.path.abspath(mod_def),
-                        os.path.join(runpath, "mod_def.ww3"))
+                        os.path.join(runpath, name))
         except Exception:
-            error = "Could not create \'mod_def.ww3\' in the run path."
+            error = f"Could not create \'{name}\' in the run path."
             raise ValueError(error)
 
 
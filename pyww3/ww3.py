@@ -1,6 +1,12 @@
 import os
+import time
+import datetime
+
+from logging import warning
+
 from .utils import (run, mpirun)
 from .namelists import add_namelist_block, remove_namelist_block
+from .history import database_path, output_snapshot, record_run, estimate
 
 
 class WW3Base():
@@ -15,15 +21,33 @@ class WW3Base():
         with open(os.path.join(self.runpath, self.output), 'w') as f:
             f.write(self.text)
 
-    def run(self, mpi=False, nproc=2):
-        """Run a program using mpi or not."""
+    def run(self, mpi=False, nproc=2, **options):
+        """Run a program using mpi or not.
+
+        ``options`` set the MPI launch, see :func:`pyww3.utils.mpirun`. The
+        run is recorded in the run history, see :mod:`pyww3.history`.
+        """
+        outputs = None
+        if database_path() is not None:
+            try:
+                outputs = output_snapshot(self)
+            except Exception as e:
+                warning(f"Could not list the outputs before the run: {e}")
+        started = datetime.datetime.now()
+        t0 = time.perf_counter()
         if mpi:
-            res = mpirun(self.runpath, self.EXE, nproc)
+            res = mpirun(self.runpath, self.EXE, nproc, **options)
         else:
             res = run(self.runpath, self.EXE)
         self.__setattr__("returncode", res.returncode)
         self.__setattr__("stdout", res.stdout)
         self.__setattr__("stderr", res.stderr)
+        record_run(self, time.perf_counter() - t0, nproc if mpi else 1, started,
+                   outputs=outputs)
+
+    def estimate(self, nproc=1, grid=None):
+        """Predicted cost of running this program, see :func:`pyww3.history.estimate`."""
+        return estimate(self, nproc, grid)
 
     def update_text(self, block: str, action: str = "add", index: int = -1):
         """Update namelist block in the text with an action."""
@@ -0,0 +1,37 @@
+"""
+tests.conftest.py
+~~~~~~~~~~~~~~~~~
+
+Fixtures shared by the tests.
+"""
+import pytest
+
+# a 2x1 cell mesh of 4 triangles, shallow in the west and deep in the east
+GMSH = """$MeshFormat
+2.2 0 8
+$EndMeshFormat
+$Nodes
+6
+1 0.0 0.0 0.5
+2 1.0 0.0 50.0
+3 2.0 0.0 50.0
+4 0.0 1.0 0.5
+5 1.0 1.0 0.5
+6 2.0 1.0 50.0
+$EndNodes
+$Elements
+4
+1 2 2 0 1 1 2 5
+2 2 2 0 1 1 5 4
+3 2 2 0 1 2 3 6
+4 2 2 0 1 2 6 5
+$EndElements
+"""
+
+
+@pytest.fixture
+def gmsh_mesh(tmp_path):
+    """Path to a small gmsh (v2) mesh written in the test directory."""
+    fname = tmp_path / "mesh.msh"
+    fname.write_text(GMSH)
+    return str(fname)
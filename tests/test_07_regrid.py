@@ -0,0 +1,93 @@
+"""
+tests.test_regrid.py
+~~~~~~~~~~~~~~~~~~~~
+
+Test pyww3.regrid.Regridder.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from pyww3.prnc import WW3Prnc
+from pyww3.regrid import Regridder
+
+
+class TestRegridder:
+
+    def test_bilinear_is_exact_for_linear_fields(self, tmp_path):
+
+        src_lon = np.arange(0, 360, 1.)
+        src_lat = np.arange(60, -61, -1.)  # descending, like ERA5
+        lon, lat = np.meshgrid(src_lon, src_lat)
+        field = 2 * lat + 0.5 * np.sin(np.deg2rad(lon))
+
+        dst_lon = np.arange(-30, 30.1, 0.25)
+        dst_lat = np.arange(-20, 20.1, 0.25)
+
+        R = Regridder(src_lon, src_lat, dst_lon, dst_lat,
+                      cache_dir=str(tmp_path))
+        out = R.regrid_array(field)
+
+        assert out.shape == (dst_lat.size, dst_lon.size)
+        assert np.allclose(out[:, 0], 2 * dst_lat + 0.5 * np.sin(np.deg2rad(-30)),
+                           atol=1e-3)
+
+        # a second regridder must pick the cached weights up
+        assert len(os.listdir(tmp_path)) == 1
+        R2 = Regridder(src_lon, src_lat, dst_lon, dst_lat,
+                       cache_dir=str(tmp_path))
+        assert np.array_equal(R.index, R2.index)
+
+    def test_nearest_unstructured_and_land(self):
+
+        src_lon = np.array([0., 1., 2.])
+        src_lat = np.array([0., 1.])
+        field = np.array([[1., 2., np.nan],
+                          [4., 5., 6.]])
+
+        R = Regridder(src_lon, src_lat,
+                      np.array([0.2, 1.9, 1.5, 5.]), np.array([0.1, 0.9, 0., 0.]),
+                      dst_type="UNST", method="nearest")
+        out = R.regrid_array(field)
+        assert np.allclose(out[:2], [1., 6.])
+        assert np.isnan(out[3])  # outside of the source grid
+
+        # land values are skipped by the bilinear weights
+        R = Regridder(src_lon, src_lat, np.array([1.5]), np.array([0.]),
+                      dst_type="UNST")
+        assert np.allclose(R.regrid_array(field), [2.])
+
+
+class TestPrncRegrid:
+
+    def test_regrid(self, tmp_path):
+
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        lon, lat = np.arange(0., 10.), np.arange(0., 5.)
+        wind = np.ones((2, lat.size, lon.size))
+        xr.Dataset({"u10": (("time", "latitude", "longitude"), wind),
+                    "v10": (("time", "latitude", "longitude"), -wind)},
+                   coords={"time": pd.date_range("2010-01-01", periods=2, freq="h"),
+                           "longitude": lon, "latitude": lat}
+                   ).to_netcdf(tmp_path / "wind.nc")
+
+        prnc = WW3Prnc(runpath=str(tmp_path), mod_def=str(tmp_path / "mod_def.ww3"),
+                       forcing_field="WINDS", forcing_grid_latlon=True,
+                       file_filename=str(tmp_path / "wind.nc"), file_longitude="longitude",
+                       file_latitude="latitude", file_var_1="u10", file_var_2="v10")
+        assert "FORCING%GRID%ASIS = f" in prnc.text
+
+        with pytest.raises(ValueError):
+            prnc.regrid("nodes.nc", Regridder(lon, lat, np.array([1.5]), np.array([2.5]),
+                                              dst_type="UNST"))
+
+        x, y = np.meshgrid(np.arange(1., 3.), np.arange(1., 4.))
+        prnc.regrid("curv.nc", Regridder(lon, lat, x, y, dst_type="CURV"))
+        assert "FORCING%GRID%ASIS = t" in prnc.text
+        assert "FORCING%GRID%LATLON = f" in prnc.text
+        with xr.open_dataset(tmp_path / "curv.nc") as ds:
+            assert ds["u10"].shape == (2, 3, 2)
+            assert np.allclose(ds["v10"], -1.)
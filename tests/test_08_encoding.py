@@ -0,0 +1,33 @@
+"""
+tests.test_encoding.py
+~~~~~~~~~~~~~~~~~~~~~~
+
+Test pyww3.encoding.
+"""
+import numpy as np
+import xarray as xr
+
+from pyww3.encoding import forcing_encoding, write_forcing
+
+
+class TestEncoding:
+
+    def test_packing_respects_the_budget(self, tmp_path):
+
+        rng = np.random.default_rng(42)
+        u10 = rng.uniform(-30, 30, (4, 10, 20))
+        u10[0, 0, 0] = np.nan
+        ds = xr.Dataset({"u10": (("time", "latitude", "longitude"), u10),
+                         "sst": (("time", "latitude", "longitude"), u10 * 1e6)},
+                        coords={"time": np.arange(4)})
+
+        enc = forcing_encoding(ds, precision={"sst": 0.01})
+        assert enc["u10"]["dtype"] == "int16"
+        assert enc["u10"]["chunksizes"] == (1, 10, 20)
+        assert enc["sst"]["dtype"] == "float32"  # too wide to be packed
+
+        out = str(tmp_path / "packed.nc")
+        write_forcing(ds, out)
+        with xr.open_dataset(out) as new:
+            assert np.isnan(new["u10"].values[0, 0, 0])
+            assert np.nanmax(np.abs(new["u10"].values - u10)) <= 0.01
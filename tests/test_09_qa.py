@@ -0,0 +1,49 @@
+"""
+tests.test_qa.py
+~~~~~~~~~~~~~~~~
+
+Test pyww3.qa.scan_forcing.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.qa import scan_forcing
+
+
+class TestScanForcing:
+
+    def test_gaps_nans_and_ranges(self, tmp_path):
+
+        times = pd.date_range("2010-01-01", periods=48, freq="h")
+        times = times.delete([10, 11, 30])  # three missing hours
+
+        u10 = np.full((times.size, 5, 6), 5.)
+        v10 = np.full((times.size, 5, 6), 5.)
+        u10[3, 0, 0] = np.nan  # land point, masked below
+        u10[4, 2, 2] = np.nan  # sea point
+        v10[20, 1, 1] = 95.  # hurricane-force wind
+
+        ds = xr.Dataset({"u10": (("time", "latitude", "longitude"), u10),
+                         "v10": (("time", "latitude", "longitude"), v10)},
+                        coords={"time": times})
+        fname = str(tmp_path / "winds.nc")
+        ds.to_netcdf(fname)
+
+        sea = np.ones((5, 6), dtype=bool)
+        sea[0, 0] = False
+
+        report = scan_forcing(fname, ["u10", "v10"], forcing_field="WINDS",
+                              sea_mask=sea, chunk=7,
+                              timestop=datetime.datetime(2010, 1, 3))
+
+        assert not report.ok
+        assert report.cadence == datetime.timedelta(hours=1)
+        assert report.missing_steps == 3
+        assert len(report.gaps) == 2
+        assert report.nan_steps == {"u10": 1, "v10": 0}
+        assert report.out_of_range == 1
+        assert report.first_out_of_range == times[20].to_pydatetime()
+        assert len(report.coverage_problems) == 1
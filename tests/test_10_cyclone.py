@@ -0,0 +1,81 @@
+"""
+tests.test_cyclone.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test pyww3.cyclone.
+"""
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.cyclone import (wind_field, interpolate_track, perturb_track,
+                           generate_ensemble, holland_b)
+
+
+class TestCyclone:
+
+    def test_wind_field(self):
+
+        lon = np.arange(-5, 5.01, 0.05)
+        lat = np.arange(15, 25.01, 0.05)
+        u, v = wind_field(lon, lat, 0., 20., pc=950., rmax=40., vmax=50.)
+        speed = np.hypot(u, v)
+
+        # strongest winds around the radius of maximum winds
+        j, i = np.unravel_index(speed.argmax(), speed.shape)
+        r = np.hypot(lon[i] * 111. * np.cos(np.deg2rad(20.)), (lat[j] - 20.) * 111.)
+        assert 25. < r < 60.
+        assert 40. < speed.max() < 60.
+
+        # anticlockwise rotation in the northern hemisphere: east of the
+        # centre the wind blows to the north
+        assert v[np.argmin(np.abs(lat - 20.)), np.argmin(np.abs(lon - 1.))] > 0
+
+        # gradient-level winds are stronger than the 10 m ones
+        ug, vg = wind_field(lon, lat, 0., 20., pc=950., rmax=40., surface_factor=1.)
+        u10, v10 = wind_field(lon, lat, 0., 20., pc=950., rmax=40.)
+        assert np.allclose(np.hypot(u10, v10), 0.8 * np.hypot(ug, vg))
+
+    def test_dateline(self):
+
+        track = {"time": pd.date_range("2010-01-01", periods=2, freq="6h"),
+                 "lon": [179., -179.], "lat": [-20., -21.],
+                 "pc": [960., 960.], "rmax": [30., 30.]}
+        storm = interpolate_track(track, pd.date_range("2010-01-01", periods=3, freq="3h"))
+        assert np.allclose(storm["lon"], [179., -180., -179.])
+        assert storm["vt_u"][1] > 0  # moving east across the dateline
+
+    def test_ensemble(self, tmp_path):
+
+        track = {"time": pd.date_range("2010-01-01", periods=4, freq="6h"),
+                 "lon": [-60., -61., -62., -63.],
+                 "lat": [15., 16., 17., 18.],
+                 "pc": [980., 970., 960., 965.],
+                 "rmax": [40., 35., 30., 35.]}
+        times = pd.date_range("2010-01-01", periods=7, freq="3h")
+        lon = np.arange(-70., -55., 0.5)
+        lat = np.arange(10., 25., 0.5)
+
+        members = perturb_track(track, 2, seed=1)
+        fnames = generate_ensemble(members, lon, lat, times, str(tmp_path),
+                                   max_workers=2)
+
+        with xr.open_dataset(fnames[1]) as ds:
+            assert ds["u10"].shape == (7, lat.size, lon.size)
+            assert ds["time"].values[-1] == times[-1].to_datetime64()
+            assert np.isfinite(ds["v10"].values).all()
+
+        # the surface factor is passed to the members: gradient-level winds
+        # are stronger than the 10 m ones
+        gradient = generate_ensemble(members[1:], lon, lat, times, str(tmp_path),
+                                     prefix="gradient", surface_factor=1.)
+        with xr.open_dataset(fnames[1]) as ds, xr.open_dataset(gradient[0]) as dg:
+            assert np.hypot(dg["u10"], dg["v10"]).max() > np.hypot(ds["u10"], ds["v10"]).max()
+
+        # vmax follows the pressure perturbation, keeping Holland's B
+        track["vmax"] = [40., 45., 50., 48.]
+        for member in perturb_track(track, 3, seed=2):
+            assert not np.allclose(member["vmax"], track["vmax"])
+            dp = 100. * (1010. - np.asarray(track["pc"]))
+            assert np.allclose(holland_b(member["vmax"], 100. * (1010. - member["pc"])),
+                               holland_b(track["vmax"], dp))
@@ -0,0 +1,72 @@
+"""
+tests.test_multi.py
+~~~~~~~~~~~~~~~~~~~
+
+Test pyww3.multi.WW3Multi.
+"""
+import os
+import datetime
+
+import pytest
+
+from pyww3.multi import WW3Multi, WW3MultiInput, WW3MultiModel
+
+
+class TestWW3Multi:
+
+    def test_namelist(self, tmp_path):
+
+        runpath = str(tmp_path / "run")
+        mod_defs = {}
+        for name in ["wind", "glob", "coast"]:
+            mod_defs[name] = str(tmp_path / f"mod_def.{name}")
+            with open(mod_defs[name], "w") as f:
+                f.write(name)
+
+        W = WW3Multi(runpath=runpath,
+                     nproc=64,
+                     input_grids=[WW3MultiInput("wind", mod_defs["wind"],
+                                                forcing=["WINDS"])],
+                     model_grids=[WW3MultiModel("glob", mod_defs["glob"],
+                                                forcing={"WINDS": "wind"},
+                                                rank_id=1),
+                                  WW3MultiModel("coast", mod_defs["coast"],
+                                                forcing={"WINDS": "wind",
+                                                         "ICE_CONC": "native"},
+                                                rank_id=2)],
+                     domain_start=datetime.datetime(2010, 1, 1),
+                     domain_stop=datetime.datetime(2010, 1, 2),
+                     date_field_stride=3600)
+
+        assert os.path.isfile(os.path.join(runpath, "mod_def.coast"))
+        assert "DOMAIN%NRINP  = 1" in W.text
+        assert "  INPUT(1)%FORCING%WINDS = T" in W.text
+        assert "  MODEL(2)%FORCING%ICE_CONC = 'native'" in W.text
+        assert "ALLDATE%FIELD = '20100101 000000' '3600' '20100102 000000'" in W.text
+
+        # two grids sharing the same rank split the processes
+        W.model_grids[1].rank_id = 1
+        W.allocate({"glob": 3, "coast": 1})
+        assert W.model_grids[0].comm_frac == (0.0, 0.75)
+        assert "  MODEL(2)%RESOURCE%COMM_FRAC = 0.7500,1.0000" in W.text
+
+        # the intervals stay contiguous as written
+        W.model_grids.append(WW3MultiModel("port", mod_defs["coast"], rank_id=1))
+        W.allocate({"glob": 1, "coast": 1, "port": 1})
+        assert "  MODEL(2)%RESOURCE%COMM_FRAC = 0.3333,0.6667" in W.text
+        assert "  MODEL(3)%RESOURCE%COMM_FRAC = 0.6667,1.0000" in W.text
+        with pytest.raises(ValueError):
+            W.allocate({"glob": 1e6, "coast": 1, "port": 1})
+        with pytest.raises(ValueError):
+            WW3MultiModel("port", mod_defs["coast"], comm_frac=(0.33331, 0.33334))
+
+    def test_unknown_forcing_source(self, tmp_path):
+
+        mod_def = str(tmp_path / "mod_def.glob")
+        with open(mod_def, "w") as f:
+            f.write("glob")
+
+        with pytest.raises(ValueError):
+            WW3Multi(runpath=str(tmp_path),
+                     model_grids=[WW3MultiModel("glob", mod_def,
+                                                forcing={"WINDS": "era5"})])
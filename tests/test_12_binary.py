@@ -0,0 +1,138 @@
+"""
+tests.test_binary.py
+~~~~~~~~~~~~~~~~~~~~
+
+Test the raw out_grd.ww3 and out_pnt.ww3 readers in pyww3.binary.
+"""
+import datetime
+
+import numpy as np
+
+from pyww3.grid import WW3GRid
+from pyww3.binary import (open_out_grd, open_out_pnt, write_record, to_grid,
+                          grid_fields)
+
+
+def write_out_grd(fname, times, nsea=6, noswll=2, undef=-999.9):
+    """Write a small out_grd.ww3 with HS, WND and PHS."""
+    nogrp, ngrpp = 10, 17
+    flags = np.zeros((nogrp, ngrpp), dtype="i4")  # FLOGRD(NOGRP, NGRPP)
+    flags[0, 2] = 1  # WND
+    flags[1, 0] = 1  # HS
+    flags[3, 0] = 1  # PHS
+
+    rng = np.random.default_rng(0)
+    data = {}
+    with open(fname, "wb") as f:
+        write_record(f, b"WAVEWATCH III GRID OUTPUT FILE", b"2018-03-01",
+                     b"GLOB_60M".ljust(30),
+                     np.array([nogrp, ngrpp, nsea, 3, 2], dtype="i4"),
+                     np.array([undef], dtype="f4"),
+                     np.array([noswll], dtype="i4"))
+        for t in times:
+            write_record(f, np.array([int(t.strftime("%Y%m%d")),
+                                      int(t.strftime("%H%M%S"))], dtype="i4"),
+                         flags.ravel(order="F"))
+            data[t] = {"uwnd": rng.random(nsea, dtype="f4"),
+                       "vwnd": rng.random(nsea, dtype="f4"),
+                       "hs": rng.random(nsea, dtype="f4"),
+                       "phs": rng.random((noswll + 1, nsea), dtype="f4")}
+            data[t]["hs"][0] = undef
+            for key in ["uwnd", "vwnd", "hs", "phs"]:
+                write_record(f, data[t][key])
+    return data
+
+
+class TestOutGrd:
+
+    def test_lazy_reader(self, tmp_path):
+
+        fname = str(tmp_path / "out_grd.ww3")
+        times = [datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=h)
+                 for h in range(5)]
+        data = write_out_grd(fname, times)
+
+        ds = open_out_grd(fname)
+        assert ds.attrs["gname"] == "GLOB_60M"
+        assert sorted(ds.data_vars) == ["hs", "phs", "uwnd", "vwnd"]
+        assert ds["phs"].dims == ("time", "partition", "seapoint")
+
+        hs = ds["hs"].isel(time=3).values
+        assert np.isnan(hs[0])
+        assert np.allclose(hs[1:], data[times[3]]["hs"][1:])
+        assert np.allclose(ds["phs"].isel(time=slice(1, 3)).values,
+                           [data[times[1]]["phs"], data[times[2]]["phs"]])
+
+        sub = open_out_grd(fname, fields=["WND"], times=(times[1], times[2]))
+        assert list(sub.data_vars) == ["uwnd", "vwnd"]
+        assert sub.sizes["time"] == 2
+
+        grid = to_grid(ds["vwnd"].isel(time=0), [[0, 0], [0, 1], [0, 2],
+                                                 [1, 0], [1, 1], [1, 2]], 3, 2)
+        assert grid.shape == (2, 3)
+        assert np.allclose(grid[1, 2], data[times[0]]["vwnd"][5])
+
+    def test_grid_fields(self, tmp_path):
+
+        fname = str(tmp_path / "out_grd.ww3")
+        times = [datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=h)
+                 for h in range(2)]
+        data = write_out_grd(fname, times, nsea=5)
+
+        # the second point of the southern row is land, the last one a boundary
+        np.savetxt(tmp_path / "grid.mask", [[1, 0, 1], [1, 1, 2]], fmt="%d")
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="GLOB_60M",
+                       grid_nml=str(tmp_path / "grid.nml"), grid_type="RECT",
+                       grid_coord="SPHE", grid_clos="NONE", rect_nx=3, rect_ny=2,
+                       rect_sx=1., rect_sy=1., mask_filename=str(tmp_path / "grid.mask"))
+
+        ds = grid_fields(open_out_grd(fname), grid)
+        assert ds["hs"].dims == ("time", "y", "x")
+        assert ds["phs"].dims == ("time", "partition", "y", "x")
+        assert np.allclose(ds["longitude"], [0., 1., 2.])
+        assert np.isnan(ds["uwnd"].values[:, 0, 1]).all()
+        assert np.allclose(ds["uwnd"].values[1, 0, 2], data[times[1]]["uwnd"][1])
+        assert np.allclose(ds["uwnd"].values[1, 1], data[times[1]]["uwnd"][2:])
+        assert np.allclose(ds["phs"].values[0, :, 1, 2], data[times[0]]["phs"][:, 4])
+
+
+def write_out_pnt(fname, times, names, nk=4, nth=6):
+    """Write a small out_pnt.ww3."""
+    rng = np.random.default_rng(0)
+    spectra = rng.random((len(times), len(names), nk, nth), dtype="f4")
+    with open(fname, "wb") as f:
+        write_record(f, b"WAVEWATCH III POINT OUTPUT FILE", b"2018-03-01",
+                     np.array([nk, nth, len(names)], dtype="i4"))
+        locs = np.array([[i, -i] for i in range(len(names))], dtype="f4")
+        write_record(f, locs, *[n.encode().ljust(40) for n in names])
+        for it, t in enumerate(times):
+            write_record(f, np.array([int(t.strftime("%Y%m%d")),
+                                      int(t.strftime("%H%M%S"))], dtype="i4"))
+            for ip in range(len(names)):
+                # a few scalars, the grid name, then the spectrum
+                write_record(f, np.array([1, 2, 3], dtype="i4"),
+                             np.arange(9, dtype="f4"), b"GLOB_60M".ljust(13),
+                             spectra[it, ip])
+    return spectra
+
+
+class TestOutPnt:
+
+    def test_lazy_reader(self, tmp_path):
+
+        fname = str(tmp_path / "out_pnt.ww3")
+        times = [datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=h)
+                 for h in range(3)]
+        names = ["B001", "B002", "B003", "B004"]
+        spectra = write_out_pnt(fname, times, names)
+
+        ds = open_out_pnt(fname, freq1=0.04118, xfr=1.1)
+        assert ds["efth"].shape == (3, 4, 4, 6)
+        assert list(ds["station_name"].values) == names
+        assert np.allclose(ds["frequency"][1], 0.04118 * 1.1)
+
+        sub = open_out_pnt(fname, stations=["B003", "B001"])
+        assert np.allclose(sub["efth"].isel(time=2).values,
+                           spectra[2, [2, 0]])
+        assert np.allclose(sub["longitude"], [2, 0])
@@ -0,0 +1,62 @@
+"""
+tests.test_archive.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the time index of the ww3_ounf outputs.
+"""
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.archive import build_index, open_index, select_files
+
+
+def write_month(path, month):
+    times = pd.date_range(f"2000-{month:02d}-01", periods=4, freq="7D")
+    shape = (times.size, 3, 4)
+    ds = xr.Dataset({"hs": (("time", "latitude", "longitude"), np.full(shape, month, "f4")),
+                     "uwnd": (("time", "latitude", "longitude"), np.zeros(shape, "f4")),
+                     "vwnd": (("time", "latitude", "longitude"), np.ones(shape, "f4"))},
+                    coords={"time": times})
+    encoding = {v: {"chunksizes": (1, 3, 4), "zlib": True} for v in ds.data_vars}
+    ds.to_netcdf(os.path.join(path, f"ww3.2000{month:02d}.nc"), encoding=encoding)
+
+
+class TestArchive:
+
+    def test_index(self, tmp_path):
+        for month in range(1, 7):
+            write_month(str(tmp_path), month)
+
+        index = build_index(str(tmp_path))
+        assert os.path.isfile(tmp_path / "ww3.index.json")
+        assert len(index) == 6
+        assert index["ww3.200003.nc"]["start"] == "20000301 000000"
+        assert index["ww3.200003.nc"]["variables"]["hs"]["chunks"] == [1, 3, 4]
+
+        # only the files overlapping the period are selected
+        keys = select_files(index, pd.Timestamp("2000-03-10"), pd.Timestamp("2000-04-02"))
+        assert keys == ["ww3.200003.nc", "ww3.200004.nc"]
+
+        # unchanged files are not read again
+        index["ww3.200001.nc"]["ntimes"] = -1
+        with open(tmp_path / "ww3.index.json", "w") as f:
+            json.dump(index, f)
+        write_month(str(tmp_path), 7)
+        index = build_index(str(tmp_path))
+        assert index["ww3.200001.nc"]["ntimes"] == -1
+        assert len(index) == 7
+
+    def test_open(self, tmp_path):
+        for month in range(1, 4):
+            write_month(str(tmp_path), month)
+        index = build_index(str(tmp_path))
+
+        ds = open_index(str(tmp_path), index, "2000-01-10", "2000-02-10",
+                        fields=["HS", "WND"])
+        assert sorted(ds.data_vars) == ["hs", "uwnd", "vwnd"]
+        assert ds.time.size == 4
+        assert np.unique(ds["hs"].values).tolist() == [1., 2.]
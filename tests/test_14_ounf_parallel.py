@@ -0,0 +1,70 @@
+"""
+tests.test_ounf_parallel.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Test the time window and field group split of pyww3.ounf.WW3Ounf.
+"""
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.ounf import WW3Ounf, merge_outputs
+from test_12_binary import write_out_grd
+
+
+class TestOunfParallel:
+
+    def test_split(self, tmp_path):
+        run = tmp_path / "run"
+        run.mkdir()
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        times = [datetime.datetime(2010, 1, 31) + datetime.timedelta(hours=6 * h)
+                 for h in range(10)]
+        write_out_grd(str(tmp_path / "out_grd.ww3"), times)
+
+        W = WW3Ounf(runpath=str(run), mod_def=str(tmp_path / "mod_def.ww3"),
+                    ww3_grd=str(tmp_path / "out_grd.ww3"),
+                    field_timestart=datetime.datetime(2010, 1, 31, 6),
+                    field_list=["HS", "FP", "WND"])
+        assert len(W.output_times()) == 9
+
+        programs = W.split(nwindows=3, field_groups=2)
+        assert len(programs) == 6
+        assert [(i, j) for i, j, _ in programs][:3] == [(0, 0), (0, 1), (1, 0)]
+
+        first, second = programs[0][2], programs[1][2]
+        assert first.field_list == ["HS", "FP"] and second.field_list == ["WND"]
+        assert first.field_timestart == times[1]
+        assert first.field_timecount == 3
+        assert programs[2][2].field_timestart == times[4]
+        assert "FIELD%TIMECOUNT = '3'" in first.text
+        assert os.path.islink(os.path.join(first.runpath, "mod_def.ww3"))
+        assert os.path.islink(os.path.join(first.runpath, "out_grd.ww3"))
+
+    def test_merge(self, tmp_path):
+        times = pd.date_range("2010-01-31", periods=8, freq="6h")
+        windows = [times[:4], times[4:]]
+        groups = [["hs"], ["uwnd", "vwnd"]]
+
+        scratches = []
+        for i, window in enumerate(windows):
+            for j, group in enumerate(groups):
+                path = tmp_path / f"ounf_w{i:03d}_g{j:02d}"
+                path.mkdir()
+                for month in sorted(set(window.strftime("%Y%m"))):
+                    sel = window[window.strftime("%Y%m") == month]
+                    ds = xr.Dataset({v: (("time", "x"), np.full((sel.size, 2), j, "f4"))
+                                     for v in group}, coords={"time": sel})
+                    ds.to_netcdf(path / f"ww3.{month}.nc")
+                scratches.append((i, j, str(path)))
+
+        merge_outputs(scratches, str(tmp_path))
+        jan = xr.open_dataset(tmp_path / "ww3.201001.nc")
+        feb = xr.open_dataset(tmp_path / "ww3.201002.nc")
+        assert sorted(jan.data_vars) == ["hs", "uwnd", "vwnd"]
+        assert jan.time.size == 4 and feb.time.size == 4
+        assert (np.diff(feb.time.values) > np.timedelta64(0)).all()
+        assert float(feb["uwnd"].max()) == 1.
@@ -0,0 +1,57 @@
+"""
+tests.test_ounp_shards.py
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Test the station sharding of pyww3.ounp.WW3Ounp.
+"""
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.ounp import WW3Ounp, merge_shards
+from test_12_binary import write_out_pnt
+
+
+class TestOunpShards:
+
+    def test_split(self, tmp_path):
+        run = tmp_path / "run"
+        run.mkdir()
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        times = [datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=h)
+                 for h in range(2)]
+        write_out_pnt(str(tmp_path / "out_pnt.ww3"), times,
+                      [f"P{i:02d}" for i in range(7)])
+
+        W = WW3Ounp(runpath=str(run), mod_def=str(tmp_path / "mod_def.ww3"),
+                    ww3_pnt=str(tmp_path / "out_pnt.ww3"))
+        assert W.stations() == list(range(1, 8))
+
+        shards = W.split(3)
+        assert [s.point_list for s in shards] == ["1 2 3", "4 5", "6 7"]
+        assert shards[1].runpath.endswith("ounp_s001")
+        assert "POINT%LIST = '4 5'" in shards[1].text
+        assert os.path.islink(os.path.join(shards[0].runpath, "out_pnt.ww3"))
+
+    def test_merge(self, tmp_path):
+        times = pd.date_range("2010-01-01", periods=3, freq="h")
+        scratches = []
+        for k, stations in enumerate([[0, 1, 2], [3, 4]]):
+            path = tmp_path / f"ounp_s{k:03d}"
+            path.mkdir()
+            ds = xr.Dataset({"efth": (("time", "station", "frequency"),
+                                      np.full((3, len(stations), 4), k, "f4")),
+                             "longitude": (("time", "station"),
+                                           np.tile(stations, (3, 1)).astype("f4"))},
+                            coords={"time": times})
+            ds.to_netcdf(path / "ww3.201001_spec.nc")
+            scratches.append(str(path))
+
+        merge_shards(scratches, str(tmp_path))
+        out = xr.open_dataset(tmp_path / "ww3.201001_spec.nc")
+        assert out.sizes["station"] == 5
+        assert out["longitude"].isel(time=0).values.tolist() == [0, 1, 2, 3, 4]
+        assert out["efth"].isel(station=-1).max() == 1
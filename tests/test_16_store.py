@@ -0,0 +1,90 @@
+"""
+tests.test_store.py
+~~~~~~~~~~~~~~~~~~~
+
+Test the Zarr stores of pyww3.store.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from pyww3.store import chunk_sizes, update_store, store_sources, point_series
+
+
+def write_month(path, month, days=10):
+    times = pd.date_range(f"2000-{month:02d}-01", periods=days, freq="D")
+    hs = np.arange(times.size * 6 * 8, dtype="f4").reshape(times.size, 6, 8) + 1000 * month
+    ds = xr.Dataset({"hs": (("time", "latitude", "longitude"), hs)},
+                    coords={"time": times, "latitude": np.arange(6.),
+                            "longitude": np.arange(8.)})
+    fname = str(path / f"ww3.2000{month:02d}.nc")
+    ds.to_netcdf(fname)
+    return fname, ds
+
+
+class TestStore:
+
+    def test_chunks(self):
+        ds = xr.Dataset({"efth": (("time", "station", "frequency", "direction"),
+                                  np.zeros((5, 100, 30, 24)))})
+        assert chunk_sizes(ds, "timeseries") == {"time": 8760, "station": 32,
+                                                 "frequency": 30, "direction": 24}
+        assert chunk_sizes(ds, "spatial", time_chunk=2)["station"] == 100
+        with pytest.raises(ValueError):
+            chunk_sizes(ds, "maps")
+
+    def test_append(self, tmp_path):
+        pytest.importorskip("zarr")
+        store = str(tmp_path / "hs.zarr")
+        fname1, ds1 = write_month(tmp_path, 1)
+        fname2, ds2 = write_month(tmp_path, 2)
+
+        # small memory budget: the files are written a few steps at a time
+        update_store(store, [fname1], space_chunk=4, max_memory=3 * 6 * 8 * 4)
+        update_store(store, [fname1, fname2], space_chunk=4, max_memory=3 * 6 * 8 * 4)
+        assert len(store_sources(store)) == 2
+
+        out = xr.open_zarr(store)
+        assert out.sizes["time"] == 20
+        assert out["hs"].encoding["chunks"] == (8760, 4, 4)
+
+        series = point_series(store, {"latitude": 2, "longitude": 5}, "hs")
+        expected = np.concatenate([ds1["hs"].values[:, 2, 5], ds2["hs"].values[:, 2, 5]])
+        assert np.allclose(series["hs"].values, expected)
+
+    def test_growing_file(self, tmp_path):
+        pytest.importorskip("zarr")
+        store = str(tmp_path / "hs.zarr")
+        fname1, _ = write_month(tmp_path, 1)
+        fname2, _ = write_month(tmp_path, 2, days=4)  # still being written
+        update_store(store, [fname1, fname2])
+        assert xr.open_zarr(store).sizes["time"] == 14
+
+        # the later time steps of the file are appended
+        fname2, ds2 = write_month(tmp_path, 2)
+        update_store(store, [fname1, fname2])
+        out = xr.open_zarr(store)
+        assert out.sizes["time"] == 20
+        assert np.allclose(out["hs"].values[10:], ds2["hs"].values)
+        assert store_sources(store)[fname2] == "2000-02-10T00:00:00"
+
+    def test_field_files(self, tmp_path):
+        pytest.importorskip("zarr")
+        store = str(tmp_path / "fields.zarr")
+        # ww3_ounf with field_samefile=False: one file per field, same times
+        for var, month in [("hs", 1), ("fp", 1), ("hs", 2), ("fp", 2)]:
+            _, ds = write_month(tmp_path, month)
+            ds.rename({"hs": var}).to_netcdf(tmp_path / f"ww3.2000{month:02d}_{var}.nc")
+        files = sorted(str(f) for f in tmp_path.glob("ww3.*_*.nc"))
+
+        update_store(store, files)
+        out = xr.open_zarr(store)
+        assert sorted(out.data_vars) == ["fp", "hs"]
+        assert out.sizes["time"] == 20
+        assert np.allclose(out["fp"].values[10:], ds["hs"].values)
+        assert len(store_sources(store)) == 4
+
+        # nothing new
+        update_store(store, files)
+        assert xr.open_zarr(store).sizes["time"] == 20
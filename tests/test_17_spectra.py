@@ -0,0 +1,70 @@
+"""
+tests.test_spectra.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the integrated spectral parameters of pyww3.spectra.
+"""
+import numpy as np
+import xarray as xr
+
+from pyww3.spectra import spectral_parameters, spectral_stats
+
+
+def narrow_spectrum(freq, dirs, fp, dp, hs):
+    """A spectrum with all its energy in one frequency and one direction."""
+    efth = np.zeros((freq.size, dirs.size))
+    i, j = np.argmin(np.abs(freq - fp)), np.argmin(np.abs(dirs - dp))
+    df = np.gradient(freq)[i]
+    efth[i, j] = (hs / 4.) ** 2 / (df * 2 * np.pi / dirs.size)
+    return efth
+
+
+class TestSpectra:
+
+    def test_parameters(self):
+        freq = 0.04 * 1.1 ** np.arange(30)
+        dirs = np.arange(0., 360., 15.)
+
+        efth = np.stack([narrow_spectrum(freq, dirs, 0.1, 90., 2.),
+                         narrow_spectrum(freq, dirs, 0.2, 300., 1.),
+                         np.zeros((freq.size, dirs.size))])
+        efth = np.stack([efth, efth])  # (time, station, freq, dir)
+
+        params = spectral_parameters(efth, freq, dirs, chunk=4)
+        assert params["hs"].shape == (2, 3)
+        assert np.allclose(params["hs"][:, 0], 2., rtol=0.05)
+        assert np.isclose(params["tp"][0, 1], 1. / freq[np.argmin(np.abs(freq - 0.2))])
+        assert np.allclose(params["tm01"][0, :2], params["tp"][0, :2])
+        assert np.isclose(params["dp"][0, 0], 90.)
+        assert np.isclose(params["dm"][0, 1], 300.)
+        assert np.allclose(params["dspr"][0, :2], 0., atol=1e-3)
+        assert params["hs"][0, 2] == 0 and np.isnan(params["tp"][0, 2])
+
+        # a swell peak and a broader, more energetic wind sea: the direction
+        # of the frequency-integrated maximum is the wind sea one
+        bimodal = narrow_spectrum(freq, dirs, 0.08, 240., 1.5)
+        bimodal[15:25] += 0.8 * (np.arange(dirs.size) == 4)[None, :] * bimodal.max() / 5.
+        assert (bimodal * np.gradient(freq)[:, None]).sum(axis=0).argmax() == 4
+        peak = spectral_parameters(bimodal, freq, dirs)
+        assert np.isclose(peak["tp"], 1. / freq[np.argmin(np.abs(freq - 0.08))])
+        assert np.isclose(peak["dp"], 240.)
+
+        single = spectral_parameters(efth, freq, dirs, dtype="float32")
+        assert single["hs"].dtype == np.float32
+        assert np.allclose(single["hs"], params["hs"], rtol=1e-5)
+
+    def test_dataset(self):
+        freq = 0.04 * 1.1 ** np.arange(25)
+        dirs = np.arange(0., 360., 10.)
+        spread = np.cos(np.deg2rad(dirs - 45.) / 2.) ** 8
+        ef = freq ** -5 * np.exp(-1.25 * (0.1 / freq) ** 4)
+        efth = np.broadcast_to(ef[:, None] * spread[None, :], (4, 3, 25, 36))
+
+        ds = xr.Dataset({"efth": (("time", "station", "frequency", "direction"), efth)},
+                        coords={"frequency": freq, "direction": dirs,
+                                "time": np.arange(4)})
+        out = spectral_stats(ds, chunk=5)
+        assert out["hs"].dims == ("time", "station")
+        assert np.allclose(out["dm"], 45.)
+        assert (out["dspr"] > 10).all() and (out["dspr"] < 40).all()
+        assert (out["tm10"] > out["tm01"]).all() and (out["tm01"] > out["tm02"]).all()
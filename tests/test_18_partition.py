@@ -0,0 +1,61 @@
+"""
+tests.test_partition.py
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Test the spectral partitioning of pyww3.partition.
+"""
+import numpy as np
+import xarray as xr
+
+from pyww3.partition import neighbour_table, partition_spectra, partition_dataset
+from pyww3.spectra import spectral_parameters
+
+
+def peak(freq, dirs, fp, dp, scale):
+    """Gaussian bump in frequency and (circular) direction."""
+    ddir = (dirs[None, :] - dp + 180.) % 360. - 180.
+    return scale * np.exp(-((freq[:, None] - fp) / 0.01) ** 2 - (ddir / 20.) ** 2)
+
+
+class TestPartition:
+
+    def test_neighbours(self):
+        table = neighbour_table(3, 4)
+        assert table.shape == (12, 9)
+        # bin (k=0, th=0) wraps around in direction, not in frequency
+        assert set(table[0]) == {0, 1, 3, 4, 5, 7}
+
+    def test_two_systems(self):
+        freq = 0.04 * 1.1 ** np.arange(25)
+        dirs = np.arange(0., 360., 15.)
+        swell = peak(freq, dirs, 0.07, 350., 4.)
+        sea = peak(freq, dirs, 0.2, 90., 1.)
+        efth = np.stack([swell + sea, swell, np.zeros_like(swell)])
+
+        out = partition_spectra(efth, freq, dirs, noswll=2, chunk=2)
+        assert out["phs"].shape == (3, 3)
+        assert out["pnr"].tolist() == [2, 1, 0]
+        assert (out["phs"][:, 0] == 0).all()  # no wind, no wind sea
+        assert np.isclose(out["pdp"][0, 1], 345., atol=15.)
+        assert np.isclose(out["pdp"][0, 2], 90.)
+        assert np.isclose(out["ptp"][0, 2], 1 / freq[np.argmin(np.abs(freq - 0.2))])
+
+        total = spectral_parameters(efth[0], freq, dirs)["hs"]
+        assert np.isclose(np.hypot(out["phs"][0, 1], out["phs"][0, 2]), total)
+
+        # the short waves travel with the wind
+        windy = partition_spectra(efth, freq, dirs, noswll=2, wind_speed=15.,
+                                  wind_dir=90., max_workers=2, chunk=1)
+        assert windy["phs"][0, 0] > 0 and np.isclose(windy["pdp"][0, 0], 90.)
+        assert np.isclose(windy["phs"][0, 1], out["phs"][0, 1])
+        assert np.isnan(windy["phs"][0, 2]) or windy["phs"][0, 2] == 0
+
+    def test_dataset(self):
+        freq = 0.04 * 1.1 ** np.arange(20)
+        dirs = np.arange(0., 360., 30.)[::-1]
+        efth = np.broadcast_to(peak(freq, dirs, 0.1, 180., 1.), (2, 3, 20, 12))
+        ds = xr.Dataset({"efth": (("time", "station", "frequency", "direction"), efth)},
+                        coords={"frequency": freq, "direction": dirs})
+        out = partition_dataset(ds, noswll=1)
+        assert out["phs"].dims == ("time", "station", "partition")
+        assert np.allclose(out["pdp"].isel(partition=1), 180.)
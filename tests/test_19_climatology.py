@@ -0,0 +1,105 @@
+"""
+tests.test_climatology.py
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Test the streaming statistics of pyww3.climatology.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from pyww3.ounf import WW3Ounf
+from pyww3.climatology import Climatology, outputs_climatology
+from test_12_binary import write_out_grd
+
+
+def write_month(path, month, rng, hours=200):
+    times = pd.date_range(f"2000-{month:02d}-01", periods=hours, freq="h")
+    hs = rng.gamma(2., 1., (times.size, 3, 4))
+    hs[:, 0, 0] = np.nan  # land
+    ds = xr.Dataset({"hs": (("time", "latitude", "longitude"), hs)},
+                    coords={"time": times})
+    ds.to_netcdf(path / f"ww3.2000{month:02d}.nc")
+    return hs
+
+
+class TestClimatology:
+
+    def test_streaming(self, tmp_path):
+        rng = np.random.default_rng(1)
+        data = np.concatenate([write_month(tmp_path, m, rng) for m in [1, 2, 3]])
+
+        state = str(tmp_path / "clim.npz")
+        kwargs = {"thresholds": {"hs": [4.]}, "nbins": 200, "chunk": 17}
+        clim = outputs_climatology(str(tmp_path), "ww3.", ["hs"], state=state, **kwargs)
+        assert len(clim.sources) == 3
+
+        assert np.allclose(clim.mean["hs"][1:], np.nanmean(data, axis=0)[1:])
+        assert np.allclose(clim.variance("hs")[1:], np.nanvar(data, axis=0, ddof=1)[1:])
+        assert np.allclose(clim.max["hs"][1:], np.nanmax(data, axis=0)[1:])
+        assert clim.count["hs"][0, 0] == 0
+        assert np.allclose(clim.exceed["hs"][0], (data > 4.).sum(axis=0))
+        width = 20. / 200
+        p90 = clim.percentile("hs", 90)
+        assert np.allclose(p90[1:], np.nanpercentile(data, 90, axis=0)[1:], atol=2 * width)
+        assert np.isnan(p90[0, 0])
+
+        # a new month is merged with the saved state
+        data = np.concatenate([data, write_month(tmp_path, 4, rng)])
+        clim = outputs_climatology(str(tmp_path), "ww3.", ["hs"], state=state, **kwargs)
+        assert len(clim.sources) == 4
+        assert np.allclose(clim.mean["hs"][1:], np.nanmean(data, axis=0)[1:])
+
+        ds = clim.to_dataset(("latitude", "longitude"))
+        assert "hs_p99" in ds and "hs_exceed_4" in ds
+
+    def test_merge(self):
+        rng = np.random.default_rng(2)
+        a, b = rng.normal(3., 1., (50, 2, 2)), rng.normal(5., 2., (70, 2, 2))
+        c1 = Climatology(["hs"], (2, 2), nbins=50)
+        c2 = Climatology(["hs"], (2, 2), nbins=50)
+        c1.update("hs", a)
+        c2.update("hs", b)
+        c1.merge(c2)
+        both = np.concatenate([a, b])
+        assert np.allclose(c1.mean["hs"], both.mean(axis=0))
+        assert np.allclose(c1.variance("hs"), both.var(axis=0, ddof=1))
+        assert c1.hist["hs"].sum(axis=0).tolist() == [[120, 120], [120, 120]]
+
+    def test_growing_file(self, tmp_path):
+        state = str(tmp_path / "clim.npz")
+        write_month(tmp_path, 1, np.random.default_rng(4), hours=100)
+        clim = outputs_climatology(str(tmp_path), "ww3.", ["hs"], state=state)
+        assert clim.hist["hs"].size == 0
+        with pytest.raises(ValueError):
+            clim.percentile("hs", 50)
+        assert "hs_p50" not in clim.to_dataset(("latitude", "longitude"))
+
+        # the same month, written again with more time steps
+        data = write_month(tmp_path, 1, np.random.default_rng(4), hours=150)
+        clim = outputs_climatology(str(tmp_path), "ww3.", ["hs"], state=state)
+        assert clim.count["hs"][1, 1] == 150
+        assert np.allclose(clim.mean["hs"][1:], np.nanmean(data, axis=0)[1:])
+
+        # nothing new
+        clim = outputs_climatology(str(tmp_path), "ww3.", ["hs"], state=state)
+        assert clim.count["hs"][1, 1] == 150
+        assert list(clim.sources.values()) == ["2000-01-07T05:00:00"]
+
+    def test_default_fields(self, tmp_path):
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        write_out_grd(str(tmp_path / "out_grd.ww3"), [datetime.datetime(2000, 1, 1)])
+        times = pd.date_range("2000-01-01", periods=10, freq="h")
+        rng = np.random.default_rng(5)
+        variables = {v: (("time", "latitude", "longitude"), rng.random((10, 3, 4)))
+                     for v in ["hs", "fp", "dir", "spr", "uwnd", "vwnd", "ice"]}
+        xr.Dataset(variables, coords={"time": times}).to_netcdf(tmp_path / "ww3.2000.nc")
+
+        ounf = WW3Ounf(runpath=str(tmp_path), mod_def=str(tmp_path / "mod_def.ww3"),
+                       ww3_grd=str(tmp_path / "out_grd.ww3"))
+        clim = ounf.climatology()
+        assert clim.variables == ["hs", "fp", "dir", "spr", "uwnd", "vwnd", "ice"]
+        assert clim.count["ice"].sum() == 120
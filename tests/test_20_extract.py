@@ -0,0 +1,72 @@
+"""
+tests.test_extract.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the station time series extraction of pyww3.extract.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from pyww3.ounf import WW3Ounf
+from pyww3.extract import PointExtractor
+from test_12_binary import write_out_grd
+
+
+def write_day(path, day):
+    times = pd.date_range(f"2000-01-{day:02d}", periods=24, freq="h")
+    lon = np.arange(0., 10., 1.)
+    lat = np.arange(-5., 5., 0.5)
+    # a field linear in space, so that bilinear interpolation is exact
+    hs = (lon[None, None, :] + 2 * lat[None, :, None] +
+          np.arange(times.size)[:, None, None] / 10.)
+    ds = xr.Dataset({"hs": (("time", "latitude", "longitude"), hs, {"units": "m"})},
+                    coords={"time": times, "longitude": lon, "latitude": lat})
+    fname = str(path / f"ww3.200001{day:02d}.nc")
+    ds.to_netcdf(fname)
+    return fname
+
+
+class TestExtract:
+
+    def test_extract(self, tmp_path):
+        files = [write_day(tmp_path, d) for d in [2, 1, 3]]
+        stations = {"name": ["A", "B", "C"], "lon": [2.25, 5.5, 8.],
+                    "lat": [-1.1, 0.3, 3.]}
+
+        extractor = PointExtractor.from_file(files[0], stations)
+        assert extractor.row1 - extractor.row0 < 20  # only some rows are read
+
+        out = extractor.extract(files, ["hs"], max_workers=3, chunk=5)
+        assert out["hs"].dims == ("station", "time")
+        assert out.sizes["time"] == 72
+        assert (np.diff(out.time.values) > np.timedelta64(0)).all()
+        assert out["hs"].attrs["units"] == "m"
+
+        expected = (np.asarray(stations["lon"]) + 2 * np.asarray(stations["lat"]))
+        assert np.allclose(out["hs"].isel(time=0), expected)
+        assert np.allclose(out["hs"].isel(time=25), expected + 0.1)
+
+    def test_outside(self, tmp_path):
+        fname = write_day(tmp_path, 1)
+        with pytest.raises(ValueError):
+            PointExtractor.from_file(fname, {"name": ["X"], "lon": [5.], "lat": [40.]})
+
+    def test_default_fields(self, tmp_path):
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        write_out_grd(str(tmp_path / "out_grd.ww3"), [datetime.datetime(2000, 1, 1)])
+        times = pd.date_range("2000-01-01", periods=6, freq="h")
+        lon, lat = np.arange(0., 4.), np.arange(0., 3.)
+        variables = {v: (("time", "latitude", "longitude"), np.full((6, 3, 4), i, "f4"))
+                     for i, v in enumerate(["hs", "fp", "dir", "spr", "uwnd", "vwnd", "ice"])}
+        xr.Dataset(variables, coords={"time": times, "longitude": lon, "latitude": lat}
+                   ).to_netcdf(tmp_path / "ww3.2000.nc")
+
+        ounf = WW3Ounf(runpath=str(tmp_path), mod_def=str(tmp_path / "mod_def.ww3"),
+                       ww3_grd=str(tmp_path / "out_grd.ww3"))
+        out = ounf.extract_points({"name": ["A"], "lon": [1.5], "lat": [0.5]})
+        assert sorted(out.data_vars) == ["dir", "fp", "hs", "ice", "spr", "uwnd", "vwnd"]
+        assert np.allclose(out["ice"], 6.)
@@ -0,0 +1,53 @@
+"""
+tests.test_staging.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the incremental staging of pyww3.staging and its use in WW3Bounc.
+"""
+import os
+
+from pyww3.bounc import WW3Bounc
+from pyww3.staging import stage_files
+
+
+class TestStaging:
+
+    def test_stage(self, tmp_path):
+        src, dst = tmp_path / "spc", tmp_path / "run" / "spc"
+        src.mkdir()
+        for i in [10, 2, 1]:
+            (src / f"p{i}_spec.nc").write_bytes(b"spectrum")
+
+        names, nstaged = stage_files(str(src), str(dst), max_workers=2)
+        assert names == ["p1_spec.nc", "p2_spec.nc", "p10_spec.nc"]
+        assert nstaged == 3
+        assert os.path.samefile(src / "p1_spec.nc", dst / "p1_spec.nc")
+
+        # nothing changed
+        assert stage_files(str(src), str(dst))[1] == 0
+
+        # a new file, a changed file and a removed file
+        (src / "p3_spec.nc").write_bytes(b"spectrum")
+        os.remove(src / "p2_spec.nc")
+        (src / "p2_spec.nc").write_bytes(b"new spectrum")
+        os.remove(src / "p10_spec.nc")
+        names, nstaged = stage_files(str(src), str(dst), link=False)
+        assert nstaged == 2
+        assert (dst / "p2_spec.nc").read_bytes() == b"new spectrum"
+        assert not (dst / "p10_spec.nc").exists()
+        assert names == ["p1_spec.nc", "p2_spec.nc", "p3_spec.nc"]
+
+    def test_bounc(self, tmp_path):
+        src, run = tmp_path / "spc", tmp_path / "run"
+        src.mkdir()
+        for i in range(3):
+            (src / f"p{i}_spec.nc").write_bytes(b"spectrum")
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+
+        W = WW3Bounc(runpath=str(run), mod_def=str(tmp_path / "mod_def.ww3"),
+                     bound_file=str(src))
+        assert W.bound_file == "spec.list"
+        assert W.nstaged == 3
+        assert (run / "spc" / "p2_spec.nc").is_file()
+        assert (run / "spec.list").read_text().split() == \
+            [os.path.join("spc", f"p{i}_spec.nc") for i in range(3)]
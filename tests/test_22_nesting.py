@@ -0,0 +1,67 @@
+"""
+tests.test_nesting.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the parent to child boundary spectra of pyww3.nesting.
+"""
+import os
+
+import numpy as np
+import pytest
+import pandas as pd
+import xarray as xr
+
+from pyww3.nesting import idw_weights, linear_matrix, nest_spectra
+
+
+def parent_spectra():
+    times = pd.date_range("2010-01-01", periods=3, freq="3h")
+    freq = 0.04 * 1.1 ** np.arange(10)
+    dirs = np.arange(0., 360., 30.)
+    efth = np.zeros((3, 3, 10, 12), dtype="f4")
+    for s in range(3):
+        efth[:, s] = s + 1.  # constant spectra, different at each station
+    return xr.Dataset({"efth": (("time", "station", "frequency", "direction"), efth)},
+                      coords={"time": times, "frequency": freq, "direction": dirs,
+                              "longitude": ("station", [0., 1., 2.]),
+                              "latitude": ("station", [0., 0., 0.])})
+
+
+class TestNesting:
+
+    def test_weights(self):
+        index, weight = idw_weights([0., 1., 2.], [0., 0., 0.], [0., 0.5], [0., 0.], k=2)
+        assert np.allclose(weight[0], [1., 0.]) or np.allclose(weight[0], [0., 1.])
+        assert np.allclose(weight[1], [0.5, 0.5])
+        assert set(index[1]) == {0, 1}
+
+        m = linear_matrix([0., 90., 180., 270.], [45., 315.], period=360.)
+        assert np.allclose(m @ [0., 1., 2., 3.], [0.5, 1.5])
+
+    def test_nest(self, tmp_path):
+        points = {"name": ["B1", "B2"], "lon": [1., 1.5], "lat": [0., 0.]}
+        outpath = str(tmp_path / "spc")
+        dirs = np.arange(15., 360., 30.)  # rotated directional grid
+        fnames = nest_spectra(parent_spectra(), points, outpath, dirs=dirs, k=2,
+                              batch=1)
+        assert [os.path.basename(f) for f in fnames] == ["B1_spec.nc", "B2_spec.nc"]
+        assert (tmp_path / "spec.list").read_text().split() == \
+            [os.path.join("spc", "B1_spec.nc"), os.path.join("spc", "B2_spec.nc")]
+
+        ds = xr.open_dataset(fnames[1])
+        assert ds["efth"].shape == (3, 1, 10, 12)
+        assert np.allclose(ds["direction"], dirs)
+        assert np.allclose(ds["efth"], 2.5)
+        assert np.isclose(float(ds["longitude"][0, 0]), 1.5)
+        assert ds.time.size == 3
+        assert np.allclose(xr.open_dataset(fnames[0])["efth"], 2.)
+
+    def test_reject_raw_records(self, tmp_path):
+        points = {"lon": [1.], "lat": [0.]}
+        raw = parent_spectra()
+        raw.attrs["idstr"] = "WAVEWATCH III POINT OUTPUT FILE"
+        with pytest.raises(ValueError):
+            nest_spectra(raw, points, str(tmp_path / "spc"))
+        with pytest.raises(ValueError):
+            nest_spectra(parent_spectra().drop_vars("frequency"), points,
+                         str(tmp_path / "spc"))
@@ -0,0 +1,64 @@
+"""
+tests.test_boundary.py
+~~~~~~~~~~~~~~~~~~~~~~
+
+Test the open boundary point lists of pyww3.boundary.
+"""
+import numpy as np
+import pytest
+
+from pyww3.grid import WW3GRid
+from pyww3.boundary import (boundary_point_file, boundary_points,
+                            mesh_boundary_nodes, thin_points)
+
+
+class TestBoundary:
+
+    def test_rect(self, tmp_path):
+        (tmp_path / "grid.nml").write_text("")
+        mask = np.ones((10, 20), dtype=int)
+        mask[0, :] = 2  # southern boundary
+        mask[:, 0] = 0  # land
+        np.savetxt(tmp_path / "grid.mask", mask, fmt="%d")
+
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="CHILD",
+                       grid_nml=str(tmp_path / "grid.nml"), grid_type="RECT",
+                       grid_coord="SPHE", grid_clos="NONE",
+                       rect_nx=20, rect_ny=10, rect_sx=0.1, rect_sy=0.1,
+                       rect_x0=-50., rect_y0=-30.,
+                       mask_filename=str(tmp_path / "grid.mask"))
+        lon, lat = boundary_points(grid)
+        assert lon.size == 19 and np.allclose(lat, -30.)
+
+        # 0.1 degree is about 9.6 km at 30S, keep one point every ~3 cells
+        tlon, tlat = thin_points(lon, lat, 30.)
+        assert 5 <= tlon.size <= 8
+        assert (np.diff(tlon) > 0.15).all()
+
+        fname = boundary_point_file(grid, str(tmp_path / "points.txt"), spacing=30.)
+        lines = open(fname).read().splitlines()
+        assert len(lines) == tlon.size
+        assert lines[0] == f"{tlon[0]:.5f} -30.00000 B001"
+
+        # the same mask, written from north to south
+        np.savetxt(tmp_path / "grid.mask", mask[::-1], fmt="%d")
+        grid.__setattr__("mask_idla", 3)
+        ilon, ilat = boundary_points(grid)
+        assert np.allclose(ilon, lon) and np.allclose(ilat, -30.)
+
+        grid.__setattr__("mask_idfm", 2)
+        with pytest.raises(ValueError):
+            boundary_points(grid)
+
+    def test_unst(self, tmp_path, gmsh_mesh):
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="CHILD",
+                       grid_nml=str(tmp_path / "grid.nml"), grid_type="UNST",
+                       grid_coord="SPHE", grid_clos="NONE",
+                       unst_filename=gmsh_mesh)
+
+        triangles = np.array([[0, 1, 4], [0, 4, 3], [1, 2, 5], [1, 5, 4]])
+        assert mesh_boundary_nodes(triangles).tolist() == [0, 1, 2, 3, 4, 5]
+
+        lon, lat = boundary_points(grid, min_depth=10.)
+        assert lon.tolist() == [1., 2., 2.] and lat.tolist() == [0., 0., 1.]
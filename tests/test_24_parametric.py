@@ -0,0 +1,65 @@
+"""
+tests.test_parametric.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+Test the parametric boundary spectra of pyww3.parametric.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from pyww3.grid import WW3GRid
+from pyww3.parametric import parametric_spectra, write_parametric_boundary
+from pyww3.spectra import spectral_parameters, spectral_grid
+
+
+class TestParametric:
+
+    def test_parameters(self):
+        freq = 0.035 * 1.07 ** np.arange(50)
+        dirs = np.arange(0., 360., 5.)
+        hs = np.array([[1., 2.], [3., 4.]])
+        efth = parametric_spectra(freq, dirs, hs, 10., [[0., 90.], [180., 350.]],
+                                  spread=30.)
+        assert efth.shape == (2, 2, 50, 72)
+
+        params = spectral_parameters(efth, freq, dirs)
+        assert np.allclose(params["hs"], hs)
+        assert np.allclose(params["tp"], 10., rtol=0.04)
+        ddir = (params["dm"] - [[0., 90.], [180., 350.]] + 180.) % 360. - 180.
+        assert np.allclose(ddir, 0., atol=0.5)
+        assert np.allclose(params["dspr"], 30., atol=1.)
+
+        # shallow water reduces the low frequencies, not Hs
+        tma = parametric_spectra(freq, dirs, 2., 12., 0., depth=10.)
+        deep = parametric_spectra(freq, dirs, 2., 12., 0.)
+        assert np.isclose(spectral_parameters(tma, freq, dirs)["hs"], 2.)
+        assert tma[0].sum() < deep[0].sum()
+
+    def test_write(self, tmp_path):
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="CHILD",
+                       grid_nml=str(tmp_path / "grid.nml"), grid_type="RECT",
+                       grid_coord="SPHE", grid_clos="NONE", spectrum_nk=25,
+                       spectrum_nth=24)
+        points = {"name": ["P1", "P2", "P3"], "lon": [0., 1., 2.], "lat": [5., 5., 5.]}
+        times = pd.date_range("2010-01-01", periods=4, freq="6h")
+        hs = np.linspace(1., 2., 4)[:, None]
+
+        fnames = write_parametric_boundary(grid, points, times, hs, 8., 270.,
+                                           outpath=str(tmp_path / "spc"), batch=2)
+        assert len(fnames) == 3
+        assert len((tmp_path / "spec.list").read_text().split()) == 3
+
+        ds = xr.open_dataset(fnames[2])
+        freq, dirs = spectral_grid(grid)
+        assert ds["efth"].shape == (4, 1, 25, 24)
+        params = spectral_parameters(ds["efth"].values[:, 0], freq, dirs)
+        assert np.allclose(params["hs"], hs[:, 0], rtol=1e-4)
+        assert os.path.basename(fnames[2]) == "P3_spec.nc"
+
+        # waves coming from the west go to the east in the file
+        assert ds["direction"].attrs["standard_name"] == "sea_surface_wave_to_direction"
+        assert np.allclose(params["dp"], 90.)
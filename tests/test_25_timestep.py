@@ -0,0 +1,77 @@
+"""
+tests.test_timestep.py
+~~~~~~~~~~~~~~~~~~~~~~
+
+Test the CFL-based timesteps of pyww3.timestep.
+"""
+import numpy as np
+
+from pyww3.grid import WW3GRid
+from pyww3.spectra import group_velocity
+from pyww3.timestep import cfl_timesteps, grid_spacing
+
+
+def rect_grid(path, **kwargs):
+    (path / "grid.nml").write_text("")
+    return WW3GRid(runpath=str(path), grid_name="RECT", grid_nml=str(path / "grid.nml"),
+                   grid_type="RECT", grid_coord="SPHE", grid_clos="NONE",
+                   rect_nx=20, rect_ny=10, rect_sx=0.1, rect_sy=0.1,
+                   rect_x0=-50., rect_y0=50., **kwargs)
+
+
+class TestTimestep:
+
+    def test_rect(self, tmp_path):
+        grid = rect_grid(tmp_path)
+        steps = cfl_timesteps(grid, cfl=1.)
+
+        # the northernmost row (50.9N) limits the timestep
+        dx = np.deg2rad(0.1) * 6371e3 * np.cos(np.deg2rad(50.9))
+        cg = group_velocity(grid.spectrum_freq1, np.geomspace(0.1, 1e4, 500)).max()
+        assert steps["dtxy"] == np.floor(dx / cg)
+        assert steps["dtmax"] == 3 * steps["dtxy"]
+        assert steps["dtkth"] == steps["dtmax"] / 2
+        assert steps["dtmin"] == 10.
+
+    def test_depth(self, tmp_path):
+        z = np.full((10, 20), -4000.)
+        z[-1] = 1.  # the northernmost row is land
+        np.savetxt(tmp_path / "grid.depth", z)
+        deep = cfl_timesteps(rect_grid(tmp_path, depth_filename=str(tmp_path / "grid.depth")))
+
+        z[0] = -5.  # shallow water slows the waves and needs more kth steps
+        np.savetxt(tmp_path / "grid.depth", z)
+        grid = rect_grid(tmp_path, depth_filename=str(tmp_path / "grid.depth"))
+        spacing, depth = grid_spacing(grid)
+        assert spacing.size == depth.size == 180
+        shallow = grid.optimise_timesteps()
+        assert shallow["dtxy"] == deep["dtxy"]
+        assert shallow["dtkth"] < deep["dtkth"]
+        assert grid.timesteps_dtkth == shallow["dtkth"]
+        assert f"TIMESTEPS%DTXY = {shallow['dtxy']}" in grid.text
+
+    def test_mask(self, tmp_path):
+        mask = np.ones((10, 20), dtype=int)
+        mask[0] = 2  # active boundary
+        mask[-1] = 3  # excluded points are not computed
+        mask[:, 0] = 0
+        np.savetxt(tmp_path / "grid.mask", mask, fmt="%d")
+        grid = rect_grid(tmp_path, mask_filename=str(tmp_path / "grid.mask"))
+        spacing, depth = grid_spacing(grid)
+        assert spacing.size == 9 * 19
+
+        # the northernmost wet row is now at 50.8N
+        dx = np.deg2rad(0.1) * 6371e3 * np.cos(np.deg2rad(50.8))
+        cg = group_velocity(grid.spectrum_freq1, np.geomspace(0.1, 1e4, 500)).max()
+        assert cfl_timesteps(grid, cfl=1.)["dtxy"] == np.floor(dx / cg)
+
+    def test_unst(self, tmp_path, gmsh_mesh):
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="MESH",
+                       grid_nml=str(tmp_path / "grid.nml"), grid_type="UNST",
+                       grid_coord="SPHE", grid_clos="NONE",
+                       unst_filename=gmsh_mesh)
+        spacing, depth = grid_spacing(grid)
+        assert np.allclose(spacing, np.deg2rad(1.) * 6371e3, rtol=1e-3)
+        steps = cfl_timesteps(grid)
+        assert steps["dtxy"] > 1000.
@@ -0,0 +1,86 @@
+"""
+tests.test_scaling.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the strong-scaling model of pyww3.scaling.
+"""
+import os
+import json
+import datetime
+
+import numpy as np
+
+from pyww3.shel import WW3Shel
+from pyww3.scaling import (CACHE, calibrate, calibration_segment, fit_scaling,
+                           mod_def_hash, predict, recommend)
+
+
+def make_shel(path):
+    (path / "mod_def.ww3").write_bytes(b"grid")
+    (path / "wind.ww3").write_bytes(b"wind")
+    return WW3Shel(runpath=str(path), mod_def=str(path / "mod_def.ww3"),
+                   domain_start=datetime.datetime(2020, 1, 1),
+                   domain_stop=datetime.datetime(2020, 1, 11),
+                   date_field_stride=3600)
+
+
+class TestScaling:
+
+    def test_fit(self):
+        coeffs = np.array([10., 1000., 2.])
+        n = np.array([1, 2, 4, 8, 16])
+        assert np.allclose(fit_scaling(n, predict(coeffs, n)), coeffs)
+
+        # a negative overhead is dropped
+        noisy = 5. + 100. / n - 0.1 * n
+        coeffs = fit_scaling(n, noisy)
+        assert coeffs[2] == 0. and (coeffs >= 0).all()
+
+    def test_recommend(self):
+        coeffs = np.array([10., 1000., 2.])
+        # the fastest nproc is sqrt(1000 / 2) ~ 22
+        assert recommend(coeffs, 64, min_efficiency=0.) == 22
+        assert recommend(coeffs, 64, min_efficiency=0.7) < 22
+        # 4 processes take 268 s, 3 take 349 s
+        assert recommend(coeffs, 64, deadline=300.) == 4
+        assert recommend(coeffs, 64, deadline=1.) == 22
+
+    def test_segment(self, tmp_path):
+        shel = make_shel(tmp_path)
+        segment = calibration_segment(shel, hours=6.)
+        assert segment.runpath == os.path.join(str(tmp_path), "scaling")
+        assert os.path.islink(os.path.join(segment.runpath, "wind.ww3"))
+        assert segment.domain_stop == datetime.datetime(2020, 1, 1, 6)
+        assert segment.date_field_stride == 0
+        assert shel.date_field_stride == 3600
+
+    def test_cache(self, tmp_path):
+        shel = make_shel(tmp_path)
+        n = np.array([1, 2, 4, 8])
+        seconds = predict(np.array([1., 100., 0.5]), n)
+        key = mod_def_hash(str(tmp_path / "mod_def.ww3"))
+        with open(tmp_path / CACHE, "w") as f:
+            json.dump({key: {"hours": 6.,
+                             "seconds": dict(zip(map(str, n), seconds))}}, f)
+
+        coeffs = shel.autotune_nproc(hours=6., max_nproc=32, min_efficiency=0.)
+        assert np.allclose(coeffs, [1., 100., 0.5])
+        assert shel.nproc == 14
+
+    def test_calibrate(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYWW3_HISTORY", "off")
+        bindir = tmp_path / "bin"
+        bindir.mkdir()
+        (bindir / "ww3_shel").write_text("#!/bin/sh\ntest -f ww3_shel.nml\n")
+        os.chmod(bindir / "ww3_shel", 0o755)
+        monkeypatch.setenv("PATH", f"{bindir}:{os.environ['PATH']}")
+
+        run = tmp_path / "run"
+        run.mkdir()
+        shel = make_shel(run)
+        seconds = calibrate(shel, nprocs=(1,), hours=1.)
+        assert list(seconds) == [1]
+        assert not os.path.exists(run / "scaling_n0001")
+
+        calibrate(shel, nprocs=(1,), hours=1., keep_scratch=True)
+        assert os.path.isfile(run / "scaling_n0001" / "ww3_shel.nml")
@@ -0,0 +1,65 @@
+"""
+tests.test_launch.py
+~~~~~~~~~~~~~~~~~~~~
+
+Test the MPI launch configuration of pyww3.launch.
+"""
+import pytest
+
+from pyww3.launch import (LAUNCHERS, LaunchConfig, Topology, detect_topology, parse_cpuinfo,
+                          parse_lscpu, register_launcher)
+
+LSCPU = """# CPU,Core,Socket,Node
+0,0,0,0
+1,1,0,0
+2,2,1,1
+3,3,1,1
+4,0,0,0
+5,1,0,0
+6,2,1,1
+7,3,1,1
+"""
+
+CPUINFO = "".join(f"processor\t: {i}\nphysical id\t: {i // 4}\ncore id\t\t: {i % 2}\n\n"
+                  for i in range(8))
+
+NODE = Topology(cpus=8, cores=4, sockets=2, numa_nodes=2)
+
+
+class TestLaunch:
+
+    def test_topology(self):
+        assert parse_lscpu(LSCPU) == NODE
+        assert parse_cpuinfo(CPUINFO) == Topology(8, 4, 2, 1)
+        assert detect_topology().cpus >= 1
+
+    def test_mpirun(self):
+        config = LaunchConfig(2, topology=NODE)
+        assert config.command("ww3_shel") == \
+            "mpirun -n 2 --map-by numa --bind-to core ww3_shel"
+        assert config.environment()["OMP_NUM_THREADS"] == "1"
+
+        # a full machine is mapped by core
+        config = LaunchConfig(2, threads=2, topology=NODE)
+        assert config.command("ww3_shel") == \
+            "mpirun -n 2 --map-by core:PE=2 --bind-to core -x OMP_NUM_THREADS ww3_shel"
+        assert config.environment()["OMP_PROC_BIND"] == "close"
+
+    def test_launchers(self):
+        config = LaunchConfig(2, threads=2, launcher="srun", topology=NODE)
+        assert config.command("ww3_shel") == \
+            "srun -n 2 --cpus-per-task=2 --cpu-bind=cores ww3_shel"
+
+        config = LaunchConfig(1, launcher="mpiexec", topology=NODE)
+        assert config.command("ww3_shel") == \
+            "mpiexec -n 1 -map-by numa -bind-to core ww3_shel"
+
+        # oversubscribed runs are not bound
+        config = LaunchConfig(8, launcher="mpiexec", topology=NODE)
+        assert "-bind-to" not in config.command("ww3_shel")
+
+        register_launcher("echo", lambda c: ["echo", str(c.nproc)])
+        assert LaunchConfig(3, launcher="echo", topology=NODE).command("x") == "echo 3 x"
+        LAUNCHERS.pop("echo")
+        with pytest.raises(ValueError):
+            LaunchConfig(2, launcher="aprun", topology=NODE)
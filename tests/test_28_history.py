@@ -0,0 +1,135 @@
+"""
+tests.test_history.py
+~~~~~~~~~~~~~~~~~~~~~
+
+Test the run history and cost model of pyww3.history.
+"""
+import os
+import datetime
+
+import pandas as pd
+import pytest
+
+import pyww3.history
+from pyww3.grid import WW3GRid
+from pyww3.shel import WW3Shel
+from pyww3.ounf import WW3Ounf
+from pyww3.history import estimate, load_history, record_run, run_features
+
+from test_12_binary import write_out_grd
+
+
+def make_shel(path, days):
+    (path / "mod_def.ww3").write_bytes(b"grid")
+    return WW3Shel(runpath=str(path), mod_def=str(path / "mod_def.ww3"),
+                   domain_start=datetime.datetime(2020, 1, 1),
+                   domain_stop=datetime.datetime(2020, 1, 1 + days),
+                   date_field_stride=3600, input_forcing_winds=True)
+
+
+class TestHistory:
+
+    def test_features(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYWW3_HISTORY", str(tmp_path / "history.sqlite"))
+        shel = make_shel(tmp_path, 1)
+        features = run_features(shel, nproc=4)
+        assert features["duration"] == 86400.
+        assert features["forcing"] == "winds"
+        assert features["noutputs"] == 25
+        assert "work" not in features  # no grid known yet
+
+        # the grid run records the spectral grid of the mod_def
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="G", grid_nml=str(tmp_path / "grid.nml"),
+                       grid_type="RECT", grid_coord="SPHE", grid_clos="NONE",
+                       rect_nx=3, rect_ny=2, rect_sx=1., rect_sy=1.)
+        grid.returncode = 0
+        assert record_run(grid, 1.) is not None
+
+        # and the shel run the sea points
+        write_out_grd(str(tmp_path / "out_grd.ww3"), pd.date_range("2020", periods=2, freq="h"))
+        features = run_features(shel, nproc=4)
+        assert features["nsea"] == 6 and features["nk"] == 32
+        assert features["work"] == 6 * 32 * 24 * 86400 / 480.
+
+    def test_estimate(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYWW3_HISTORY", str(tmp_path / "history.sqlite"))
+        write_out_grd(str(tmp_path / "out_grd.ww3"), pd.date_range("2020", periods=2, freq="h"))
+        (tmp_path / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(tmp_path), grid_name="G", grid_nml=str(tmp_path / "grid.nml"),
+                       grid_type="RECT", grid_coord="SPHE", grid_clos="NONE",
+                       rect_nx=3, rect_ny=2, rect_sx=1., rect_sy=1.)
+
+        shel = make_shel(tmp_path, 1)
+        with pytest.raises(ValueError):
+            estimate(shel, 2, grid)
+
+        # wall = 5 + 1e-4 * work / nproc
+        for days, nproc in [(1, 1), (2, 2), (4, 2), (3, 4)]:
+            shel = make_shel(tmp_path, days)
+            work = run_features(shel, nproc, grid)["work"]
+            shel.returncode = 0
+            record_run(shel, 5. + 1e-4 * work / nproc, nproc, grid=grid)
+        assert len(load_history("ww3_shel")) == 4
+
+        shel = make_shel(tmp_path, 8)
+        cost = estimate(shel, 4, grid)
+        work = run_features(shel, 4, grid)["work"]
+        assert cost["wall_seconds"] == pytest.approx(5. + 1e-4 * work / 4, rel=1e-6)
+        assert cost["core_hours"] == pytest.approx(cost["wall_seconds"] * 4 / 3600.)
+        assert cost["nrecords"] == 4
+
+    def test_output_bytes(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYWW3_HISTORY", str(tmp_path / "history.sqlite"))
+        bindir = tmp_path / "bin"
+        bindir.mkdir()
+        # the grid writes its mod_def here (a copy in a subdirectory is not
+        # its output), while another stage writes out_grd.ww3 in the same run path
+        (bindir / "ww3_grid").write_text("#!/bin/sh\nprintf grid > mod_def.ww3\n"
+                                         "printf scratch > sub/mod_def.ww3\n"
+                                         "printf other > out_grd.ww3\n")
+        os.chmod(bindir / "ww3_grid", 0o755)
+        monkeypatch.setenv("PATH", f"{bindir}:{os.environ['PATH']}")
+
+        run = tmp_path / "run"
+        (run / "sub").mkdir(parents=True)
+        (run / "old").mkdir()
+        (run / "old" / "mod_def.ww3").write_text("unchanged")
+        (run / "grid.nml").write_text("")
+        grid = WW3GRid(runpath=str(run), grid_name="G", grid_nml=str(run / "grid.nml"),
+                       grid_type="RECT", grid_coord="SPHE", grid_clos="NONE",
+                       rect_nx=3, rect_ny=2, rect_sx=1., rect_sy=1.)
+        grid.to_file()
+        grid.run()
+        assert grid.returncode == 0
+        assert load_history("ww3_grid")[0]["output_bytes"] == len("grid")
+
+        # unexpected errors do not break the run either
+        def broken(*args):
+            raise RuntimeError("broken")
+        monkeypatch.setattr(pyww3.history, "run_features", broken)
+        assert record_run(grid, 1.) is None
+
+    def test_ounf_outputs(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYWW3_HISTORY", str(tmp_path / "history.sqlite"))
+        bindir = tmp_path / "bin"
+        bindir.mkdir()
+        # ww3_ounf outputs are also searched in the (scratch) subdirectories
+        (bindir / "ww3_ounf").write_text("#!/bin/sh\nprintf field > scratch/ww3.2000.nc\n")
+        os.chmod(bindir / "ww3_ounf", 0o755)
+        monkeypatch.setenv("PATH", f"{bindir}:{os.environ['PATH']}")
+
+        (tmp_path / "scratch").mkdir()
+        (tmp_path / "mod_def.ww3").write_bytes(b"grid")
+        write_out_grd(str(tmp_path / "out_grd.ww3"), pd.date_range("2020", periods=2, freq="h"))
+        ounf = WW3Ounf(runpath=str(tmp_path), mod_def=str(tmp_path / "mod_def.ww3"),
+                       ww3_grd=str(tmp_path / "out_grd.ww3"))
+        ounf.to_file()
+        ounf.run()
+        assert load_history("ww3_ounf")[0]["output_bytes"] == len("field")
+
+        # a prefix that is not a valid pattern does not break the run
+        ounf.file_prefix = "ww3.{0"
+        ounf.run()
+        assert ounf.returncode == 0
+        assert len(load_history("ww3_ounf")) == 2
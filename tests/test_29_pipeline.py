@@ -0,0 +1,76 @@
+"""
+tests.test_pipeline.py
+~~~~~~~~~~~~~~~~~~~~~~
+
+Test the pipelines of pyww3.pipeline and the pyww3 command line.
+"""
+import os
+import json
+
+import pytest
+
+from pyww3.cli import main
+from pyww3.pipeline import build_program, load_pipeline, pipeline_status
+
+
+def fake_program(bindir, name, script):
+    fname = bindir / name
+    fname.write_text("#!/bin/sh\n" + script + "\n")
+    os.chmod(fname, 0o755)
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """A grid -> shel pipeline with fake WW3 executables."""
+    monkeypatch.setenv("PYWW3_HISTORY", "off")
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    fake_program(bindir, "ww3_grid", "echo grid > mod_def.ww3")
+    fake_program(bindir, "ww3_shel", "test -f ww3_shel.nml")
+    monkeypatch.setenv("PATH", f"{bindir}:{os.environ['PATH']}")
+
+    run = tmp_path / "run"
+    run.mkdir()
+    (run / "grid.nml").write_text("")
+    config = {"runpath": str(run),
+              "stages": [{"name": "grid", "program": "ww3_grid",
+                          "args": {"grid_name": "G", "grid_nml": str(run / "grid.nml"),
+                                   "grid_type": "RECT", "grid_coord": "SPHE",
+                                   "grid_clos": "NONE"}},
+                         {"name": "shel", "program": "ww3_shel", "mpi": False,
+                          "args": {"mod_def": str(run / "mod_def.ww3"),
+                                   "domain_start": "2021-01-01T00:00:00",
+                                   "domain_stop": "2021-01-02T00:00:00"}}]}
+    fname = tmp_path / "pipeline.json"
+    fname.write_text(json.dumps(config))
+    return str(fname)
+
+
+class TestPipeline:
+
+    def test_load(self, pipeline):
+        stages = load_pipeline(pipeline)
+        assert [s["name"] for s in stages] == ["grid", "shel"]
+        assert stages[1]["after"] == ["grid"]
+        assert stages[1]["args"]["runpath"] == stages[0]["args"]["runpath"]
+        assert pipeline_status(pipeline)[0]["status"] == "pending"
+
+    def test_run(self, pipeline, capsys):
+        assert main(["run", pipeline, "-j", "2"]) == 0
+        assert [s["status"] for s in pipeline_status(pipeline)] == ["done", "done"]
+        assert "shel" in capsys.readouterr().out
+
+        shel = build_program(load_pipeline(pipeline)[1])
+        assert shel.domain_stop.day == 2
+
+    def test_resume(self, pipeline, tmp_path):
+        fake_program(tmp_path / "bin", "ww3_shel", "exit 3")
+        assert main(["run", pipeline]) == 1
+        status = pipeline_status(pipeline)
+        assert status[1]["status"] == "failed" and status[1]["returncode"] == 3
+
+        # only the failed stage runs again
+        fake_program(tmp_path / "bin", "ww3_grid", "exit 1")
+        fake_program(tmp_path / "bin", "ww3_shel", "exit 0")
+        assert main(["run", pipeline, "--resume"]) == 0
+        assert main(["status", pipeline]) == 0